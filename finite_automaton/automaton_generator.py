@@ -0,0 +1,142 @@
+"""Module for generating random automata and inputs from a seed."""
+
+from typing import List, Dict, Set, Tuple
+import random
+import string
+
+def make_alphabet(size: int) -> List[str]:
+    """Return ``size`` distinct single-character symbols."""
+    base = string.digits + string.ascii_lowercase + string.ascii_uppercase
+    if size <= len(base):
+        return list(base[:size])
+    return list(base) + [chr(0x4E00 + index) for index in range(size - len(base))]
+
+
+def random_dfa(
+        seed: int,
+        num_states: int,
+        alphabet: List[str],
+        accept_ratio: float = 0.3,
+        missing: float = 0.0
+    ) -> Tuple[List[str], Dict[Tuple[str, str], str], List[str]]:
+    """Return (states, transitions, accept states) of a random DFA.
+
+    Each transition is left out with probability ``missing``; with the
+    default 0.0 the DFA is complete.
+    """
+    rng = random.Random(seed)
+    states = [f"q{index}" for index in range(num_states)]
+    transitions = {}
+    for state in states:
+        for symbol in alphabet:
+            # missing が 0 の場合は乱数を消費せず、同じシードで以前と同じDFAを作る
+            if missing and rng.random() < missing:
+                continue
+            transitions[(state, symbol)] = rng.choice(states)
+    accept_states = [state for state in states if rng.random() < accept_ratio] or [rng.choice(states)]
+    return states, transitions, accept_states
+
+
+def random_dfa_config(
+        seed: int,
+        num_states: int,
+        alphabet_size: int = 2,
+        accept_ratio: float = 0.3,
+        test_cases: List[str] = None,
+        missing: float = 0.0
+    ) -> Dict:
+    """Return a random DFA in the JSON format read by ConfigFileLoader.
+
+    The DFA is complete unless ``missing`` leaves transitions out.
+    """
+    alphabet = make_alphabet(alphabet_size)
+    states, transitions, accept_states = random_dfa(seed, num_states, alphabet, accept_ratio, missing)
+    return {
+        "states": states,
+        "alphabet_list": alphabet,
+        "accept_states": accept_states,
+        "transition_function": {f"{state},{symbol}": next_state for (state, symbol), next_state in transitions.items()},
+        "start_state": states[0],
+        "test_cases": test_cases or [],
+        "comment": f"random DFA (seed={seed})",
+    }
+
+
+def random_compiled_dfa(
+        seed: int,
+        num_states: int,
+        alphabet: List[str],
+        accept_ratio: float = 0.3,
+        missing: float = 0.0
+    ):
+    """Return a random DFA over the given symbols as a CompiledDfa."""
+    from dfa_simulator import CompiledDfa
+
+    states, transitions, accept_states = random_dfa(seed, num_states, alphabet, accept_ratio, missing)
+    return CompiledDfa.from_config(set(states), set(alphabet), transitions, states[0], set(accept_states))
+
+
+def random_nfa_config(
+        seed: int,
+        num_states: int,
+        alphabet_size: int = 2,
+        epsilon_density: float = 0.1,
+        branching: float = 1.5,
+        accept_ratio: float = 0.3
+    ) -> Dict:
+    """Return a random NFA config in the form taken by NfaToDfaConverter.
+
+    Each (state, symbol) pair gets about ``branching`` successors on average,
+    and each state gets an ε-edge to another state with probability
+    ``epsilon_density`` (several edges when it is larger than 1).
+    """
+    rng = random.Random(seed)
+    states = [f"q{index}" for index in range(num_states)]
+    alphabet = make_alphabet(alphabet_size)
+    transitions: Dict[Tuple[str, str], Set[str]] = {}
+
+    for state in states:
+        for symbol in alphabet:
+            count = int(branching) + (1 if rng.random() < branching - int(branching) else 0)
+            if count:
+                transitions[(state, symbol)] = set(rng.sample(states, min(count, num_states)))
+
+        epsilon_count = int(epsilon_density) + (1 if rng.random() < epsilon_density - int(epsilon_density) else 0)
+        if epsilon_count:
+            transitions[(state, 'ε')] = set(rng.sample(states, min(epsilon_count, num_states)))
+
+    accept_states = {state for state in states if rng.random() < accept_ratio} or {rng.choice(states)}
+    return {
+        'states': set(states),
+        'alphabet_list': set(alphabet) | ({'ε'} if epsilon_density > 0 else set()),
+        'transition_functions': transitions,
+        'start_state': states[0],
+        'accept_states': accept_states,
+    }
+
+
+def random_inputs(seed: int, alphabet: List[str], length: int, count: int) -> List[str]:
+    """Return ``count`` random strings of ``length`` symbols over ``alphabet``."""
+    rng = random.Random(seed)
+    return [''.join(rng.choices(alphabet, k=length)) for _ in range(count)]
+
+
+def noisy_inputs(
+        seed: int,
+        alphabet: List[str],
+        noise: List[str],
+        count: int,
+        max_length: int,
+        noise_ratio: float = 0.05
+    ) -> List[str]:
+    """Return ``count`` strings of 0 to ``max_length - 1`` symbols over ``alphabet``.
+
+    Each character is drawn from ``noise`` instead with probability
+    ``noise_ratio``, so the inputs can contain symbols outside the alphabet.
+    """
+    rng = random.Random(seed)
+    return [
+        ''.join(rng.choice(noise) if rng.random() < noise_ratio else rng.choice(alphabet)
+                for _ in range(rng.randrange(0, max_length)))
+        for _ in range(count)
+    ]
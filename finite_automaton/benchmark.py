@@ -0,0 +1,164 @@
+"""Reproducible benchmarks for loading, simulating and converting automata.
+
+Example::
+
+    python3 benchmark.py --dfa-sizes 10,1000,10000 --output result.json
+    python3 benchmark.py --baseline result.json --tolerance 0.2
+"""
+
+from typing import List, Dict, Callable, Tuple
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from automaton_generator import make_alphabet, random_dfa_config, random_nfa_config, random_inputs
+from dfa_simulator import ConfigFileLoader, DfaSimulator
+from nfa_to_dfa_converter import NfaToDfaConverter
+
+def measure(function: Callable[[], object], repeat: int) -> Tuple[float, int]:
+    """Return (best wall time in seconds, peak traced memory in bytes).
+
+    Memory is traced in a separate run so that tracemalloc does not slow down
+    the timed runs.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def record(name: str, size: int, seconds: float, peak: int, work: int, unit: str) -> Dict:
+    return {
+        'name': name,
+        'size': size,
+        'seconds': seconds,
+        'throughput': work / seconds if seconds else None,
+        'unit': unit,
+        'peak_bytes': peak,
+    }
+
+
+def benchmark_dfa(args, size: int, directory: str) -> List[Dict]:
+    alphabet = make_alphabet(args.alphabet_size)
+    cases = random_inputs(args.seed + size, alphabet, args.input_length, args.input_count)
+    config = random_dfa_config(args.seed + size, size, args.alphabet_size, test_cases=cases)
+    path = os.path.join(directory, f"dfa_{size}.json")
+    with open(path, 'w') as file:
+        json.dump(config, file)
+
+    loader = ConfigFileLoader(path)
+    seconds, peak = measure(loader.load_config, args.repeat)
+    results = [record('ConfigFileLoader.load_config', size, seconds, peak,
+                      len(config['transition_function']), 'transitions/s')]
+
+    loaded, _ = loader.load_config()
+    simulator = DfaSimulator(
+        loaded['states'],
+        loaded['alphabet_list'],
+        loaded['transition_function'],
+        loaded['start_state'],
+        loaded['accept_states'],
+        loaded['test_cases'])
+
+    seconds, peak = measure(simulator.execute, args.repeat)
+    results.append(record('DfaSimulator.execute', size, seconds, peak,
+                          args.input_length * args.input_count, 'chars/s'))
+    return results
+
+
+def benchmark_nfa(args, size: int) -> List[Dict]:
+    config = random_nfa_config(args.seed + size, size, args.alphabet_size, args.epsilon_density)
+    dfa_states = len(NfaToDfaConverter(config).execute()['dfa_states'])
+
+    seconds, peak = measure(lambda: NfaToDfaConverter(config).execute(), args.repeat)
+    result = record('NfaToDfaConverter.execute', size, seconds, peak, dfa_states, 'dfa_states/s')
+    result['dfa_states'] = dfa_states
+    return [result]
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Return a message for every benchmark that got slower than the baseline allows."""
+    previous = {(entry['name'], entry['size']): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry['name'], entry['size']))
+        if old is None or not old['seconds']:
+            continue
+        ratio = entry['seconds'] / old['seconds']
+        entry['baseline_ratio'] = ratio
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{entry['name']} (size={entry['size']}): {old['seconds']:.6f}s -> {entry['seconds']:.6f}s (x{ratio:.2f})")
+    return regressions
+
+
+def parse_sizes(text: str) -> List[int]:
+    return [int(size) for size in text.split(',') if size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='有限オートマトンのベンチマーク')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dfa-sizes', type=parse_sizes, default=[10, 100, 1000], help='DFAの状態数 (カンマ区切り)')
+    parser.add_argument('--nfa-sizes', type=parse_sizes, default=[8, 12, 16], help='NFAの状態数 (カンマ区切り)')
+    parser.add_argument('--alphabet-size', type=int, default=2)
+    parser.add_argument('--epsilon-density', type=float, default=0.2, help='NFAの1状態あたりのε遷移の数')
+    parser.add_argument('--input-length', type=int, default=1000)
+    parser.add_argument('--input-count', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3, help='計測の繰り返し回数 (最良値を採用)')
+    parser.add_argument('--output', metavar='FILE', help='結果をJSONで保存する')
+    parser.add_argument('--baseline', metavar='FILE', help='比較するベースラインのJSON')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='許容する遅延の割合')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.dfa_sizes:
+            results.extend(benchmark_dfa(args, size, directory))
+    for size in args.nfa_sizes:
+        results.extend(benchmark_nfa(args, size))
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        },
+        'results': results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            regressions = compare(results, json.load(file)['results'], args.tolerance)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if regressions:
+        print('性能の劣化が見つかりました:', file=sys.stderr)
+        for message in regressions:
+            print(f"  {message}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
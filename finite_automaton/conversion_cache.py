@@ -0,0 +1,172 @@
+"""Module for a persistent, content-addressed cache of NFA→DFA conversions.
+
+An entry is keyed by a hash of the canonical NFA config (states, alphabet,
+transitions, start and accept states, all sorted) and the minimize flag, and
+holds the converted CompiledDfa in the binary format of dfa_binary_format.
+Entries are loaded with ``mmap``, so a hit costs a file open instead of a
+subset construction.
+
+Several processes may share one directory: entries are written to a
+temporary file and moved into place with ``os.replace``, so readers only
+ever see complete files, and two processes converting the same NFA write the
+same content. The directory is kept under ``max_bytes`` by deleting the
+least recently used entries; a hit refreshes the entry's modification time.
+"""
+
+from typing import List, Dict, Tuple, Optional
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+
+from dfa_simulator import CompiledDfa
+from nfa_to_dfa_converter import NfaToDfaConverter
+import dfa_binary_format
+
+# キャッシュの形式を変えたら上げる
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'finite_automaton', 'conversions')
+
+ENTRY_SUFFIX = '.dfa'
+TEMPORARY_SUFFIX = '.tmp'
+
+# 書き込み途中で終了したプロセスの一時ファイルを削除するまでの秒数
+TEMPORARY_LIFETIME = 3600
+
+
+def canonical_config(config: Dict) -> str:
+    """Serialize an NFA config so that equal NFAs give equal strings.
+
+    Sets are sorted and transitions to an empty set are dropped, so the
+    order in which a config was built does not change its key.
+    """
+    transitions = sorted(
+        [state, symbol, sorted(next_states)]
+        for (state, symbol), next_states in config['transition_functions'].items() if next_states
+    )
+    return json.dumps({
+        'states': sorted(config['states']),
+        'alphabet': sorted(set(config['alphabet_list'])),
+        'transitions': transitions,
+        'start': config['start_state'],
+        'accept': sorted(config['accept_states']),
+    }, ensure_ascii=False, separators=(',', ':'))
+
+
+def config_key(config: Dict, minimize: bool = False) -> str:
+    """Content hash of an NFA config and the conversion options."""
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_VERSION}:{dfa_binary_format.VERSION}:{int(minimize)}:".encode('ascii'))
+    digest.update(canonical_config(config).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """Directory of converted DFAs, bounded in size with least-recently-used eviction."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = 256 << 20):
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, config: Dict, minimize: bool = False) -> Optional[CompiledDfa]:
+        """Return the cached conversion of an NFA config, or None."""
+        path = self.path(config_key(config, minimize))
+        try:
+            compiled = dfa_binary_format.load_compiled_dfa(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, TypeError, struct.error):
+            # 壊れたエントリは削除して変換し直す
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # 最近使ったエントリとして更新時刻を進める
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return compiled
+
+    def put(self, config: Dict, compiled: CompiledDfa, minimize: bool = False) -> None:
+        """Store a conversion atomically, then evict old entries beyond ``max_bytes``."""
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=TEMPORARY_SUFFIX)
+        os.close(descriptor)
+        try:
+            dfa_binary_format.write_compiled_dfa(compiled, temporary)
+            os.replace(temporary, self.path(config_key(config, minimize)))
+        except BaseException:
+            self._remove(temporary)
+            raise
+        self.evict()
+
+    def convert(self, config: Dict, minimize: bool = False) -> CompiledDfa:
+        """Return the DFA of an NFA config, converting and storing it on a miss."""
+        compiled = self.get(config, minimize)
+        if compiled is None:
+            compiled = NfaToDfaConverter(config).to_compiled_dfa(minimize=minimize)
+            self.put(config, compiled, minimize)
+        return compiled
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """Return (modification time, size, path) of every entry, oldest first."""
+        entries = []
+        now = time.time()
+        with os.scandir(self.directory) as scanner:
+            for entry in scanner:
+                try:
+                    status = entry.stat()
+                except FileNotFoundError:
+                    # 他のプロセスが削除した
+                    continue
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    entries.append((status.st_mtime, status.st_size, entry.path))
+                elif entry.name.endswith(TEMPORARY_SUFFIX) and now - status.st_mtime > TEMPORARY_LIFETIME:
+                    self._remove(entry.path)
+        entries.sort()
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> int:
+        """Delete the least recently used entries until the total size fits; return how many."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            # 読み込み済みのプロセスは mmap を持っているため、削除しても影響しない
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for _, _, path in self.entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            # 他のプロセスが先に削除した場合など
+            pass
+
+
+def cached_conversion(config: Dict, minimize: bool = False, cache: ConversionCache = None) -> CompiledDfa:
+    """Convert an NFA config through the default on-disk cache."""
+    return (cache or ConversionCache()).convert(config, minimize)
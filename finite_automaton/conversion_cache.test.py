@@ -0,0 +1,121 @@
+'''
+This module tests the on-disk NFA to DFA conversion cache in conversion_cache.
+'''
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from multiprocessing import Pool
+from automaton_generator import random_nfa_config
+from conversion_cache import ConversionCache, config_key
+from dfa_equivalence import equivalent
+from nfa_to_dfa_converter import NfaToDfaConverter
+
+def convert_in_process(arguments):
+    directory, seed = arguments
+    compiled = ConversionCache(directory).convert(random_nfa_config(seed, 10, 2, 0.3), minimize=True)
+    return compiled.num_states
+
+class TestConversionCache(unittest.TestCase):
+    '''
+    Test cases for verifying hits, keys, eviction and sharing between processes.
+    '''
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_hit(self):
+        '''Tests that the second conversion is read from disk and accepts the same language.'''
+        config = random_nfa_config(1, 10, 2, 0.3)
+        cache = ConversionCache(self.directory.name)
+        converted = cache.convert(config)
+        cached = cache.convert(config)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertTrue(equivalent(cached, NfaToDfaConverter(config).to_compiled_dfa()))
+        self.assertEqual(cached.num_states, converted.num_states)
+
+        minimized = cache.convert(config, minimize=True)
+        self.assertEqual(cache.misses, 2)
+        self.assertTrue(equivalent(minimized, converted))
+        self.assertLessEqual(minimized.num_states, converted.num_states)
+
+    def test_key(self):
+        '''Tests that the key ignores set order and empty transitions but not the content.'''
+        config = {
+            'states': { 'q0', 'q1', 'q2' },
+            'alphabet_list': { 'a', 'b' },
+            'transition_functions': {
+                ('q0', 'a'): { 'q0', 'q1' },
+                ('q1', 'b'): { 'q2' },
+            },
+            'start_state': 'q0',
+            'accept_states': { 'q2' }
+        }
+        reordered = {
+            'states': ['q2', 'q1', 'q0'],
+            'alphabet_list': ['b', 'a'],
+            'transition_functions': {
+                ('q1', 'b'): ['q2'],
+                ('q0', 'b'): [],
+                ('q0', 'a'): ['q1', 'q0'],
+            },
+            'start_state': 'q0',
+            'accept_states': ['q2']
+        }
+        self.assertEqual(config_key(config), config_key(reordered))
+        self.assertNotEqual(config_key(config), config_key(config, minimize=True))
+        changed = dict(config, accept_states={ 'q1' })
+        self.assertNotEqual(config_key(config), config_key(changed))
+
+    def test_eviction(self):
+        '''Tests that the least recently used entries go first and broken entries are converted again.'''
+        cache = ConversionCache(self.directory.name, max_bytes=1 << 30)
+        configs = [random_nfa_config(seed, 8, 2, 0.3) for seed in range(4)]
+        for index, config in enumerate(configs):
+            cache.convert(config)
+            os.utime(cache.path(config_key(config)), (index, index))
+        # 最初のエントリを使うと最近使ったものになる
+        cache.get(configs[0])
+
+        cache.max_bytes = cache.size() - 1
+        self.assertEqual(cache.evict(), 1)
+        self.assertFalse(os.path.exists(cache.path(config_key(configs[1]))))
+        self.assertTrue(os.path.exists(cache.path(config_key(configs[0]))))
+
+        with open(cache.path(config_key(configs[2])), 'wb') as file:
+            file.write(b'broken')
+        self.assertIsNone(cache.get(configs[2]))
+        self.assertTrue(equivalent(cache.convert(configs[2]), NfaToDfaConverter(configs[2]).to_compiled_dfa()))
+
+    def test_processes(self):
+        '''Tests several processes converting the same NFAs into one directory.'''
+        with Pool(4) as pool:
+            sizes = pool.map(convert_in_process, [(self.directory.name, seed % 2) for seed in range(16)])
+        self.assertEqual(len(set(sizes[0::2])), 1)
+        self.assertEqual(len(set(sizes[1::2])), 1)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), sorted(
+            os.path.basename(ConversionCache(self.directory.name).path(
+                config_key(random_nfa_config(seed, 10, 2, 0.3), minimize=True))) for seed in range(2)))
+
+    def test_same_content(self):
+        '''Tests that processes with different hash seeds write byte-identical entries.'''
+        script = (
+            'import sys\n'
+            'from automaton_generator import random_nfa_config\n'
+            'from conversion_cache import ConversionCache\n'
+            'ConversionCache(sys.argv[1]).convert(random_nfa_config(3, 12, 3, 0.3))\n'
+        )
+        contents = []
+        for seed in ('1', '2'):
+            directory = os.path.join(self.directory.name, seed)
+            subprocess.run([sys.executable, '-c', script, directory], check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)), env=dict(os.environ, PYTHONHASHSEED=seed))
+            (name,) = os.listdir(directory)
+            with open(os.path.join(directory, name), 'rb') as file:
+                contents.append(file.read())
+        self.assertEqual(contents[0], contents[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,372 @@
+"""Module for counting, enumerating and sampling the strings a DFA accepts.
+
+Strings are sequences of the DFA's symbols and a missing transition rejects,
+as in dfa_equivalence. Counts are exact Python integers, so lengths in the
+thousands are fine. With NumPy installed the count vectors are object arrays
+and a DP step is one gather and one ``np.add.reduceat`` per vector. Sampling
+only needs ratios, so it works on the logarithms of the counts in floats.
+
+Example::
+
+    python3 dfa_analytics.py data/dfa01.json --count 10
+    python3 dfa_analytics.py data/dfa01.json --enumerate 20
+    python3 dfa_analytics.py data/dfa01.json --sample 5 --length 30 --seed 1
+"""
+
+from typing import List, Dict, Tuple, Iterator, Union, Optional
+from math import isqrt, log, exp, inf
+import argparse
+import random
+
+from dfa_simulator import CompiledDfa, as_compiled, load_automaton
+from instrumentation import dead_states
+from dfa_minimizer import reachable_states
+
+try:
+    import numpy as np
+except ImportError:  # numpy がなければリストで計算する
+    np = None
+
+
+class LanguageAnalyzer:
+    """Counts, enumerates and samples the language of one DFA.
+
+    Only states that are reachable and can still reach an accept state are
+    kept. Transitions between the same two states are merged and weighted
+    by the number of symbols they read, so counting costs one pass over the
+    merged edges per length.
+    """
+
+    def __init__(self, automaton: Union[CompiledDfa, Dict]):
+        compiled = as_compiled(automaton)
+        self.compiled: CompiledDfa = compiled
+        width = compiled.width
+        table = compiled.table
+
+        # 列番号 -> その列の記号 (辞書順)
+        self.column_symbols: List[List[str]] = [[] for _ in range(width)]
+        for symbol in sorted(compiled.symbol_ids):
+            self.column_symbols[compiled.symbol_ids[symbol]].append(symbol)
+
+        # 開始状態から到達でき、受理状態に到達できる状態だけを残す
+        dead = dead_states(compiled)
+        kept = [state for state in reachable_states(compiled) if not dead[state]]
+        index = {state: position for position, state in enumerate(kept)}
+        self.size: int = len(kept)
+        self.start: int = 0 if kept else -1
+        self.accepting: List[int] = [position for position, state in enumerate(kept) if compiled.is_accept(state)]
+
+        # 状態 -> [(列の記号, 遷移先)]、(遷移元, 遷移先) -> 記号数
+        self.moves: List[List[Tuple[List[str], int]]] = [[] for _ in kept]
+        weights: Dict[Tuple[int, int], int] = {}
+        for position, state in enumerate(kept):
+            for column in range(width):
+                next_state = table[state * width + column]
+                if next_state < 0 or next_state not in index or not self.column_symbols[column]:
+                    continue
+                target = index[next_state]
+                self.moves[position].append((self.column_symbols[column], target))
+                weights[position, target] = weights.get((position, target), 0) + len(self.column_symbols[column])
+        self.edges: List[Tuple[int, int, int]] = [(source, target, weight) for (source, target), weight in weights.items()]
+
+        self._forward_plan = self._plan(forward=True)
+        self._backward_plan = self._plan(forward=False)
+        self._reachable: List = None
+
+    def _plan(self, forward: bool):
+        """Edges grouped by the state a DP step writes (the target going forward, the source going back)."""
+        edges = [(target, source, weight) if forward else (source, target, weight)
+                 for source, target, weight in self.edges]
+        edges.sort()
+        if np is None:
+            grouped: List[List[Tuple[int, int]]] = [[] for _ in range(self.size)]
+            for written, read, weight in edges:
+                grouped[written].append((read, weight))
+            return grouped
+
+        written = np.array([edge[0] for edge in edges], dtype=np.intp)
+        read = np.array([edge[1] for edge in edges], dtype=np.intp)
+        weights = np.array([edge[2] for edge in edges], dtype=object)
+        log_weights = np.log(np.array([edge[2] for edge in edges], dtype=float))
+        if all(edge[2] == 1 for edge in edges):
+            weights = None
+        groups, starts = np.unique(written, return_index=True)
+        return read, weights, groups, starts, log_weights
+
+    def _zeros(self):
+        if np is None:
+            return [0] * self.size
+        return np.zeros(self.size, dtype=object)
+
+    def _step(self, vector, plan):
+        """One DP step: every state receives the weighted sum of the states it reads."""
+        if np is None:
+            return [sum(vector[read] * weight for read, weight in group) for group in plan]
+        read, weights, groups, starts, _ = plan
+        result = self._zeros()
+        if len(read):
+            terms = vector[read]
+            if weights is not None:
+                terms = terms * weights
+            result[groups] = np.add.reduceat(terms, starts)
+        return result
+
+    def _start_vector(self):
+        vector = self._zeros()
+        if self.start >= 0:
+            vector[self.start] = 1
+        return vector
+
+    def counts(self, max_length: int) -> List[int]:
+        """Return the number of accepted strings of every length 0..max_length."""
+        accepting = self.accepting
+        vector = self._start_vector()
+        counts = []
+        for length in range(max_length + 1):
+            if length:
+                vector = self._step(vector, self._forward_plan)
+            counts.append(int(sum(vector[state] for state in accepting)))
+        return counts
+
+    def count(self, length: int) -> int:
+        """Return the number of accepted strings of one length.
+
+        For long lengths on small automata the transition matrix is raised
+        to the power ``length`` by repeated squaring (O(S³ log n) instead of
+        O(n · edges)).
+        """
+        if self.start < 0:
+            return 0
+        if self.size ** 3 * max(length.bit_length(), 1) >= length * max(len(self.edges), 1):
+            return self.counts(length)[-1]
+
+        matrix = [[0] * self.size for _ in range(self.size)]
+        for source, target, weight in self.edges:
+            matrix[source][target] = weight
+        row = [[1 if state == self.start else 0 for state in range(self.size)]]
+        if np is not None:
+            matrix = np.array(matrix, dtype=object)
+            row = np.array(row, dtype=object)
+        while length:
+            if length & 1:
+                row = _multiply(row, matrix)
+            length >>= 1
+            if length:
+                matrix = _multiply(matrix, matrix)
+        return int(sum(row[0][state] for state in self.accepting))
+
+    def is_finite(self) -> bool:
+        """Whether the language is finite (the kept states have no cycle)."""
+        return self.start < 0 or self.longest() is not None
+
+    def longest(self) -> Optional[int]:
+        """Length of the longest accepted string, or None if the language is infinite or empty."""
+        if self.start < 0:
+            return None
+        # 削除できる (後続のない) 状態から順に取り除き、残ればループがある
+        successors = [set(target for _, target in moves) for moves in self.moves]
+        predecessors: List[List[int]] = [[] for _ in range(self.size)]
+        for state, targets in enumerate(successors):
+            for target in targets:
+                predecessors[target].append(state)
+        remaining = [len(targets) for targets in successors]
+        longest = [0] * self.size
+        order = [state for state in range(self.size) if not remaining[state]]
+        for state in order:
+            for previous in predecessors[state]:
+                longest[previous] = max(longest[previous], longest[state] + 1)
+                remaining[previous] -= 1
+                if not remaining[previous]:
+                    order.append(previous)
+        if len(order) < self.size:
+            return None
+        return longest[self.start]
+
+    def _reachable_at(self, length: int):
+        """Flags of the states with an accepted continuation of exactly ``length`` symbols."""
+        if self._reachable is None:
+            flags = [False] * self.size
+            for state in self.accepting:
+                flags[state] = True
+            self._reachable = [np.array(flags) if np is not None else flags]
+        reachable = self._reachable
+        while len(reachable) <= length:
+            previous = reachable[-1]
+            if np is None:
+                reachable.append([any(previous[read] for read, _ in group) for group in self._backward_plan])
+                continue
+            read, _, groups, starts, _ = self._backward_plan
+            flags = np.zeros(self.size, dtype=bool)
+            if len(read):
+                flags[groups] = np.logical_or.reduceat(previous[read], starts)
+            reachable.append(flags)
+        return reachable[length]
+
+    def enumerate(self, max_length: int = None) -> Iterator[str]:
+        """Yield the accepted strings in shortlex order (by length, then symbol by symbol).
+
+        The generator is lazy; without ``max_length`` it only ends when the
+        language is finite.
+        """
+        if self.start < 0:
+            return
+        longest = self.longest()
+        if longest is not None and (max_length is None or longest < max_length):
+            max_length = longest
+
+        length = 0
+        while max_length is None or length <= max_length:
+            if self._reachable_at(length)[self.start]:
+                yield from self._strings(length)
+            length += 1
+
+    def _strings(self, length: int) -> Iterator[str]:
+        if length == 0:
+            yield ''
+            return
+        # 深さ優先で、残りの長さで受理できる遷移だけをたどる
+        flags = [self._reachable_at(remaining) for remaining in range(length)]
+        path: List[str] = []
+        stack = [self._symbol_moves(self.start)]
+        while stack:
+            remaining = length - len(path) - 1
+            for symbol, target in stack[-1]:
+                if not flags[remaining][target]:
+                    continue
+                if remaining == 0:
+                    path.append(symbol)
+                    yield ''.join(path)
+                    path.pop()
+                    continue
+                path.append(symbol)
+                stack.append(self._symbol_moves(target))
+                break
+            else:
+                stack.pop()
+                if path:
+                    path.pop()
+
+    def _symbol_moves(self, state: int) -> Iterator[Tuple[str, int]]:
+        moves = [(symbol, target) for symbols, target in self.moves[state] for symbol in symbols]
+        moves.sort()
+        return iter(moves)
+
+    def _log_step(self, vector):
+        """``_step`` backwards on the natural logarithms of the counts (-inf for zero)."""
+        if np is None:
+            result = []
+            for group in self._backward_plan:
+                terms = [vector[read] + log(weight) for read, weight in group]
+                largest = max(terms, default=-inf)
+                if largest == -inf:
+                    result.append(-inf)
+                else:
+                    result.append(largest + log(sum(exp(term - largest) for term in terms)))
+            return result
+        read, _, groups, starts, log_weights = self._backward_plan
+        result = np.full(self.size, -np.inf)
+        if len(read):
+            result[groups] = np.logaddexp.reduceat(vector[read] + log_weights, starts)
+        return result
+
+    def sample(self, length: int, count: int = 1, rng: random.Random = None) -> List[str]:
+        """Return ``count`` accepted strings of ``length`` symbols, each chosen uniformly at random.
+
+        Each symbol is drawn with probability proportional to the number of
+        accepted completions after it. The counts are handled as logarithms,
+        so they neither overflow nor lose the small ones next to huge ones,
+        and they are kept only every √length lengths and recomputed block by
+        block while walking, so memory stays at O(√length · states).
+        """
+        if self.start < 0 or not self._reachable_at(length)[self.start]:
+            raise ValueError(f'長さ {length} の受理される文字列がありません')
+        rng = rng or random.Random()
+        interval = max(isqrt(length), 1)
+
+        # checkpoints[b] = 残り b * interval 記号で受理できる文字列の数の対数
+        vector = [-inf] * self.size
+        for state in self.accepting:
+            vector[state] = 0.0
+        if np is not None:
+            vector = np.array(vector)
+        checkpoints = [vector]
+        for remaining in range(interval, length, interval):
+            for _ in range(interval):
+                vector = self._log_step(vector)
+            checkpoints.append(vector)
+
+        states = [self.start] * count
+        paths: List[List[str]] = [[] for _ in range(count)]
+        for block in range((length - 1) // interval, -1, -1) if length else ():
+            block_start = block * interval
+            vectors = [checkpoints[block]]
+            for _ in range(block_start + 1, min(block_start + interval, length)):
+                vectors.append(self._log_step(vectors[-1]))
+            for completions in reversed(vectors):
+                for sample, state in enumerate(states):
+                    symbol, states[sample] = self._choose(self.moves[state], completions, rng)
+                    paths[sample].append(symbol)
+        return [''.join(path) for path in paths]
+
+    @staticmethod
+    def _choose(moves: List[Tuple[List[str], int]], completions, rng: random.Random) -> Tuple[str, int]:
+        """Draw one symbol of ``moves`` in proportion to the completions after it."""
+        largest = max(float(completions[target]) for _, target in moves)
+        masses = [len(symbols) * exp(completions[target] - largest) for symbols, target in moves]
+        choice = rng.random() * sum(masses)
+        for (symbols, target), mass in zip(moves, masses):
+            if choice < mass:
+                return symbols[min(int(choice / mass * len(symbols)), len(symbols) - 1)], target
+            choice -= mass
+        # 丸め誤差で最後まで届いた場合は、選ばれうる最後の遷移にする
+        symbols, target = next((symbols, target) for (symbols, target), mass in zip(reversed(moves), reversed(masses)) if mass)
+        return symbols[-1], target
+
+
+def _multiply(left, right):
+    if np is not None:
+        return np.dot(left, right)
+    columns = list(zip(*right))
+    return [[sum(a * b for a, b in zip(row, column) if a and b) for column in columns] for row in left]
+
+
+def count_accepted(automaton: Union[CompiledDfa, Dict], max_length: int) -> List[int]:
+    """Return the number of accepted strings of every length 0..max_length."""
+    return LanguageAnalyzer(automaton).counts(max_length)
+
+
+def enumerate_accepted(automaton: Union[CompiledDfa, Dict], max_length: int = None) -> Iterator[str]:
+    """Yield the accepted strings in shortlex order."""
+    return LanguageAnalyzer(automaton).enumerate(max_length)
+
+
+def sample_accepted(automaton: Union[CompiledDfa, Dict], length: int, count: int = 1,
+                    rng: random.Random = None) -> List[str]:
+    """Return accepted strings of one length, drawn uniformly at random."""
+    return LanguageAnalyzer(automaton).sample(length, count, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DFAが受理する文字列を数える・列挙する・抽出する')
+    parser.add_argument('config', help='DFA設定ファイル(JSONまたはバイナリ形式)')
+    parser.add_argument('--count', type=int, metavar='N', help='長さ 0..N の受理される文字列の数を出力する')
+    parser.add_argument('--enumerate', type=int, metavar='K', help='受理される文字列を短い順に K 個出力する')
+    parser.add_argument('--sample', type=int, metavar='K', help='受理される文字列を一様に K 個抽出する')
+    parser.add_argument('--length', type=int, default=10, help='--sample で抽出する文字列の長さ')
+    parser.add_argument('--seed', type=int, help='--sample の乱数のシード')
+    args = parser.parse_args()
+
+    analyzer = LanguageAnalyzer(load_automaton(args.config))
+    if args.count is not None:
+        for length, count in enumerate(analyzer.counts(args.count)):
+            print(f"{length}\t{count}")
+    if args.enumerate is not None:
+        for _, string in zip(range(args.enumerate), analyzer.enumerate()):
+            print(string)
+    if args.sample is not None:
+        for string in analyzer.sample(args.length, args.sample, random.Random(args.seed)):
+            print(string)
+
+
+if __name__ == '__main__':
+    main()
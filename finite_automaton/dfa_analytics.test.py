@@ -0,0 +1,82 @@
+'''
+This module tests counting, enumerating and sampling accepted strings in dfa_analytics.
+'''
+
+import itertools
+import random
+import unittest
+import dfa_analytics
+from math import comb
+from dfa_simulator import load_automaton
+from dfa_analytics import LanguageAnalyzer, count_accepted, enumerate_accepted
+from regex_to_nfa import compile_regex
+
+class TestDfaAnalytics(unittest.TestCase):
+    '''
+    Test cases for verifying the analytics against the languages described in the sample configs.
+    '''
+    def test_counts(self):
+        '''Tests the counts of the sample configs, including a length past 64-bit integers.'''
+        # 1で始まり0で終わる文字列
+        counts = count_accepted(load_automaton('data/dfa01.json'), 100)
+        self.assertEqual(counts[:4], [0, 0, 1, 2])
+        self.assertEqual(counts[100], 2 ** 98)
+
+        # 1を少なくとも3つ含む文字列
+        analyzer = LanguageAnalyzer(load_automaton('data/dfa02.json'))
+        expected = [sum(comb(length, ones) for ones in range(3, length + 1)) for length in range(80)]
+        self.assertEqual(analyzer.counts(79), expected)
+        self.assertEqual(analyzer.count(79), expected[79])
+        self.assertEqual(analyzer.count(5000), 2 ** 5000 - 1 - 5000 - comb(5000, 2))
+
+    def test_without_numpy(self):
+        '''Tests that the list-based fallback gives the same results.'''
+        compiled = compile_regex('(a|bc)*b?', {'a', 'b', 'c'})
+        with_numpy = LanguageAnalyzer(compiled)
+        counts, count = with_numpy.counts(30), with_numpy.count(300)
+        strings = list(itertools.islice(with_numpy.enumerate(), 50))
+        numpy = dfa_analytics.np
+        dfa_analytics.np = None
+        try:
+            without_numpy = LanguageAnalyzer(compiled)
+            self.assertEqual(without_numpy.counts(30), counts)
+            self.assertEqual(without_numpy.count(300), count)
+            self.assertEqual(list(itertools.islice(without_numpy.enumerate(), 50)), strings)
+            for case in without_numpy.sample(20, 20, random.Random(0)):
+                self.assertEqual(len(case), 20)
+                self.assertTrue(self.accepts(compiled, case), case)
+        finally:
+            dfa_analytics.np = numpy
+
+    def test_enumerate(self):
+        '''Tests the shortlex order and that a finite language ends.'''
+        strings = list(itertools.islice(enumerate_accepted(load_automaton('data/dfa01.json')), 7))
+        self.assertEqual(strings, ['10', '100', '110', '1000', '1010', '1100', '1110'])
+
+        analyzer = LanguageAnalyzer(compile_regex('ab?c?|ba', {'a', 'b', 'c'}))
+        self.assertTrue(analyzer.is_finite())
+        self.assertEqual(analyzer.longest(), 3)
+        self.assertEqual(list(analyzer.enumerate()), ['a', 'ab', 'ac', 'ba', 'abc'])
+        self.assertEqual(list(analyzer.enumerate(1)), ['a'])
+        self.assertFalse(LanguageAnalyzer(compile_regex('a*', {'a'})).is_finite())
+
+    def accepts(self, compiled, case):
+        state, completed = compiled.run(case)
+        return completed and compiled.is_accept(state)
+
+    def test_sample(self):
+        '''Tests that samples are accepted, cover every string and fail on an empty length.'''
+        compiled = load_automaton('data/dfa02.json')
+        analyzer = LanguageAnalyzer(compiled)
+        samples = analyzer.sample(5, 2000, random.Random(1))
+        self.assertTrue(all(len(case) == 5 and self.accepts(compiled, case) for case in samples))
+        self.assertEqual(len(set(samples)), analyzer.count(5))
+
+        long_samples = analyzer.sample(2000, 3, random.Random(2))
+        self.assertTrue(all(self.accepts(compiled, case) for case in long_samples))
+
+        with self.assertRaises(ValueError):
+            analyzer.sample(2)
+
+if __name__ == '__main__':
+    unittest.main()
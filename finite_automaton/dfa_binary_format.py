@@ -0,0 +1,166 @@
+"""Module for the memory-mappable binary format of compiled DFAs.
+
+Layout (little-endian, version 1)::
+
+    header       magic(8) version(u16) flags(u16) num_states(u32) width(u32)
+                 num_symbols(u32) start_state(u32) reserved(u32)
+                 symbols_offset(u64) names_offset(u64) table_offset(u64) accept_offset(u64)
+    symbol map   num_symbols x (column(u32) length(u32) utf-8 bytes)
+    state table  (num_states + 1) x u32 offsets into the following utf-8 name blob
+    transitions  num_states * width x i32, 8-byte aligned, -1 = no transition
+    accept       (num_states + 7) // 8 bytes, bit i of byte i >> 3 = state i accepts
+
+The loader maps the file with ``mmap`` and hands the transitions and the
+accept bitmap to CompiledDfa as zero-copy memoryviews, so processes that load
+the same file share one page-cached copy.
+"""
+
+from typing import Sequence
+from array import array
+import mmap
+import struct
+import sys
+
+from dfa_simulator import CompiledDfa
+
+MAGIC = b'FADFA\x00\x00\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sHHIIIII4Q')
+
+
+class StateNameTable(Sequence):
+    """State names decoded on access from the mapped state table."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets: memoryview = offsets
+        self.blob: memoryview = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, state):
+        if isinstance(state, slice):
+            return [self[index] for index in range(*state.indices(len(self)))]
+        if state < 0:
+            state += len(self)
+        return bytes(self.blob[self.offsets[state]:self.offsets[state + 1]]).decode('utf-8')
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _int32_bytes(values) -> bytes:
+    table = values if isinstance(values, array) and values.typecode == 'i' else array('i', values)
+    if sys.byteorder != 'little':
+        table = array('i', table)
+        table.byteswap()
+    return table.tobytes()
+
+
+def write_compiled_dfa(compiled: CompiledDfa, path: str) -> None:
+    """Write a CompiledDfa in the binary format."""
+    symbols = b''.join(
+        struct.pack('<II', column, len(encoded)) + encoded
+        for encoded, column in ((symbol.encode('utf-8'), column) for symbol, column in compiled.symbol_ids.items())
+    )
+
+    encoded_names = [name.encode('utf-8') for name in compiled.state_names]
+    name_offsets = array('I', [0])
+    for encoded in encoded_names:
+        name_offsets.append(name_offsets[-1] + len(encoded))
+    if sys.byteorder != 'little':
+        name_offsets.byteswap()
+    names = name_offsets.tobytes() + b''.join(encoded_names)
+
+    symbols_offset = HEADER.size
+    names_offset = symbols_offset + len(symbols)
+    table_offset = _align(names_offset + len(names))
+    table = _int32_bytes(compiled.table)
+    accept_offset = table_offset + len(table)
+    accept = bytes(compiled.accept_bitmap)[:(compiled.num_states + 7) >> 3]
+
+    header = HEADER.pack(
+        MAGIC, VERSION, 0, compiled.num_states, compiled.width, len(compiled.symbol_ids),
+        compiled.start_state, 0, symbols_offset, names_offset, table_offset, accept_offset)
+
+    with open(path, 'wb') as file:
+        file.write(header)
+        file.write(symbols)
+        file.write(names)
+        file.write(b'\x00' * (table_offset - names_offset - len(names)))
+        file.write(table)
+        file.write(accept)
+
+
+def is_compiled_dfa(path: str) -> bool:
+    """Return whether the file starts with the binary format's magic bytes."""
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def load_compiled_dfa(path: str) -> CompiledDfa:
+    """Map a binary file and return a CompiledDfa backed by the mapping."""
+    with open(path, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapping)
+    if len(view) < HEADER.size:
+        raise ValueError('コンパイル済みDFAファイルではありません')
+    (magic, version, _, num_states, width, num_symbols, start_state, _,
+     symbols_offset, names_offset, table_offset, accept_offset) = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError('コンパイル済みDFAファイルではありません')
+    if version != VERSION:
+        raise ValueError(f'対応していないバージョンです: {version}')
+
+    # 各領域がこの順に並び、マッピングに収まっていることを確認する
+    blob_offset = names_offset + (num_states + 1) * 4
+    table_size = num_states * width * 4
+    accept_size = (num_states + 7) >> 3
+    if not (HEADER.size <= symbols_offset <= names_offset
+            and blob_offset <= table_offset
+            and table_offset + table_size <= accept_offset
+            and accept_offset + accept_size <= len(view)):
+        raise ValueError('コンパイル済みDFAファイルが壊れています')
+    if num_states and start_state >= num_states:
+        raise ValueError(f'開始状態が範囲外です: {start_state}')
+
+    symbol_ids = {}
+    offset = symbols_offset
+    for _ in range(num_symbols):
+        if offset + 8 > names_offset:
+            raise ValueError('コンパイル済みDFAファイルが壊れています')
+        column, length = struct.unpack_from('<II', view, offset)
+        offset += 8
+        if offset + length > names_offset or column >= width:
+            raise ValueError('コンパイル済みDFAファイルが壊れています')
+        symbol_ids[bytes(view[offset:offset + length]).decode('utf-8')] = column
+        offset += length
+
+    if sys.byteorder == 'little':
+        name_offsets = view[names_offset:blob_offset].cast('I')
+        table = view[table_offset:table_offset + table_size].cast('i')
+    else:
+        # ビッグエンディアンの環境ではコピーして並べ替える
+        name_offsets = array('I')
+        name_offsets.frombytes(view[names_offset:blob_offset])
+        name_offsets.byteswap()
+        table = array('i')
+        table.frombytes(view[table_offset:table_offset + table_size])
+        table.byteswap()
+    if name_offsets[-1] > table_offset - blob_offset:
+        raise ValueError('コンパイル済みDFAファイルが壊れています')
+    names = StateNameTable(name_offsets, view[blob_offset:table_offset])
+    accept_bitmap = view[accept_offset:accept_offset + accept_size]
+
+    return CompiledDfa(names, symbol_ids, width, table, start_state, accept_bitmap)
+
+
+def numpy_views(compiled: CompiledDfa):
+    """Return zero-copy NumPy views (2-D transition table, accept bitmap bytes)."""
+    import numpy as np
+
+    table = np.frombuffer(compiled.table, dtype=np.int32).reshape(compiled.num_states, compiled.width)
+    accept_bitmap = np.frombuffer(compiled.accept_bitmap, dtype=np.uint8)
+    return table, accept_bitmap
@@ -0,0 +1,94 @@
+'''
+This module tests the memory-mappable binary format in dfa_binary_format.
+'''
+
+import os
+import random
+import struct
+import tempfile
+import unittest
+import numpy as np
+from dfa_simulator import ConfigFileLoader, DfaSimulator
+from dfa_binary_format import HEADER, MAGIC, write_compiled_dfa, load_compiled_dfa, is_compiled_dfa, numpy_views
+
+class TestDfaBinaryFormat(unittest.TestCase):
+    '''
+    Test cases for verifying the round trip and the validation of binary files.
+    '''
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'dfa01.dfa')
+
+        config, is_valid = ConfigFileLoader('data/dfa01.json').load_config()
+        self.assertTrue(is_valid)
+        self.compiled = DfaSimulator(
+            config['states'],
+            config['alphabet_list'],
+            config['transition_function'],
+            config['start_state'],
+            config['accept_states'],
+            config['test_cases']).compiled
+        write_compiled_dfa(self.compiled, self.path)
+
+    def test_round_trip(self):
+        '''Tests that the mmap-backed DFA has the same tables and results as the original.'''
+        self.assertTrue(is_compiled_dfa(self.path))
+        loaded = load_compiled_dfa(self.path)
+        self.assertEqual(list(loaded.state_names), list(self.compiled.state_names))
+        self.assertEqual(loaded.symbol_ids, self.compiled.symbol_ids)
+        self.assertEqual((loaded.width, loaded.start_state), (self.compiled.width, self.compiled.start_state))
+        self.assertEqual(list(loaded.table), list(self.compiled.table))
+
+        rng = random.Random(0)
+        cases = [''.join(rng.choice('01x') for _ in range(rng.randrange(0, 20))) for _ in range(200)] + ['']
+        for case in cases:
+            self.assertEqual(loaded.run(case), self.compiled.run(case), case)
+        states, completed = loaded.run_batch(cases)
+        expected_states, expected_completed = self.compiled.run_batch(cases)
+        self.assertTrue(np.array_equal(states, expected_states))
+        self.assertTrue(np.array_equal(completed, expected_completed))
+
+        table, accept_bitmap = numpy_views(loaded)
+        self.assertEqual(table.shape, (self.compiled.num_states, self.compiled.width))
+        self.assertEqual(table.ravel().tolist(), list(self.compiled.table))
+        for state in range(loaded.num_states):
+            self.assertEqual(bool(accept_bitmap[state >> 3] >> (state & 7) & 1), self.compiled.is_accept(state))
+
+    def rewrite(self, offset, data):
+        with open(self.path, 'r+b') as file:
+            file.seek(offset)
+            file.write(data)
+
+    def test_bad_header(self):
+        '''Tests that a wrong magic or version raises ValueError.'''
+        self.rewrite(0, b'NOTADFA\x00')
+        self.assertFalse(is_compiled_dfa(self.path))
+        with self.assertRaises(ValueError):
+            load_compiled_dfa(self.path)
+
+        self.rewrite(0, MAGIC + struct.pack('<H', 99))
+        with self.assertRaises(ValueError):
+            load_compiled_dfa(self.path)
+
+    def test_truncated(self):
+        '''Tests that a file cut short anywhere raises ValueError instead of failing later.'''
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        for size in range(0, len(data)):
+            with open(self.path, 'wb') as file:
+                file.write(data[:size])
+            with self.assertRaises(ValueError, msg=size):
+                load_compiled_dfa(self.path)
+
+    def test_bad_offsets(self):
+        '''Tests that offsets pointing outside the file raise ValueError.'''
+        with open(self.path, 'rb') as file:
+            fields = list(HEADER.unpack(file.read(HEADER.size)))
+        fields[-1] = 1 << 40
+        self.rewrite(0, HEADER.pack(*fields))
+        with self.assertRaises(ValueError):
+            load_compiled_dfa(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
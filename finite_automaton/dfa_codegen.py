@@ -0,0 +1,353 @@
+"""Module for specializing a DFA into generated Python source.
+
+``specialize`` writes a small module for one automaton, compiles it with
+``compile()`` and returns its functions. States are integer row offsets held
+in a local variable, the transition rows are constants of the generated
+module, acceptance is a membership test against a constant frozenset and a
+rejecting state that loops on every symbol (the trap state) ends the run at
+once. While the table stays small the generated loop reads two symbols per
+iteration from a ``memoryview`` cast of the translated input.
+
+The compiled code objects are cached on disk by a hash of the automaton, so
+later processes skip the generation entirely.
+
+Example::
+
+    python3 dfa_codegen.py data/dfa01.json
+"""
+
+from typing import List, Dict, Tuple, Callable, Union
+import argparse
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+
+from dfa_simulator import CompiledDfa, SymbolClassMap, NO_CLASS, as_compiled, load_automaton
+
+# 生成するコードの形式を変えたら上げる (キャッシュの無効化)
+GENERATOR_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'finite_automaton', 'codegen')
+
+# 2記号ずつ読む遷移表の要素数の上限
+MAX_PAIR_ENTRIES = 1 << 18
+
+# 2記号ずつ読む遷移表で、1記号ずつの遷移を置く位置 (列数もこれ以下に限る)
+PAIR_SINGLE = 128
+
+# これより短い入力は1記号ずつ読む
+SHORT_INPUT = 32
+
+# プロセス内で読み込み済みの生成モジュール
+_loaded: Dict[str, Dict] = {}
+
+
+def find_trap(compiled: CompiledDfa) -> int:
+    """Return the rejecting state that loops on every column, or -1."""
+    width = compiled.width
+    table = compiled.table
+    for state in range(compiled.num_states):
+        if compiled.is_accept(state):
+            continue
+        row = state * width
+        if all(table[row + column] == state for column in range(width)):
+            return state
+    return -1
+
+
+def automaton_key(compiled: CompiledDfa) -> str:
+    """Hash of everything the generated code depends on."""
+    digest = hashlib.sha256()
+    digest.update(repr((
+        GENERATOR_VERSION,
+        MAX_PAIR_ENTRIES,
+        PAIR_SINGLE,
+        SHORT_INPUT,
+        _PAIR_FUNCTIONS,
+        _SINGLE_FUNCTIONS,
+        _DICT_FUNCTIONS,
+        sys.implementation.cache_tag,
+        sys.byteorder,
+        compiled.num_states,
+        compiled.width,
+        compiled.start_state,
+        sorted(compiled.symbol_ids.items()),
+        [state for state in range(compiled.num_states) if compiled.is_accept(state)],
+    )).encode('utf-8'))
+    digest.update(bytes(memoryview(compiled.table).cast('B')))
+    return digest.hexdigest()
+
+
+def _literal(values: List[int]) -> str:
+    if not values:
+        return '()'
+    lines = [', '.join(map(str, values[index:index + 32])) for index in range(0, len(values), 32)]
+    return '(\n    ' + ',\n    '.join(lines) + ',\n)'
+
+
+def generate_source(compiled: CompiledDfa) -> str:
+    """Return the source of a module defining ``accepts(case)`` and ``run(case)`` for one DFA.
+
+    ``run`` returns (state ID, completed) like ``CompiledDfa.run``;
+    ``accepts`` returns the acceptance DfaSimulator reports, judged on the
+    state before a missing transition.
+    """
+    width = compiled.width
+    table = compiled.table
+    count = compiled.num_states
+    trap = find_trap(compiled)
+
+    # 2記号ずつ読む場合、列番号の組 (下位バイトが列番号 < width) の使わない位置
+    # PAIR_SINGLE + 列 に1記号ずつの遷移も置く
+    stride = max(256 * (width - 1) + width, PAIR_SINGLE + width)
+    pairs = compiled.class_map is not None and width <= PAIR_SINGLE and count * stride <= MAX_PAIR_ENTRIES
+    if not pairs:
+        stride = width
+    single = PAIR_SINGLE if pairs else 0
+
+    # 状態は stride の倍数 (行の先頭位置) で表す。遷移なしは -1、トラップ状態への遷移は -2
+    def target(next_state: int) -> int:
+        if next_state < 0:
+            return -1
+        return -2 if next_state == trap else next_state * stride
+
+    step = [-1] * (count * stride)
+    for state in range(count):
+        row = state * stride
+        for column in range(width):
+            step[row + single + column] = target(table[state * width + column])
+
+    if pairs:
+        # step[state + 列の組] -> 2記号後の状態 (途中で止まる組は -1 にして、1記号ずつやり直す)
+        for state in range(count):
+            row = state * stride
+            for first in range(width):
+                middle = table[state * width + first]
+                if middle < 0 or middle == trap:
+                    continue
+                for second in range(width):
+                    last = table[middle * width + second]
+                    if last < 0 or last == trap:
+                        continue
+                    pair = first | second << 8 if sys.byteorder == 'little' else first << 8 | second
+                    step[row + pair] = last * stride
+
+    lines = [
+        f'# dfa_codegen.py version {GENERATOR_VERSION} が生成したコード',
+        '',
+        f'START = {compiled.start_state * stride}',
+        f'TRAP = {trap}',
+        f'ACCEPT = frozenset({_literal([state * stride for state in range(count) if compiled.is_accept(state)])})',
+        f'STEP = {_literal(step)}',
+    ]
+    if compiled.class_map is None:
+        # 列が多すぎて str.translate を使えない場合は辞書で列を引く
+        symbol_ids = {symbol: column for symbol, column in compiled.symbol_ids.items() if len(symbol) == 1}
+        lines.append(f'SYMBOL_IDS = {symbol_ids!r}')
+        lines.append(_DICT_FUNCTIONS.format(stride=stride))
+    else:
+        lines.append(f'CLASS_MAP = SymbolClassMap({dict(compiled.class_map)!r})')
+        lines.append(f'BYTE_CLASSES = {compiled.byte_classes!r}')
+        if pairs:
+            first, second = ('pair & 255', 'pair >> 8') if sys.byteorder == 'little' else ('pair >> 8', 'pair & 255')
+            lines.append(_PAIR_FUNCTIONS.format(
+                stride=stride, single=single, first=first, second=second, short=SHORT_INPUT, no_class=NO_CLASS))
+        else:
+            lines.append(_SINGLE_FUNCTIONS.format(stride=stride, no_class=NO_CLASS))
+    return '\n'.join(lines) + '\n'
+
+
+# 生成する関数のテンプレート
+_ENCODE = """
+    try:
+        encoded = case.encode('latin-1').translate(BYTE_CLASSES)
+    except UnicodeEncodeError:
+        encoded = case.translate(CLASS_MAP).encode('latin-1')
+    stop = encoded.find({no_class})
+    if stop >= 0:
+        encoded = encoded[:stop]"""
+
+_PAIR_FUNCTIONS = """
+
+def accepts(case):""" + _ENCODE + """
+    step = STEP
+    state = START
+    length = len(encoded)
+    if length > {short}:
+        for pair in memoryview(encoded)[:length & ~1].cast('H'):
+            next_state = step[state + pair]
+            if next_state < 0:
+                middle = step[state + {single} + ({first})]
+                if middle < 0:
+                    return middle == -1 and state in ACCEPT
+                return step[middle + {single} + ({second})] == -1 and middle in ACCEPT
+            state = next_state
+        encoded = encoded[length & ~1:]
+    for column in encoded:
+        next_state = step[state + {single} + column]
+        if next_state < 0:
+            return next_state == -1 and state in ACCEPT
+        state = next_state
+    return state in ACCEPT
+
+
+def run(case):""" + _ENCODE + """
+    step = STEP
+    state = START
+    length = len(encoded)
+    if length > {short}:
+        for pair in memoryview(encoded)[:length & ~1].cast('H'):
+            next_state = step[state + pair]
+            if next_state < 0:
+                middle = step[state + {single} + ({first})]
+                if middle == -1:
+                    return state // {stride}, False
+                if middle >= 0:
+                    if step[middle + {single} + ({second})] == -1:
+                        return middle // {stride}, False
+                # 残りは全てトラップ状態のループ
+                return TRAP, stop < 0
+            state = next_state
+        encoded = encoded[length & ~1:]
+    for column in encoded:
+        next_state = step[state + {single} + column]
+        if next_state < 0:
+            if next_state == -1:
+                return state // {stride}, False
+            return TRAP, stop < 0
+        state = next_state
+    return state // {stride}, stop < 0
+"""
+
+_SINGLE_FUNCTIONS = """
+
+def accepts(case):""" + _ENCODE + """
+    step = STEP
+    state = START
+    for column in encoded:
+        next_state = step[state + column]
+        if next_state < 0:
+            # 遷移なしは直前の状態で判定し、トラップ状態は受理しない
+            return next_state == -1 and state in ACCEPT
+        state = next_state
+    return state in ACCEPT
+
+
+def run(case):""" + _ENCODE + """
+    step = STEP
+    state = START
+    for column in encoded:
+        next_state = step[state + column]
+        if next_state < 0:
+            if next_state == -1:
+                return state // {stride}, False
+            # 残りは全てトラップ状態のループ
+            return TRAP, stop < 0
+        state = next_state
+    return state // {stride}, stop < 0
+"""
+
+_DICT_FUNCTIONS = """
+
+def accepts(case):
+    symbol_ids = SYMBOL_IDS
+    step = STEP
+    state = START
+    for char in case:
+        column = symbol_ids.get(char)
+        if column is None:
+            return state in ACCEPT
+        next_state = step[state + column]
+        if next_state < 0:
+            return next_state == -1 and state in ACCEPT
+        state = next_state
+    return state in ACCEPT
+
+
+def run(case):
+    symbol_ids = SYMBOL_IDS
+    step = STEP
+    state = START
+    for position, char in enumerate(case):
+        column = symbol_ids.get(char)
+        if column is None:
+            return state // {stride}, False
+        next_state = step[state + column]
+        if next_state < 0:
+            if next_state == -1:
+                return state // {stride}, False
+            # 残りは全てトラップ状態のループ
+            return TRAP, all(rest in symbol_ids for rest in case[position + 1:])
+        state = next_state
+    return state // {stride}, True
+"""
+
+
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{key}.{sys.implementation.cache_tag}.dfac")
+
+
+def _compile_module(compiled: CompiledDfa, key: str, cache_dir: str):
+    """Return the code object of the generated module, from the disk cache when possible."""
+    path = _cache_path(cache_dir, key) if cache_dir else None
+    if path is not None:
+        try:
+            with open(path, 'rb') as file:
+                return marshal.loads(file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            # キャッシュがない、または壊れている場合は生成し直す
+            pass
+
+    code = compile(generate_source(compiled), f"<dfa_codegen {key[:12]}>", 'exec')
+    if path is not None:
+        # 一時ファイルに書いてから置き換え、他のプロセスが書きかけのファイルを読まないようにする
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(marshal.dumps(code))
+            os.replace(temporary, path)
+        except OSError:
+            pass
+    return code
+
+
+def load_specialized(automaton: Union[CompiledDfa, Dict], cache_dir: str = DEFAULT_CACHE_DIR) -> Dict:
+    """Return the namespace of the generated module (``accepts``, ``run`` and its constants).
+
+    ``automaton`` may be a CompiledDfa, a converter result or a loader
+    config. Pass ``cache_dir=None`` to skip the disk cache.
+    """
+    compiled = as_compiled(automaton)
+    key = automaton_key(compiled)
+    namespace = _loaded.get(key)
+    if namespace is None:
+        namespace = {'SymbolClassMap': SymbolClassMap}
+        exec(_compile_module(compiled, key, cache_dir), namespace)
+        _loaded[key] = namespace
+    return namespace
+
+
+def specialize(automaton: Union[CompiledDfa, Dict], cache_dir: str = DEFAULT_CACHE_DIR) -> Callable[[str], bool]:
+    """Return the generated ``accepts(case) -> bool`` of one DFA."""
+    return load_specialized(automaton, cache_dir)['accepts']
+
+
+def specialize_run(automaton: Union[CompiledDfa, Dict],
+                   cache_dir: str = DEFAULT_CACHE_DIR) -> Callable[[str], Tuple[int, bool]]:
+    """Return the generated ``run(case) -> (state ID, completed)`` of one DFA."""
+    return load_specialized(automaton, cache_dir)['run']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DFAを専用のPythonコードに変換する')
+    parser.add_argument('config', help='DFA設定ファイル(JSONまたはバイナリ形式)')
+    args = parser.parse_args()
+
+    sys.stdout.write(generate_source(load_automaton(args.config)))
+
+
+if __name__ == '__main__':
+    main()
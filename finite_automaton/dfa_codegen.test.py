@@ -0,0 +1,79 @@
+'''
+This module tests the DFA specializer in dfa_codegen.
+'''
+
+import itertools
+import os
+import tempfile
+import unittest
+import dfa_codegen
+from dfa_simulator import CompiledDfa, load_automaton
+from regex_to_nfa import compile_regex
+
+class TestDfaCodegen(unittest.TestCase):
+    '''
+    Test cases for verifying that generated code agrees with CompiledDfa.run.
+    '''
+    def assertSameRuns(self, compiled, cases):
+        namespace = dfa_codegen.load_specialized(compiled, cache_dir=None)
+        for case in cases:
+            state, completed = compiled.run(case)
+            self.assertEqual(namespace['run'](case), (state, completed), case)
+            self.assertEqual(namespace['accepts'](case), compiled.is_accept(state), case)
+
+    def cases(self, alphabet, max_length):
+        for length in range(max_length + 1):
+            for chars in itertools.product(alphabet, repeat=length):
+                yield ''.join(chars)
+
+    def test_configs(self):
+        '''Tests every sample config, including inputs with unknown characters and long inputs.'''
+        for name in ('dfa01.json', 'dfa02.json', 'dfa03.json'):
+            compiled = load_automaton(os.path.join('data', name))
+            alphabet = sorted(compiled.symbol_ids)
+            cases = list(self.cases(alphabet + ['x'], 5))
+            cases += [case * 20 for case in self.cases(alphabet, 3)]
+            self.assertSameRuns(compiled, cases)
+
+    def test_table_layouts(self):
+        '''Tests the one-symbol-at-a-time layouts and the dictionary fallback for wide alphabets.'''
+        compiled = compile_regex('(ab|b)*a?c', {'a', 'b', 'c'})
+        cases = list(self.cases('abcx', 6)) + ['ab' * 50 + 'c', 'ab' * 50 + 'bc', 'b' * 41 + 'aac', 'あ']
+        self.assertSameRuns(compiled, cases)
+
+        maximum = dfa_codegen.MAX_PAIR_ENTRIES
+        dfa_codegen.MAX_PAIR_ENTRIES = 0
+        try:
+            self.assertSameRuns(compiled, cases)
+        finally:
+            dfa_codegen.MAX_PAIR_ENTRIES = maximum
+
+        # 記号ごとに遷移先が異なり、同値類が 255 以上になるDFA
+        symbols = [chr(0x3041 + index) for index in range(300)]
+        transitions = {}
+        for index, symbol in enumerate(symbols):
+            transitions[('q0', symbol)] = 'q1'
+            transitions[('q1', symbol)] = f"p{index}"
+            transitions[(f"p{index}", symbol)] = 'q0'
+        states = {'q0', 'q1'} | {f"p{index}" for index in range(300)}
+        compiled = CompiledDfa.from_config(states, set(symbols), transitions, 'q0', {'q0'})
+        self.assertIsNone(compiled.class_map)
+        self.assertSameRuns(compiled, [''.join(case) for case in self.cases(symbols[:3] + ['x'], 4)])
+
+    def test_disk_cache(self):
+        '''Tests that the cached code object is written once and reused by a later load.'''
+        compiled = load_automaton('data/dfa01.json')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            key = dfa_codegen.automaton_key(compiled)
+            dfa_codegen._loaded.pop(key, None)
+            accepts = dfa_codegen.specialize(compiled, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            dfa_codegen._loaded.pop(key, None)
+            self.assertIsNot(dfa_codegen.specialize(compiled, cache_dir), accepts)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertTrue(accepts('11110000'))
+            self.assertFalse(accepts('00100'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""Module for checking DFA equivalence and language inclusion.
+
+Automata are compared as languages: a missing transition leads to a
+rejecting sink state, so an input that would stop with an error is simply
+not accepted. Both checks return an input that tells the automata apart,
+or None.
+"""
+
+from typing import List, Dict, Tuple, Optional, Union
+from collections import deque
+
+from dfa_simulator import CompiledDfa, as_compiled
+
+
+class _PairAutomaton:
+    """Two DFAs over their joint alphabet, each completed with a rejecting sink.
+
+    Symbols are grouped by their (column in a, column in b) pair, so every
+    class is stepped once; the first symbol of a class stands for it in
+    counterexamples.
+    """
+
+    def __init__(self, a: CompiledDfa, b: CompiledDfa):
+        self.a: CompiledDfa = a
+        self.b: CompiledDfa = b
+
+        classes: Dict[Tuple[int, int], str] = {}
+        for symbol in sorted(set(a.symbol_ids) | set(b.symbol_ids)):
+            classes.setdefault((a.symbol_ids.get(symbol, -1), b.symbol_ids.get(symbol, -1)), symbol)
+        self.columns: List[Tuple[int, int]] = list(classes)
+        self.symbols: List[str] = list(classes.values())
+
+    @staticmethod
+    def step(compiled: CompiledDfa, state: int, column: int) -> int:
+        # 遷移がない場合は受理しない吸い込み状態 (num_states) に移る
+        if column < 0 or state == compiled.num_states:
+            return compiled.num_states
+        next_state = compiled.table[state * compiled.width + column]
+        return next_state if next_state >= 0 else compiled.num_states
+
+    @staticmethod
+    def accepts(compiled: CompiledDfa, state: int) -> bool:
+        return state != compiled.num_states and compiled.is_accept(state)
+
+
+def _path(parents: List[Tuple[int, int]], symbols: List[str], index: int) -> str:
+    chars = []
+    while index > 0:
+        index, column = parents[index]
+        chars.append(symbols[column])
+    return ''.join(reversed(chars))
+
+
+def counterexample(a: Union[CompiledDfa, Dict], b: Union[CompiledDfa, Dict]) -> Optional[str]:
+    """Return an input accepted by exactly one automaton, or None if they are equivalent.
+
+    Hopcroft–Karp: the states of both automata share one union-find
+    structure, and a pair of states is only explored when the pair is not
+    already known to be equivalent. The check takes
+    O((|a| + |b|) · |classes| · α(n)) time.
+    """
+    a, b = as_compiled(a), as_compiled(b)
+    pairs = _PairAutomaton(a, b)
+    step, accepts = pairs.step, pairs.accepts
+    offset = a.num_states + 1
+
+    # 両方のDFAの状態 (吸い込み状態を含む) の union-find
+    parent = list(range(offset + b.num_states + 1))
+
+    def find(state: int) -> int:
+        while parent[state] != state:
+            parent[state] = parent[parent[state]]
+            state = parent[state]
+        return state
+
+    if accepts(a, a.start_state) != accepts(b, b.start_state):
+        return ''
+    parent[find(offset + b.start_state)] = find(a.start_state)
+
+    # 探索した状態の組と、そこへ至る (親の番号, 同値類) の記録
+    visited: List[Tuple[int, int]] = [(a.start_state, b.start_state)]
+    parents: List[Tuple[int, int]] = [(-1, -1)]
+    queue = deque([0])
+    while queue:
+        index = queue.popleft()
+        state_a, state_b = visited[index]
+        for column, (column_a, column_b) in enumerate(pairs.columns):
+            next_a = step(a, state_a, column_a)
+            next_b = step(b, state_b, column_b)
+            root_a, root_b = find(next_a), find(offset + next_b)
+            if root_a == root_b:
+                continue
+            parent[root_b] = root_a
+            visited.append((next_a, next_b))
+            parents.append((index, column))
+            if accepts(a, next_a) != accepts(b, next_b):
+                return _path(parents, pairs.symbols, len(visited) - 1)
+            queue.append(len(visited) - 1)
+    return None
+
+
+def equivalent(a: Union[CompiledDfa, Dict], b: Union[CompiledDfa, Dict]) -> bool:
+    return counterexample(a, b) is None
+
+
+def inclusion_counterexample(a: Union[CompiledDfa, Dict], b: Union[CompiledDfa, Dict]) -> Optional[str]:
+    """Return the shortest input accepted by ``a`` but not by ``b``, or None if L(a) ⊆ L(b).
+
+    Inclusion is not symmetric, so the reachable pairs of the product are
+    searched breadth-first; only pairs the inputs can reach are visited.
+    """
+    a, b = as_compiled(a), as_compiled(b)
+    pairs = _PairAutomaton(a, b)
+    step, accepts = pairs.step, pairs.accepts
+
+    start = (a.start_state, b.start_state)
+    if accepts(a, start[0]) and not accepts(b, start[1]):
+        return ''
+
+    pair_ids: Dict[Tuple[int, int], int] = {start: 0}
+    visited: List[Tuple[int, int]] = [start]
+    parents: List[Tuple[int, int]] = [(-1, -1)]
+    sink_a = a.num_states
+    queue = deque([0])
+    while queue:
+        index = queue.popleft()
+        state_a, state_b = visited[index]
+        for column, (column_a, column_b) in enumerate(pairs.columns):
+            next_a = step(a, state_a, column_a)
+            if next_a == sink_a:
+                # a が受理しなくなった組の先に反例はない
+                continue
+            pair = (next_a, step(b, state_b, column_b))
+            if pair in pair_ids:
+                continue
+            pair_ids[pair] = len(visited)
+            visited.append(pair)
+            parents.append((index, column))
+            if accepts(a, pair[0]) and not accepts(b, pair[1]):
+                return _path(parents, pairs.symbols, len(visited) - 1)
+            queue.append(len(visited) - 1)
+    return None
+
+
+def included(a: Union[CompiledDfa, Dict], b: Union[CompiledDfa, Dict]) -> bool:
+    return inclusion_counterexample(a, b) is None
@@ -0,0 +1,65 @@
+'''
+This module tests the equivalence and inclusion checks in dfa_equivalence.
+'''
+
+import unittest
+from dfa_simulator import ConfigFileLoader, compiled_from_config
+from dfa_minimizer import minimize
+from dfa_equivalence import counterexample, equivalent, inclusion_counterexample, included
+from nfa_to_dfa_converter import NfaToDfaConverter
+from regex_to_nfa import compile_regex
+
+class TestDfaEquivalence(unittest.TestCase):
+    '''
+    Test cases for verifying equivalence, inclusion and their counterexamples.
+    '''
+    def load(self, path):
+        config, is_valid = ConfigFileLoader(path).load_config()
+        self.assertTrue(is_valid)
+        return config
+
+    def assertAccepts(self, compiled, case, expected):
+        state, completed = compiled.run(case)
+        self.assertEqual(completed and compiled.is_accept(state), expected, case)
+
+    def test_loader_config(self):
+        '''Tests a loader config against a regex and against its minimized DFA.'''
+        config = self.load('data/dfa03.json')
+        self.assertTrue(equivalent(config, compile_regex('0[01][01]([01][01])*|1[01]([01][01])*')))
+        self.assertTrue(equivalent(config, minimize(compiled_from_config(config))))
+
+        # 0 で始まる長さ3の文字列を受理しない
+        different = compile_regex('1[01]([01][01])*')
+        case = counterexample(config, different)
+        self.assertIsNotNone(case)
+        self.assertAccepts(compiled_from_config(config), case, True)
+        self.assertAccepts(different, case, False)
+
+    def test_converter_result(self):
+        '''Tests the string-keyed output of NfaToDfaConverter.execute.'''
+        result = NfaToDfaConverter({
+            'states': { 'q0', 'q1', 'q2' },
+            'alphabet_list': { 'a', 'b' },
+            'transition_functions': {
+                ('q0', 'a'): { 'q0', 'q1' },
+                ('q0', 'b'): { 'q0' },
+                ('q1', 'b'): { 'q2' },
+            },
+            'start_state': 'q0',
+            'accept_states': { 'q2' }
+        }).execute()
+        self.assertTrue(equivalent(result, compile_regex('(a|b)*ab')))
+        self.assertEqual(counterexample(result, compile_regex('(a|b)*abb')), 'ab')
+
+    def test_inclusion(self):
+        '''Tests inclusion and that its counterexample is a shortest one.'''
+        self.assertTrue(included(compile_regex('a(ab)*'), compile_regex('(a|b)*')))
+        self.assertFalse(included(compile_regex('(a|b)*'), compile_regex('a(ab)*')))
+        self.assertEqual(inclusion_counterexample(compile_regex('(a|b)*'), compile_regex('a(ab)*')), '')
+        self.assertEqual(inclusion_counterexample(compile_regex('a+'), compile_regex('a|aaa')), 'aa')
+
+        # アルファベットが異なる場合、相手にない記号は受理されない
+        self.assertEqual(inclusion_counterexample(compile_regex('ac'), compile_regex('a(b)?')), 'ac')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""Long-running match server that keeps compiled automata in memory.
+
+Clients connect over TCP or a Unix socket and send newline-delimited JSON
+requests, any number of them without waiting for replies::
+
+    {"id": 1, "config": "data/dfa01.json", "cases": ["100", "0"]}
+
+Each request gets one reply line, in request order::
+
+    {"id": 1, "accepted": [true, false], "errors": []}
+    {"id": 2, "error": "..."}
+
+Example::
+
+    python3 dfa_match_server.py --unix /tmp/dfa.sock
+    python3 dfa_match_server.py --port 8765
+"""
+
+from typing import List, Dict, Tuple, Iterable
+from collections import OrderedDict
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+
+from dfa_simulator import CompiledDfa, load_automaton
+from parallel_dfa_simulator import run_cases
+
+class AutomatonCache:
+    """LRU cache of compiled automata keyed by config path and modification time.
+
+    Editing a config changes its mtime, so the next request reloads it.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries: int = max_entries
+        self.entries: OrderedDict[Tuple[str, int, int], CompiledDfa] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def key(self, path: str) -> Tuple[str, int, int]:
+        real_path = os.path.realpath(path)
+        status = os.stat(real_path)
+        return real_path, status.st_mtime_ns, status.st_size
+
+    async def get(self, path: str) -> CompiledDfa:
+        key = self.key(path)
+        compiled = self.entries.get(key)
+        if compiled is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return compiled
+
+        self.misses += 1
+        # 読み込みは別スレッドで行い、他のクライアントを待たせない
+        compiled = await asyncio.get_running_loop().run_in_executor(None, load_automaton, key[0])
+        self.entries[key] = compiled
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return compiled
+
+
+class MatchServer:
+    """asyncio server answering pipelined, batched match requests."""
+
+    def __init__(self, cache: AutomatonCache = None):
+        self.cache: AutomatonCache = cache or AutomatonCache()
+
+    async def answer(self, line: bytes) -> Dict:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            cases = request.get('cases', [])
+            if not isinstance(cases, list) or not all(isinstance(case, str) for case in cases):
+                raise TypeError('cases は文字列のリストで指定してください')
+            compiled = await self.cache.get(request['config'])
+            # 大きなバッチでも他の接続を止めないよう、判定は別スレッドで行う
+            result = await asyncio.get_running_loop().run_in_executor(None, run_cases, compiled, cases)
+            return {
+                'id': request_id,
+                'accepted': [bool(flag) for flag in result.accepted],
+                'errors': result.error_indices,
+            }
+        except Exception as error:
+            return {'id': request_id, 'error': f"{type(error).__name__}: {error}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.answer(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                # 応答はある程度たまってからまとめて送る
+                if writer.transport.get_write_buffer_size() >= 1 << 16:
+                    await writer.drain()
+            await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = None, unix_path: str = None) -> None:
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path, limit=1 << 24)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=1 << 24)
+        async with server:
+            await server.serve_forever()
+
+
+def request_matches(requests: Iterable[Dict], host: str = '127.0.0.1', port: int = None,
+                    unix_path: str = None) -> List[Dict]:
+    """Send requests to a running server in one pipelined batch and return the replies."""
+    if unix_path:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(unix_path)
+    else:
+        connection = socket.create_connection((host, port))
+
+    requests = list(requests)
+
+    def send(stream) -> None:
+        for request in requests:
+            stream.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        stream.flush()
+        connection.shutdown(socket.SHUT_WR)
+
+    # 送信と受信を並行して行い、大きなバッチでもソケットのバッファで詰まらないようにする
+    with connection, connection.makefile('wb') as output, connection.makefile('rb') as replies:
+        sender = threading.Thread(target=send, args=(output,))
+        sender.start()
+        responses = [json.loads(replies.readline()) for _ in requests]
+        sender.join()
+        return responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DFAの判定サーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help='TCPの代わりにUnixソケットで待ち受ける')
+    parser.add_argument('--cache-size', type=int, default=64, help='メモリに保持するオートマトンの数')
+    args = parser.parse_args()
+
+    server = MatchServer(AutomatonCache(args.cache_size))
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
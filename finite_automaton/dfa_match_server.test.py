@@ -0,0 +1,53 @@
+'''
+This module tests request handling in dfa_match_server.
+'''
+
+import asyncio
+import json
+import unittest
+from dfa_match_server import MatchServer
+
+class TestMatchServer(unittest.TestCase):
+    '''
+    Test cases for verifying the replies of MatchServer.answer.
+    '''
+    def answer(self, request):
+        return asyncio.run(MatchServer().answer(json.dumps(request).encode('utf-8')))
+
+    def test_answer(self):
+        '''Tests a batch that includes a case stopping on a missing transition.'''
+        response = self.answer({'id': 1, 'config': 'data/dfa01.json', 'cases': ['100', '00100', '1x', '']})
+        self.assertEqual(response['id'], 1)
+        self.assertEqual(len(response['accepted']), 4)
+        self.assertEqual(response['errors'], [2])
+
+    def test_invalid_cases(self):
+        '''Tests that cases other than a list of strings are rejected with an error reply.'''
+        for cases in ('10', ['1', 0], {'case': '1'}, None):
+            response = self.answer({'id': 2, 'config': 'data/dfa01.json', 'cases': cases})
+            self.assertEqual(response['id'], 2)
+            self.assertIn('error', response)
+            self.assertNotIn('accepted', response)
+
+    def test_concurrent_batches(self):
+        '''Tests that a small request is answered while a large batch is still running.'''
+        async def run():
+            server = MatchServer()
+            await server.cache.get('data/dfa01.json')
+            large = json.dumps({'id': 'large', 'config': 'data/dfa01.json', 'cases': ['01' * 500] * 4000})
+            small = json.dumps({'id': 'small', 'config': 'data/dfa01.json', 'cases': ['100']})
+            order = []
+
+            async def answer(line):
+                order.append((await server.answer(line.encode('utf-8')))['id'])
+
+            large_task = asyncio.ensure_future(answer(large))
+            await asyncio.sleep(0)
+            await answer(small)
+            await large_task
+            return order
+
+        self.assertEqual(asyncio.run(run()), ['small', 'large'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""Module for minimizing compiled DFAs with Hopcroft's algorithm."""
+
+from typing import List, Set, Dict, Tuple
+from array import array
+
+from dfa_simulator import CompiledDfa
+
+def reachable_states(compiled: CompiledDfa) -> List[int]:
+    """Return the states reachable from the start state in breadth-first order."""
+    table = compiled.table
+    width = compiled.width
+    seen = {compiled.start_state}
+    order = [compiled.start_state]
+    for state in order:
+        for next_state in table[state * width:(state + 1) * width]:
+            if next_state >= 0 and next_state not in seen:
+                seen.add(next_state)
+                order.append(next_state)
+    return order
+
+
+def remove_unreachable(compiled: CompiledDfa) -> CompiledDfa:
+    """Drop every state that the start state cannot reach."""
+    order = reachable_states(compiled)
+    return _rebuild(compiled, [[state] for state in order])
+
+
+def minimize(compiled: CompiledDfa) -> CompiledDfa:
+    """Return the minimal DFA equivalent to ``compiled``.
+
+    Unreachable states are removed first and the rest are merged with
+    Hopcroft's partition refinement in O(n·|Σ|·log n). A missing transition is
+    modelled as a move into a separate error block, so merged states also
+    agree on where a run stops and DfaSimulator reports the same results.
+    """
+    order = reachable_states(compiled)
+    count = len(order)
+    width = compiled.width
+    table = compiled.table
+    renumber = {state: index for index, state in enumerate(order)}
+    error = count
+
+    # inverse[column][state] -> states that move into ``state`` on ``column``
+    inverse: List[List[List[int]]] = [[[] for _ in range(count + 1)] for _ in range(width)]
+    for index, state in enumerate(order):
+        row = state * width
+        for column in range(width):
+            next_state = table[row + column]
+            inverse[column][renumber[next_state] if next_state >= 0 else error].append(index)
+    for column in range(width):
+        inverse[column][error].append(error)
+
+    accepting = {index for index, state in enumerate(order) if compiled.is_accept(state)}
+    rejecting = set(range(count)) - accepting
+    blocks: List[Set[int]] = [block for block in (accepting, rejecting) if block]
+    blocks.append({error})
+    block_of = [0] * (count + 1)
+    for index, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = index
+
+    # 最も大きいブロック以外を分割者としてキューに入れる
+    largest = max(range(len(blocks)), key=lambda index: len(blocks[index]))
+    waiting: Set[Tuple[int, int]] = {
+        (index, column) for index in range(len(blocks)) if index != largest for column in range(width)
+    }
+
+    while waiting:
+        splitter, column = waiting.pop()
+        predecessors: Dict[int, List[int]] = {}
+        for state in blocks[splitter]:
+            for source in inverse[column][state]:
+                predecessors.setdefault(block_of[source], []).append(source)
+
+        for index, members in predecessors.items():
+            block = blocks[index]
+            if len(members) == len(block):
+                continue
+
+            # 分割者に遷移する状態を新しいブロックに移す
+            new_index = len(blocks)
+            new_block = set(members)
+            block.difference_update(new_block)
+            blocks.append(new_block)
+            for state in new_block:
+                block_of[state] = new_index
+
+            for split_column in range(width):
+                if (index, split_column) in waiting:
+                    waiting.add((new_index, split_column))
+                elif len(new_block) <= len(block):
+                    waiting.add((new_index, split_column))
+                else:
+                    waiting.add((index, split_column))
+
+    # 開始状態から幅優先の順にブロックを並べ直す (エラーブロックは除く)
+    start_block = block_of[0]
+    block_order = [start_block]
+    block_ids = {start_block: 0}
+    for block in block_order:
+        representative = min(blocks[block])
+        row = order[representative] * width
+        for column in range(width):
+            next_state = table[row + column]
+            if next_state < 0:
+                continue
+            next_block = block_of[renumber[next_state]]
+            if next_block not in block_ids:
+                block_ids[next_block] = len(block_order)
+                block_order.append(next_block)
+
+    return _rebuild(compiled, [sorted(order[state] for state in blocks[block]) for block in block_order])
+
+
+def _rebuild(compiled: CompiledDfa, groups: List[List[int]]) -> CompiledDfa:
+    """Build a CompiledDfa whose state ``i`` stands for the original states in ``groups[i]``.
+
+    Every state in a group must behave the same; the first one is used as the
+    representative and gives the new state its name. Columns that became
+    identical after merging states are merged as well.
+    """
+    width = compiled.width
+    old_table = compiled.table
+    group_of = {state: index for index, group in enumerate(groups) for state in group}
+
+    table = array('i', [-1]) * (len(groups) * width)
+    accept_bitmap = bytearray((len(groups) + 7) >> 3)
+    for index, group in enumerate(groups):
+        representative = group[0]
+        row = representative * width
+        for column in range(width):
+            next_state = old_table[row + column]
+            if next_state >= 0:
+                table[index * width + column] = group_of[next_state]
+        if compiled.is_accept(representative):
+            accept_bitmap[index >> 3] |= 1 << (index & 7)
+
+    return CompiledDfa(
+        [compiled.state_names[group[0]] for group in groups],
+        dict(compiled.symbol_ids),
+        width,
+        table,
+        group_of[compiled.start_state],
+        accept_bitmap).compress_alphabet()
@@ -0,0 +1,67 @@
+'''
+This module tests the DFA minimization in dfa_minimizer.
+'''
+
+import unittest
+from dfa_simulator import CompiledDfa, ConfigFileLoader
+from dfa_minimizer import minimize, remove_unreachable
+
+class TestDfaMinimizer(unittest.TestCase):
+    '''
+    Test cases for verifying that minimization merges equivalent states only.
+    '''
+    def load(self, path):
+        config, is_valid = ConfigFileLoader(path).load_config()
+        self.assertTrue(is_valid)
+        return CompiledDfa.from_config(
+            config['states'],
+            config['alphabet_list'],
+            config['transition_function'],
+            config['start_state'],
+            config['accept_states'])
+
+    def assertSameResults(self, compiled, minimized, cases):
+        for case in cases:
+            state, completed = compiled.run(case)
+            minimized_state, minimized_completed = minimized.run(case)
+            self.assertEqual(completed, minimized_completed, case)
+            self.assertEqual(compiled.is_accept(state), minimized.is_accept(minimized_state), case)
+
+    def test_equivalent_states(self):
+        '''Tests that the equivalent pairs of dfa03 are merged.'''
+        compiled = self.load('data/dfa03.json')
+        minimized = minimize(compiled)
+
+        # q3/q5 と q4/q6 はそれぞれ同じ振る舞いをする
+        self.assertEqual(compiled.num_states, 6)
+        self.assertEqual(minimized.num_states, 4)
+        self.assertEqual(minimized.state_names[minimized.start_state], 'q1')
+
+        cases = [format(number, 'b')[1:] for number in range(1, 1 << 9)]
+        self.assertSameResults(compiled, minimized, cases)
+
+    def test_already_minimal(self):
+        '''Tests that a minimal DFA keeps all of its states.'''
+        compiled = self.load('data/dfa02.json')
+        self.assertEqual(minimize(compiled).num_states, compiled.num_states)
+
+    def test_unreachable_and_missing_transitions(self):
+        '''Tests removal of unreachable states and that missing transitions still stop the run.'''
+        states = { 'q1', 'q2', 'q3', 'q4' }
+        transitions = {
+            ('q1', 'a'): 'q2',
+            ('q2', 'a'): 'q2',
+            ('q2', 'b'): 'q1',
+            ('q3', 'a'): 'q3',
+            ('q4', 'a'): 'q1',
+        }
+        compiled = CompiledDfa.from_config(states, { 'a', 'b' }, transitions, 'q1', { 'q2', 'q4' })
+
+        self.assertEqual(remove_unreachable(compiled).num_states, 2)
+
+        minimized = minimize(compiled)
+        self.assertEqual(minimized.num_states, 2)
+        self.assertSameResults(compiled, minimized, ['', 'a', 'b', 'ab', 'abb', 'aab', 'aaba', 'ba'])
+
+if __name__ == '__main__':
+    unittest.main()
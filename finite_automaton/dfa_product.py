@@ -0,0 +1,253 @@
+"""Module for running several DFAs over the same inputs in a single pass.
+
+The product automaton of K DFAs is built lazily: a product state is the
+tuple of the component states, and its transitions are computed the first
+time they are taken and memoized in a flat table. Only product states that
+the inputs actually reach are ever created.
+
+Example::
+
+    python3 dfa_product.py data/dfa01.json data/dfa02.json data/dfa03.json --stream cases.txt
+    python3 dfa_product.py data/dfa01.json data/dfa03.json --stream - --mode all
+"""
+
+from typing import List, Dict, Tuple, Callable, Iterable
+from array import array
+import argparse
+import json
+import sys
+
+from dfa_simulator import CompiledDfa, SymbolClassMap, NO_CLASS, read_cases, load_automaton
+from result_sink import SimulationResult
+
+class ProductDfa:
+    """Lazy product of several CompiledDfa.
+
+    A component that stops on a missing transition in state ``s`` is frozen
+    as ``~s`` for the rest of the input, so its acceptance is judged on the
+    state before the failure exactly as in DfaSimulator. When more than
+    ``max_states`` product states have been built the memo is cleared and
+    rebuilt from the states that are reached afterwards.
+    """
+
+    def __init__(self, automata: Iterable[CompiledDfa], max_states: int = 1 << 16):
+        self.automata: List[CompiledDfa] = list(automata)
+        self.max_states: int = max_states
+
+        # 記号 -> 各DFAの列番号の組 (アルファベットにない場合は -1) を同値類にまとめる
+        symbols = set()
+        for compiled in self.automata:
+            symbols.update(compiled.symbol_ids)
+        classes: Dict[Tuple[int, ...], int] = {}
+        self.symbol_ids: Dict[str, int] = {}
+        for symbol in sorted(symbols):
+            columns = tuple(compiled.symbol_ids.get(symbol, -1) for compiled in self.automata)
+            self.symbol_ids[symbol] = classes.setdefault(columns, len(classes))
+        self.class_columns: List[Tuple[int, ...]] = list(classes)
+        self.width: int = len(classes)
+
+        self.class_map: SymbolClassMap = None
+        if self.width < NO_CLASS:
+            self.class_map = SymbolClassMap(
+                (ord(symbol), column) for symbol, column in self.symbol_ids.items() if len(symbol) == 1)
+
+        # 積状態ID -> 各DFAの状態の組
+        self.states: List[Tuple[int, ...]] = []
+        self.state_ids: Dict[Tuple[int, ...], int] = {}
+
+        # table[state * width + column] -> 遷移先の積状態ID (未計算は -1)
+        self.table: array = array('i')
+
+        # 積状態ID -> 各DFAの受理の組 (未計算は None)
+        self._flags: List[Tuple[bool, ...]] = []
+
+        self.resets: int = 0
+        self.start_state: int = self._intern(tuple(compiled.start_state for compiled in self.automata))
+
+    def _intern(self, components: Tuple[int, ...]) -> int:
+        state = self.state_ids.get(components)
+        if state is None:
+            state = len(self.states)
+            self.state_ids[components] = state
+            self.states.append(components)
+            self.table.extend(array('i', [-1]) * self.width)
+            self._flags.append(None)
+        return state
+
+    def _reset(self) -> None:
+        """Forget every memoized product state except the start state."""
+        start = self.states[self.start_state]
+        self.states.clear()
+        self.state_ids.clear()
+        del self.table[:]
+        self._flags.clear()
+        self.resets += 1
+        self.start_state = self._intern(start)
+
+    def _expand(self, state: int, column: int) -> int:
+        """Compute, memoize and return the product transition of ``state`` on a class."""
+        components = self.states[state]
+        next_components = []
+        for compiled, component, symbol_column in zip(self.automata, components, self.class_columns[column]):
+            if component < 0:
+                # 停止済みのDFAはそのまま
+                next_components.append(component)
+                continue
+            next_state = compiled.table[component * compiled.width + symbol_column] if symbol_column >= 0 else -1
+            next_components.append(next_state if next_state >= 0 else ~component)
+        next_components = tuple(next_components)
+
+        if len(self.states) >= self.max_states and next_components not in self.state_ids:
+            self._reset()
+            return self._intern(next_components)
+        next_state = self._intern(next_components)
+        self.table[state * self.width + column] = next_state
+        return next_state
+
+    def _stop_all(self, state: int) -> int:
+        """Product state after a character that no DFA knows: every component stops."""
+        return self._intern(tuple(component if component < 0 else ~component for component in self.states[state]))
+
+    def run(self, case: str, state: int = None) -> int:
+        """Run one input through every DFA at once and return the product state ID.
+
+        IDs are only valid until the next call when the memo is cleared.
+        """
+        if state is None:
+            state = self.start_state
+        table = self.table
+        width = self.width
+        expand = self._expand
+
+        if self.class_map is not None:
+            encoded = case.translate(self.class_map).encode('latin-1')
+            stop = encoded.find(NO_CLASS)
+            for column in (encoded if stop < 0 else encoded[:stop]):
+                next_state = table[state * width + column]
+                if next_state < 0:
+                    next_state = expand(state, column)
+                state = next_state
+            return state if stop < 0 else self._stop_all(state)
+
+        symbol_ids = self.symbol_ids
+        for char in case:
+            column = symbol_ids.get(char)
+            if column is None:
+                return self._stop_all(state)
+            next_state = table[state * width + column]
+            if next_state < 0:
+                next_state = expand(state, column)
+            state = next_state
+        return state
+
+    def results(self, state: int) -> List[Tuple[bool, bool]]:
+        """Return (accepted, completed) of every DFA in a product state."""
+        return [
+            (compiled.is_accept(component), True) if component >= 0 else (compiled.is_accept(~component), False)
+            for compiled, component in zip(self.automata, self.states[state])
+        ]
+
+    def flags(self, state: int) -> Tuple[bool, ...]:
+        """Return the acceptance of every DFA in a product state (memoized)."""
+        flags = self._flags[state]
+        if flags is None:
+            flags = tuple(accepted for accepted, _ in self.results(state))
+            self._flags[state] = flags
+        return flags
+
+    def accepts(self, case: str) -> Tuple[bool, ...]:
+        """Return whether each DFA accepts the input."""
+        return self.flags(self.run(case))
+
+    def execute(self, cases: Iterable[str]) -> List[SimulationResult]:
+        """Run every case once and return one SimulationResult per DFA."""
+        outputs = [SimulationResult() for _ in self.automata]
+        for case in cases:
+            for output, (accepted, completed) in zip(outputs, self.results(self.run(case))):
+                output.append(accepted, completed)
+        return outputs
+
+    def automaton(self, index: int) -> 'ProductCombination':
+        """Combination that accepts what the ``index``-th DFA accepts."""
+        return ProductCombination(self, lambda flags: flags[index])
+
+    def intersection(self) -> 'ProductCombination':
+        return ProductCombination(self, all)
+
+    def union(self) -> 'ProductCombination':
+        return ProductCombination(self, any)
+
+
+class ProductCombination:
+    """Boolean combination of the DFAs of a ProductDfa.
+
+    Combinations compose with ``&``, ``|`` and ``~``. The combined acceptance
+    only depends on the per-DFA flags, so it is memoized per flag tuple and
+    the full product is never materialized::
+
+        combination = product.automaton(0) & ~product.automaton(1)
+        combination.accepts('0101')
+    """
+
+    def __init__(self, product: ProductDfa, function: Callable[[Tuple[bool, ...]], bool]):
+        self.product: ProductDfa = product
+        self.function: Callable[[Tuple[bool, ...]], bool] = function
+        self._memo: Dict[Tuple[bool, ...], bool] = {}
+
+    def __and__(self, other: 'ProductCombination') -> 'ProductCombination':
+        return ProductCombination(self.product, lambda flags: self.function(flags) and other.function(flags))
+
+    def __or__(self, other: 'ProductCombination') -> 'ProductCombination':
+        return ProductCombination(self.product, lambda flags: self.function(flags) or other.function(flags))
+
+    def __invert__(self) -> 'ProductCombination':
+        return ProductCombination(self.product, lambda flags: not self.function(flags))
+
+    def accepts(self, case: str) -> bool:
+        flags = self.product.accepts(case)
+        accepted = self._memo.get(flags)
+        if accepted is None:
+            accepted = bool(self.function(flags))
+            self._memo[flags] = accepted
+        return accepted
+
+    def execute(self, cases: Iterable[str]) -> List[bool]:
+        return [self.accepts(case) for case in cases]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='複数のDFAを1回の走査で実行する')
+    parser.add_argument('configs', nargs='+', help='DFA設定ファイル(JSONまたはバイナリ形式)')
+    parser.add_argument('--stream', metavar='FILE', default='-',
+                        help='テストケースを1行ずつ読み込むファイル ("-" で標準入力)')
+    parser.add_argument('--mode', choices=['each', 'all', 'any'], default='each',
+                        help='each: DFAごとの結果, all: 全てのDFAが受理, any: いずれかのDFAが受理')
+    args = parser.parse_args()
+
+    product = ProductDfa(load_automaton(path) for path in args.configs)
+    combination = None
+    if args.mode == 'all':
+        combination = product.intersection()
+    elif args.mode == 'any':
+        combination = product.union()
+
+    stream = sys.stdin if args.stream == '-' else open(args.stream, 'r')
+    try:
+        for case in read_cases(stream):
+            if combination is not None:
+                record = {'case': case, 'accepted': combination.accepts(case)}
+            else:
+                results = product.results(product.run(case))
+                record = {
+                    'case': case,
+                    'accepted': [accepted for accepted, _ in results],
+                    'errors': [index for index, (_, completed) in enumerate(results) if not completed],
+                }
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+if __name__ == '__main__':
+    main()
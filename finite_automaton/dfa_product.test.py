@@ -0,0 +1,75 @@
+'''
+This module tests the lazy product automaton in dfa_product.
+'''
+
+import unittest
+from automaton_generator import random_compiled_dfa, noisy_inputs
+from dfa_simulator import DfaSimulator, load_automaton
+from dfa_product import ProductDfa
+
+class TestProductDfa(unittest.TestCase):
+    '''
+    Test cases for verifying that one pass over the product gives every DFA's own results.
+    '''
+    def setUp(self):
+        self.automata = [load_automaton(f'data/dfa0{index}.json') for index in (1, 2, 3)]
+        self.automata += [
+            random_compiled_dfa(0, 6, list('01a'), 0.5, missing=0.1),
+            random_compiled_dfa(1, 6, list('ab'), 0.5, missing=0.1),
+        ]
+        self.cases = noisy_inputs(2, list('01'), list('ab?'), 400, 20, 0.1)
+        self.cases += ['', '?', 'a', 'b', '0?1']
+
+    def assertSameAsSimulator(self, product, cases):
+        outputs = product.execute(cases)
+        self.assertEqual(len(outputs), len(product.automata))
+        for compiled, output in zip(product.automata, outputs):
+            expected = DfaSimulator.from_compiled(compiled, cases).execute()
+            self.assertEqual(list(output.accepted), list(expected.accepted))
+            self.assertEqual(output.error_indices, expected.error_indices)
+
+    def test_execute(self):
+        '''Tests ProductDfa.execute against DfaSimulator.execute for each DFA.'''
+        product = ProductDfa(self.automata)
+        self.assertSameAsSimulator(product, self.cases)
+        self.assertEqual(product.resets, 0)
+
+    def test_reset(self):
+        '''Tests that clearing the memo at max_states does not change any result.'''
+        product = ProductDfa(self.automata, max_states=4)
+        self.assertSameAsSimulator(product, self.cases)
+        self.assertGreater(product.resets, 0)
+        self.assertLessEqual(len(product.states), 4 + 1)
+
+    def test_wide_alphabet(self):
+        '''Tests the path without a translation table when there are too many classes.'''
+        alphabet = [chr(0x3000 + code) for code in range(300)]
+        automata = [
+            random_compiled_dfa(3, 6, alphabet, 0.5, missing=0.3),
+            random_compiled_dfa(4, 6, alphabet[:150] + ['0', '1'], 0.5, missing=0.1),
+        ]
+        product = ProductDfa(automata)
+        self.assertIsNone(product.class_map)
+        cases = noisy_inputs(5, alphabet, ['0', '?'], 300, 6, 0.1)
+        self.assertSameAsSimulator(product, cases)
+
+    def test_combinations(self):
+        '''Tests ~, & and | combinations against the per-DFA flags.'''
+        for max_states in (1 << 16, 3):
+            product = ProductDfa(self.automata, max_states=max_states)
+            a, b, c = product.automaton(0), product.automaton(1), product.automaton(3)
+            combinations = [
+                (a & ~b, lambda flags: flags[0] and not flags[1]),
+                (~(a & c), lambda flags: not (flags[0] and flags[3])),
+                (~a | (b & c), lambda flags: not flags[0] or (flags[1] and flags[3])),
+                (product.intersection(), all),
+                (product.union(), any),
+            ]
+            for case in self.cases:
+                flags = tuple(compiled.is_accept(compiled.run(case)[0]) for compiled in self.automata)
+                self.assertEqual(product.accepts(case), flags, case)
+                for combination, function in combinations:
+                    self.assertEqual(combination.accepts(case), function(flags), case)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,338 @@
+"""Module for grep-like scanning of bytes and mmap'd files with a compiled DFA.
+
+The input is never decoded: byte ``b`` stands for the symbol ``chr(b)``, so
+DFAs over ASCII (or Latin-1) symbols can be searched for directly. Symbols
+that are not a single such character never match.
+
+Example::
+
+    python3 dfa_scanner.py app.log --regex 'ERROR [0-9]+' --spans
+    python3 dfa_scanner.py app.log --config data/dfa01.json --first
+"""
+
+from typing import List, Dict, Tuple, Iterator, Optional
+from array import array
+import argparse
+import mmap
+import re
+import sys
+
+from dfa_simulator import CompiledDfa, load_automaton
+from nfa_to_dfa_converter import NfaToDfaConverter
+from instrumentation import dead_states
+
+# 1バイトで表せる記号
+BYTE_SYMBOLS = [chr(code) for code in range(256)]
+
+# 走査用の状態フラグ
+ACCEPT = 1
+SKIP = 2
+
+def byte_columns(compiled: CompiledDfa) -> List[int]:
+    """Return the column of every byte value (-1 when the byte is not a symbol)."""
+    return [compiled.symbol_ids.get(symbol, -1) for symbol in BYTE_SYMBOLS]
+
+
+def _class_symbols(compiled: CompiledDfa) -> List[List[str]]:
+    """Column -> the single-byte symbols that use it."""
+    symbols: List[List[str]] = [[] for _ in range(compiled.width)]
+    for symbol, column in compiled.symbol_ids.items():
+        if len(symbol) == 1 and ord(symbol) < 256:
+            symbols[column].append(symbol)
+    return symbols
+
+
+def unanchored_dfa(compiled: CompiledDfa) -> CompiledDfa:
+    """DFA for Σ*·L: it accepts after every byte where a match of ``compiled`` ends.
+
+    Built as an NFA with a looping start state and an ε-edge into the
+    original start state, then converted and minimized.
+    """
+    symbols = _class_symbols(compiled)
+    transitions: Dict[Tuple[str, str], set] = {('u', symbol): {'u'} for symbol in BYTE_SYMBOLS}
+    transitions[('u', 'ε')] = {f"s{compiled.start_state}"}
+    for state in range(compiled.num_states):
+        row = state * compiled.width
+        for column in range(compiled.width):
+            next_state = compiled.table[row + column]
+            if next_state >= 0:
+                for symbol in symbols[column]:
+                    transitions[(f"s{state}", symbol)] = {f"s{next_state}"}
+
+    config = {
+        'states': {'u'} | {f"s{state}" for state in range(compiled.num_states)},
+        'alphabet_list': BYTE_SYMBOLS,
+        'transition_functions': transitions,
+        'start_state': 'u',
+        'accept_states': {f"s{state}" for state in range(compiled.num_states) if compiled.is_accept(state)},
+    }
+    return NfaToDfaConverter(config).to_compiled_dfa(minimize=True)
+
+
+def prefix_reverse_dfa(compiled: CompiledDfa) -> CompiledDfa:
+    """DFA for the reversal of the prefixes of L.
+
+    Run backwards from a match end, it accepts at every position where the
+    text up to that end can still be extended into a match.
+    """
+    symbols = _class_symbols(compiled)
+    dead = dead_states(compiled)
+    live = [state for state in range(compiled.num_states) if not dead[state]]
+
+    transitions: Dict[Tuple[str, str], set] = {('r', 'ε'): {f"s{state}" for state in live}}
+    for state in live:
+        row = state * compiled.width
+        for column in range(compiled.width):
+            next_state = compiled.table[row + column]
+            if next_state >= 0 and not dead[next_state]:
+                for symbol in symbols[column]:
+                    transitions.setdefault((f"s{next_state}", symbol), set()).add(f"s{state}")
+
+    config = {
+        'states': {'r'} | {f"s{state}" for state in live},
+        'alphabet_list': BYTE_SYMBOLS,
+        'transition_functions': transitions,
+        'start_state': 'r',
+        'accept_states': {f"s{compiled.start_state}"} if not dead[compiled.start_state] else set(),
+    }
+    return NfaToDfaConverter(config).to_compiled_dfa(minimize=True)
+
+
+class DfaScanner:
+    """Finds the matches of a CompiledDfa inside bytes, memoryviews or mmaps.
+
+    The search runs the unanchored DFA block by block over
+    ``bytes.translate``-d class numbers. States that loop on most bytes
+    without accepting (like the start state of a sparse pattern) jump to the
+    next byte that leaves them with a compiled ``re`` character class, which
+    runs at C speed.
+    """
+
+    def __init__(self, compiled: CompiledDfa, block_size: int = 1 << 20):
+        self.compiled: CompiledDfa = compiled
+        self.block_size: int = block_size
+        self.forward: CompiledDfa = unanchored_dfa(compiled)
+
+        # 状態 -> ACCEPT / SKIP のフラグ、SKIP の状態から抜けるバイトを探す正規表現
+        forward = self.forward
+        self._flags: bytearray = bytearray(forward.num_states)
+        self._skippers: List[Optional[re.Pattern]] = [None] * forward.num_states
+        for state in range(forward.num_states):
+            if forward.is_accept(state):
+                self._flags[state] = ACCEPT
+            elif forward.byte_classes is not None:
+                self._skippers[state] = self._skipper(state)
+                if self._skippers[state] is not None:
+                    self._flags[state] = SKIP
+
+        # アンカー付きの実行と逆向きの実行では、受理状態に到達できない状態で打ち切る
+        self._columns: List[int] = byte_columns(compiled)
+        self._dead: List[bool] = dead_states(compiled)
+        self._reverse: CompiledDfa = None
+        self._reverse_columns: List[int] = None
+        self._reverse_dead: List[bool] = None
+
+    def _skipper(self, state: int) -> Optional[re.Pattern]:
+        forward = self.forward
+        row = state * forward.width
+        leaving = [column for column in range(forward.width) if forward.table[row + column] != state]
+        staying = sum(1 for column in forward.byte_classes if forward.table[row + column] == state)
+        if staying < 128:
+            return None
+        if not leaving:
+            # どのバイトでも抜けない状態
+            return re.compile(b'(?!)')
+        return re.compile(b'[' + b''.join(re.escape(bytes([column])) for column in leaving) + b']')
+
+    def _encode(self, block) -> bytes:
+        forward = self.forward
+        if forward.byte_classes is not None:
+            return bytes(block).translate(forward.byte_classes)
+        columns = byte_columns(forward)
+        return array('i', (columns[byte] for byte in bytes(block)))
+
+    def end_offsets(self, data, start: int = 0, end: int = None) -> Iterator[int]:
+        """Yield every offset in ``data[start:end]`` where a match ends (overlapping matches included)."""
+        forward = self.forward
+        table = forward.table
+        width = forward.width
+        flags = self._flags
+        skippers = self._skippers
+        if end is None:
+            end = len(data)
+
+        state = forward.start_state
+        if flags[state] & ACCEPT:
+            yield start
+
+        # 最初は小さいブロックから始め、一致が近くにある場合の変換を少なくする
+        size = 4096
+        block_start = start
+        while block_start < end:
+            block_end = min(block_start + size, end)
+            size = min(size * 2, self.block_size)
+            encoded = self._encode(data[block_start:block_end])
+            view = memoryview(encoded)
+            position = 0
+            length = len(encoded)
+            while position < length:
+                skipper = skippers[state]
+                if skipper is not None:
+                    found = skipper.search(encoded, position)
+                    if found is None:
+                        break
+                    position = found.start()
+                for column in view[position:]:
+                    position += 1
+                    state = table[state * width + column]
+                    flag = flags[state]
+                    if flag:
+                        if flag & ACCEPT:
+                            yield block_start + position
+                        else:
+                            break
+            block_start = block_end
+
+    def first_end(self, data, start: int = 0) -> Optional[int]:
+        """Return the end offset of the first match, stopping the scan there."""
+        return next(self.end_offsets(data, start), None)
+
+    def _longest_from(self, data, start: int) -> Optional[int]:
+        """Run the DFA anchored at ``start`` and return the end of the longest match."""
+        compiled = self.compiled
+        table = compiled.table
+        width = compiled.width
+        columns = self._columns
+        dead = self._dead
+        state = compiled.start_state
+        longest = start if compiled.is_accept(state) else None
+        position = start
+        with memoryview(data) as view, view[start:] as rest:
+            for byte in rest:
+                column = columns[byte]
+                if column < 0:
+                    break
+                state = table[state * width + column]
+                if state < 0 or dead[state]:
+                    break
+                position += 1
+                if compiled.is_accept(state):
+                    longest = position
+        return longest
+
+    def _leftmost_longest(self, data, low: int, match_end: int) -> Tuple[int, int]:
+        """Leftmost-longest match given the earliest match end at or after ``low``.
+
+        Every match that starts no later than the leftmost one ending at
+        ``match_end`` must be a live prefix at ``match_end``; those starts are
+        found by running the reversed prefix DFA backwards, and the first of
+        them with a match gives the span.
+        """
+        if self._reverse is None:
+            self._reverse = prefix_reverse_dfa(self.compiled)
+            self._reverse_columns = byte_columns(self._reverse)
+            self._reverse_dead = dead_states(self._reverse)
+        reverse = self._reverse
+        columns = self._reverse_columns
+        dead = self._reverse_dead
+
+        state = reverse.start_state
+        candidates = [match_end] if reverse.is_accept(state) else []
+        position = match_end
+        while position > low:
+            column = columns[data[position - 1]]
+            if column < 0:
+                break
+            state = reverse.table[state * reverse.width + column]
+            if state < 0 or dead[state]:
+                break
+            position -= 1
+            if reverse.is_accept(state):
+                candidates.append(position)
+
+        for match_start in reversed(candidates):
+            longest = self._longest_from(data, match_start)
+            if longest is not None:
+                return match_start, longest
+        raise AssertionError('一致の開始位置が見つかりません')
+
+    def spans(self, data, start: int = 0) -> Iterator[Tuple[int, int]]:
+        """Yield non-overlapping leftmost-longest matches as (start, end) offsets."""
+        position = start
+        end = len(data)
+        while position <= end:
+            match_end = self.first_end(data, position)
+            if match_end is None:
+                return
+            match_start, longest = self._leftmost_longest(data, position, match_end)
+            yield match_start, longest
+            # 空の一致の後は1バイト進める
+            position = longest if longest > match_start else longest + 1
+
+    def first_span(self, data, start: int = 0) -> Optional[Tuple[int, int]]:
+        return next(self.spans(data, start), None)
+
+
+class MappedFile:
+    """Read-only mmap of a file as a context manager; empty files map to b''."""
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self._file = None
+        self._map = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空のファイルはmmapできない
+            return b''
+        return self._map
+
+    def __exit__(self, *exc_info) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DFAでファイルを検索する')
+    parser.add_argument('file', help='検索するファイル')
+    pattern = parser.add_mutually_exclusive_group(required=True)
+    pattern.add_argument('--config', help='DFA設定ファイル(JSONまたはバイナリ形式)')
+    pattern.add_argument('--regex', help='正規表現 (1バイトを1文字として扱う)')
+    parser.add_argument('--spans', action='store_true', help='最左最長一致の (開始, 終了) を出力する')
+    parser.add_argument('--first', action='store_true', help='最初の一致だけを出力して終了する')
+    args = parser.parse_args()
+
+    if args.regex is not None:
+        from regex_to_nfa import compile_regex
+        compiled = compile_regex(args.regex, set(BYTE_SYMBOLS))
+    else:
+        compiled = load_automaton(args.config)
+
+    scanner = DfaScanner(compiled)
+    found = False
+    with MappedFile(args.file) as data:
+        if args.spans:
+            lines = (f"{start} {end}\n" for start, end in scanner.spans(data))
+        else:
+            lines = (f"{end}\n" for end in scanner.end_offsets(data))
+        buffer = []
+        for line in lines:
+            found = True
+            buffer.append(line)
+            if args.first:
+                break
+            if len(buffer) >= 4096:
+                sys.stdout.write(''.join(buffer))
+                buffer = []
+        sys.stdout.write(''.join(buffer))
+
+    if not found:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
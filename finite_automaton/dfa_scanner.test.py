@@ -0,0 +1,65 @@
+'''
+This module tests the byte scanning in dfa_scanner.
+'''
+
+import os
+import tempfile
+import unittest
+from regex_to_nfa import compile_regex
+from dfa_scanner import DfaScanner, MappedFile, BYTE_SYMBOLS
+
+class TestDfaScanner(unittest.TestCase):
+    '''
+    Test cases for verifying match offsets, leftmost-longest spans and mmap'd input.
+    '''
+    def scanner(self, pattern):
+        return DfaScanner(compile_regex(pattern, set(BYTE_SYMBOLS)))
+
+    def brute_force_ends(self, compiled, data):
+        ends = set()
+        for start in range(len(data) + 1):
+            for end in range(start, len(data) + 1):
+                state, completed = compiled.run_bytes(data[start:end])
+                if completed and compiled.is_accept(state):
+                    ends.add(end)
+        return sorted(ends)
+
+    def test_end_offsets(self):
+        '''Tests that every match end is reported, overlapping ones included.'''
+        for pattern in ['ab', 'a|bc', '(ab)+', 'b[ac]*b', 'a*']:
+            scanner = self.scanner(pattern)
+            for data in [b'', b'abab', b'xbcab', b'bacab', b'abcbab', b'zzzabz']:
+                self.assertEqual(list(scanner.end_offsets(data)), self.brute_force_ends(scanner.compiled, data), (pattern, data))
+
+    def test_spans(self):
+        '''Tests leftmost-longest spans, including a match that starts before the earliest match end.'''
+        scanner = self.scanner('abcd|c')
+        self.assertEqual(list(scanner.spans(b'abcd-c')), [(0, 4), (5, 6)])
+        self.assertEqual(list(self.scanner('[0-9]+').spans(b'a12b345')), [(1, 3), (4, 7)])
+        self.assertEqual(list(self.scanner('x*').spans(b'ax')), [(0, 0), (1, 2), (2, 2)])
+
+    def test_first_match(self):
+        '''Tests the early-exit variants.'''
+        scanner = self.scanner('ERROR [0-9]+')
+        data = b'INFO ok\nERROR 500\nERROR 404\n'
+        self.assertEqual(scanner.first_end(data), 15)
+        self.assertEqual(scanner.first_span(data), (8, 17))
+        self.assertIsNone(scanner.first_end(b'INFO ok\n'))
+
+    def test_mapped_file(self):
+        '''Tests scanning a file through mmap without decoding it.'''
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'app.log')
+            with open(path, 'wb') as file:
+                file.write(b'x' * 100000 + b'ERROR 42\n' + b'y' * 10 + b'ERROR 7')
+            scanner = self.scanner('ERROR [0-9]+')
+            with MappedFile(path) as data:
+                self.assertEqual(list(scanner.spans(data)), [(100000, 100008), (100019, 100026)])
+
+            empty = os.path.join(directory, 'empty.log')
+            open(empty, 'wb').close()
+            with MappedFile(empty) as data:
+                self.assertEqual(list(scanner.end_offsets(data)), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,348 @@
-from typing import List, Dict, Tuple, Union, Set
+from typing import List, Dict, Tuple, Union, Set, Iterable, Iterator, TextIO
+from array import array
+import argparse
 import sys
 import json
+import time
+
+from result_sink import SimulationResult, ResultSink, SINKS
+
+try:
+    import numpy as np
+except ImportError:  # numpy はバッチ実行でのみ使用する
+    np = None
+
+
+# 変換表でアルファベット外の文字に割り当てる列番号
+NO_CLASS = 255
+
+
+class SymbolClassMap(dict):
+    """Code point -> column table for str.translate; other characters map to NO_CLASS."""
+
+    def __missing__(self, code: int) -> int:
+        return NO_CLASS
+
+
+class CompiledDfa:
+    """DFA compiled into integer state IDs and a flat transition table.
+
+    Symbols that behave identically in every state share a column (an
+    alphabet equivalence class), so ``symbol_ids`` may map several symbols to
+    the same column. The table is indexed by ``state * width + column``; a
+    missing transition is stored as -1. Accept states are kept in a bitmap
+    (bit ``i`` of byte ``i >> 3`` is set when state ``i`` accepts).
+
+    While there are fewer than 255 columns, inputs are translated to a bytes
+    object of column numbers in one ``str.translate`` / ``bytes.translate``
+    call before the transition loop.
+    """
+
+    def __init__(
+            self,
+            state_names: List[str],
+            symbol_ids: Dict[str, int],
+            width: int,
+            table: array,
+            start_state: int,
+            accept_bitmap: bytearray
+        ):
+
+        # 状態ID -> 状態名
+        self.state_names: List[str] = state_names
+
+        # 入力記号 -> 列番号
+        self.symbol_ids: Dict[str, int] = symbol_ids
+
+        # 1状態あたりの列数
+        self.width: int = width
+
+        # 遷移表 table[state * width + symbol] -> 遷移先状態ID (遷移なしは -1)
+        self.table: array = table
+
+        # 開始状態ID
+        self.start_state: int = start_state
+
+        # 受理状態のビットマップ
+        self.accept_bitmap: bytearray = accept_bitmap
+
+        # str.translate / bytes.translate 用の 文字 -> 列番号 の変換表 (列が多すぎる場合は None)
+        self.class_map: SymbolClassMap = None
+        self.byte_classes: bytes = None
+        if width < NO_CLASS:
+            self.class_map = SymbolClassMap(
+                (ord(symbol), column) for symbol, column in symbol_ids.items() if len(symbol) == 1)
+            self.byte_classes = bytes(self.class_map[code] for code in range(256))
+
+    @classmethod
+    def from_config(
+            cls,
+            states: Set[str],
+            alphabet_list: Set[str],
+            transition_function: Dict[Tuple[str, str], str],
+            start_state: str,
+            accept_states: Set[str]
+        ) -> 'CompiledDfa':
+        """Compile a config returned by ConfigFileLoader.load_config."""
+        state_names = sorted(states)
+        state_ids = {name: index for index, name in enumerate(state_names)}
+
+        symbols = set(alphabet_list)
+        symbols.update(char for (_, char) in transition_function)
+
+        # 記号ごとの (遷移元, 遷移先) の組が同じ記号は同じ列にまとめる
+        edges: Dict[str, List[Tuple[int, int]]] = {symbol: [] for symbol in symbols}
+        for (from_state, char), to_state in transition_function.items():
+            edges[char].append((state_ids[from_state], state_ids[to_state]))
+        classes: Dict[Tuple[Tuple[int, int], ...], int] = {}
+        symbol_ids = {}
+        for symbol in sorted(symbols):
+            symbol_ids[symbol] = classes.setdefault(tuple(sorted(edges[symbol])), len(classes))
+        width = len(classes)
+
+        table = array('i', [-1]) * (len(state_names) * width)
+        for symbol_edges, column in classes.items():
+            for from_state, to_state in symbol_edges:
+                table[from_state * width + column] = to_state
+
+        accept_bitmap = bytearray((len(state_names) + 7) >> 3)
+        for name in accept_states:
+            state = state_ids[name]
+            accept_bitmap[state >> 3] |= 1 << (state & 7)
+
+        return cls(state_names, symbol_ids, width, table, state_ids[start_state], accept_bitmap)
+
+    @property
+    def num_states(self) -> int:
+        return len(self.state_names)
+
+    def is_accept(self, state: int) -> bool:
+        return bool(self.accept_bitmap[state >> 3] >> (state & 7) & 1)
+
+    def run(self, case: str, state: int = None) -> Tuple[int, bool]:
+        """Run one input and return (last state, whether every transition existed).
+
+        ``state`` resumes the run from a given state instead of the start state.
+        """
+        if self.class_map is not None:
+            return self.run_encoded(case.translate(self.class_map).encode('latin-1'), state)
+
+        table = self.table
+        symbol_ids = self.symbol_ids
+        width = self.width
+        if state is None:
+            state = self.start_state
+
+        try:
+            for char in case:
+                next_state = table[state * width + symbol_ids[char]]
+                if next_state < 0:
+                    return state, False
+                state = next_state
+        except KeyError:
+            # アルファベットに含まれない文字
+            return state, False
+
+        return state, True
+
+    def encode(self, case: str) -> bytes:
+        """Translate an input into its column numbers, or None when there are too many columns."""
+        if self.class_map is None:
+            return None
+        return case.translate(self.class_map).encode('latin-1')
+
+    def run_encoded(self, encoded: bytes, state: int = None) -> Tuple[int, bool]:
+        """``run`` over an input already translated into column numbers by ``encode``."""
+        table = self.table
+        width = self.width
+        if state is None:
+            state = self.start_state
+
+        # アルファベット外の文字の手前までを実行する
+        stop = encoded.find(NO_CLASS)
+        for column in (encoded if stop < 0 else encoded[:stop]):
+            next_state = table[state * width + column]
+            if next_state < 0:
+                return state, False
+            state = next_state
+
+        return state, stop < 0
+
+    def run_bytes(self, data: bytes, state: int = None) -> Tuple[int, bool]:
+        """``run`` over bytes, where byte ``b`` stands for the symbol ``chr(b)``."""
+        if self.byte_classes is None:
+            return self.run(data.decode('latin-1'), state)
+        return self.run_encoded(data.translate(self.byte_classes), state)
+
+    def compress_alphabet(self) -> 'CompiledDfa':
+        """Return an equivalent DFA whose identical columns are merged into one."""
+        width = self.width
+        # mmap や共有メモリ上の memoryview の表も array として扱う
+        source = self.table if isinstance(self.table, array) else array('i', self.table)
+        columns: Dict[bytes, int] = {}
+        remap = [columns.setdefault(source[column::width].tobytes(), len(columns)) for column in range(width)]
+        if len(columns) == width:
+            return self
+
+        new_width = len(columns)
+        table = array('i', [-1]) * (self.num_states * new_width)
+        for column, new_column in enumerate(remap):
+            table[new_column::new_width] = source[column::width]
+
+        return CompiledDfa(
+            self.state_names,
+            {symbol: remap[column] for symbol, column in self.symbol_ids.items()},
+            new_width,
+            table,
+            self.start_state,
+            self.accept_bitmap)
+
+    def run_instrumented(self, case: str, stats, state: int = None) -> Tuple[int, bool]:
+        """Same as ``run`` but records transitions and state visits into an instrumentation.SimulationStats.
+
+        A resumed run (``state`` given) is not counted as a new case, and its
+        state is not counted as visited again.
+        """
+        table = self.table
+        symbol_ids = self.symbol_ids
+        width = self.width
+        visits = stats.state_visits
+        dead = stats.dead
+        if state is None:
+            state = self.start_state
+            stats.cases += 1
+            visits[state] += 1
+
+        for char in case:
+            symbol = symbol_ids.get(char)
+            next_state = table[state * width + symbol] if symbol is not None else -1
+            if next_state < 0:
+                stats.error_hits += 1
+                return state, False
+            stats.transitions += 1
+            visits[next_state] += 1
+            if dead[next_state]:
+                stats.dead_state_hits += 1
+            state = next_state
+
+        return state, True
+
+    def run_batch(self, cases: List[str]):
+        """Run every case at once with NumPy and return (last states, completed flags).
+
+        The cases are encoded into a padded 2-D array of symbol columns plus a
+        lengths vector, and all cases advance one column per step through a
+        vectorized gather on the transition table. The result matches ``run``
+        applied to each case.
+        """
+        if np is None:
+            raise ImportError('バッチ実行には numpy が必要です')
+
+        count = len(cases)
+        lengths = np.fromiter((len(case) for case in cases), dtype=np.intp, count=count)
+        max_length = int(lengths.max()) if count else 0
+
+        # 文字 -> 列番号 (アルファベット外の文字は全て -1 の番兵列 width に対応させる)
+        width = self.width
+        symbols = sorted((ord(symbol), column) for symbol, column in self.symbol_ids.items() if len(symbol) == 1)
+        code_points = np.array([code for code, _ in symbols], dtype=np.uint32)
+        columns = np.array([column for _, column in symbols] + [width], dtype=np.intp)
+
+        chars = np.frombuffer(''.join(cases).encode('utf-32-le'), dtype='<u4')
+        positions = np.searchsorted(code_points, chars)
+        known = positions < len(code_points)
+        known[known] = code_points[positions[known]] == chars[known]
+        encoded_chars = columns[np.where(known, positions, len(code_points))]
+
+        # 長さの降順に並べると、各列で実行中のケースは先頭 k 件になる
+        order = np.argsort(-lengths, kind='stable')
+        sorted_lengths = lengths[order]
+        offsets = np.cumsum(lengths) - lengths
+        encoded = np.full((count, max_length), width, dtype=np.intp)
+        rows = np.repeat(np.arange(count), sorted_lengths)
+        starts = np.repeat(offsets[order], sorted_lengths)
+        cols = np.arange(len(rows)) - np.repeat(np.cumsum(sorted_lengths) - sorted_lengths, sorted_lengths)
+        encoded[rows, cols] = encoded_chars[starts + cols]
+
+        table = np.full((self.num_states, width + 1), -1, dtype=np.intp)
+        table[:, :width] = np.frombuffer(self.table, dtype=np.intc).reshape(self.num_states, width)
+
+        states = np.full(count, self.start_state, dtype=np.intp)
+        completed = np.ones(count, dtype=bool)
+        ascending_lengths = sorted_lengths[::-1]
+        for column in range(max_length):
+            active = count - int(np.searchsorted(ascending_lengths, column, side='right'))
+            current = states[:active]
+            next_states = table[current, encoded[:active, column]]
+            ok = completed[:active] & (next_states >= 0)
+            completed[:active] = ok
+            states[:active] = np.where(ok, next_states, current)
+
+        last_states = np.empty_like(states)
+        last_states[order] = states
+        flags = np.empty_like(completed)
+        flags[order] = completed
+        return last_states, flags
+
+    def accept_flags(self):
+        """Return the accept bitmap unpacked into a NumPy boolean vector."""
+        if np is None:
+            raise ImportError('バッチ実行には numpy が必要です')
+        bits = np.unpackbits(np.frombuffer(bytes(self.accept_bitmap), dtype=np.uint8), bitorder='little')
+        return bits[:self.num_states].astype(bool)
+
+
+class DfaRun:
+    """Resumable run of a single input that arrives in chunks.
+
+    With an instrumentation.SimulationStats the whole input counts as one case.
+    """
+
+    def __init__(self, compiled: CompiledDfa, stats=None):
+        self.compiled: CompiledDfa = compiled
+        self.stats = stats
+
+        # 現在の状態ID
+        self.state: int = compiled.start_state
+
+        # 遷移がなく停止した場合は False
+        self.completed: bool = True
+
+        if stats is not None:
+            stats.cases += 1
+            stats.state_visits[self.state] += 1
+
+    def feed(self, chunk: str) -> None:
+        """Advance the run over the next chunk of the input."""
+        if not self.completed:
+            return
+        stats = self.stats
+        if stats is None:
+            self.state, self.completed = self.compiled.run(chunk, self.state)
+            return
+        started = time.perf_counter()
+        self.state, self.completed = self.compiled.run_instrumented(chunk, stats, self.state)
+        stats.seconds += time.perf_counter() - started
+
+    def finish(self) -> bool:
+        """Return whether the input fed so far is accepted."""
+        return self.compiled.is_accept(self.state)
+
+
+def read_cases(stream: TextIO) -> Iterator[str]:
+    """Yield one case per line of the stream without the line terminator."""
+    for line in stream:
+        yield line.rstrip('\r\n')
+
+
+def read_chunks(stream: TextIO, size: int = 1 << 16) -> Iterator[str]:
+    """Yield the stream in chunks of at most ``size`` characters."""
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return
+        yield chunk
+
 
 class DfaSimulator:
     def __init__(
@@ -10,7 +352,8 @@ class DfaSimulator:
             transition_func: Dict[Tuple[str, str], str],
             start_state: str,
             accept_states: List[str],
-            test_cases: List[str]
+            test_cases: List[str],
+            compiled: 'CompiledDfa' = None
         ):
 
         # 状態
@@ -30,25 +373,90 @@ class DfaSimulator:
 
         self.test_cases: List[str] = test_cases
 
-    def execute(self) -> bool:
+        # 整数IDと遷移表にコンパイルしたDFA
+        if compiled is None:
+            compiled = CompiledDfa.from_config(states, alphabet_list, transition_func, start_state, accept_states)
+        self.compiled: CompiledDfa = compiled
+
+    @classmethod
+    def from_compiled(cls, compiled: CompiledDfa, test_cases: List[str]) -> 'DfaSimulator':
+        """Create a simulator that runs directly on an already compiled DFA."""
+        return cls(None, None, None, None, None, test_cases, compiled)
+
+    def execute(self, stats=None, sink: ResultSink = None) -> SimulationResult:
+        """Run the test_cases and return their accept flags and error indices.
+
+        Nothing is printed; pass a sink from result_sink to write each case out.
+        """
+        if stats is not None:
+            return self.execute_instrumented(stats, sink)
+
+        compiled = self.compiled
+        run = compiled.run
+        is_accept = compiled.is_accept
+        result = SimulationResult()
+        accepted = result.accepted
+        error_indices = result.error_indices
+
+        for index, case in enumerate(self.test_cases):
+            current_state, completed = run(case)
+            flag = is_accept(current_state)
+            accepted.append(flag)
+            if not completed:
+                error_indices.append(index)
+            if sink is not None:
+                sink.write(case, flag, completed)
+
+        return result
+
+    def execute_instrumented(self, stats, sink: ResultSink = None) -> SimulationResult:
+        """Run the test_cases on the instrumented path of CompiledDfa."""
+        compiled = self.compiled
+        result = SimulationResult()
+        started = time.perf_counter()
+
         for case in self.test_cases:
-            current_state: str = self.start_state
+            current_state, completed = compiled.run_instrumented(case, stats)
+            flag = compiled.is_accept(current_state)
+            result.append(flag, completed)
+            if sink is not None:
+                sink.write(case, flag, completed)
 
-            for char in case:
-                state: Tuple[str, int] = (current_state, char)
-
-                if (state in self.transition_function):
-                    current_state = self.transition_function[state]
-                else:
-                    print('error')
-                    print('満たされないケースが見つかりました!!')
-                    print(f"case, {case}")
-                    break
-
-            if (current_state in self.accept_states):
-                print(f"case: {case} は受理されました")
-            else:
-                print(f"case: {case} は受理されませんでした")
+        stats.seconds += time.perf_counter() - started
+        return result
+
+    def execute_stream(self, cases: Iterable[str], stats=None) -> Iterator[Tuple[str, bool, bool]]:
+        """Lazily yield (case, accepted, completed) for each case of an iterable.
+
+        With ``stats`` the cases run on the instrumented path of CompiledDfa.
+        """
+        compiled = self.compiled
+        if stats is None:
+            for case in cases:
+                current_state, completed = compiled.run(case)
+                yield case, compiled.is_accept(current_state), completed
+            return
+
+        for case in cases:
+            started = time.perf_counter()
+            current_state, completed = compiled.run_instrumented(case, stats)
+            stats.seconds += time.perf_counter() - started
+            yield case, compiled.is_accept(current_state), completed
+
+    def execute_parallel(self, workers: int = None, chunk_size: int = 10000) -> SimulationResult:
+        """Run the test_cases on a process pool."""
+        from parallel_dfa_simulator import ParallelDfaSimulator
+
+        return ParallelDfaSimulator(self.compiled, workers, chunk_size).execute(self.test_cases)
+
+    def start_run(self, stats=None) -> DfaRun:
+        """Start a resumable run for one input fed with ``feed``/``finish``."""
+        return DfaRun(self.compiled, stats)
+
+    def execute_batch(self):
+        """Evaluate all test_cases with NumPy and return a boolean acceptance vector."""
+        last_states, _ = self.compiled.run_batch(self.test_cases)
+        return self.compiled.accept_flags()[last_states]
 
 
 class ConfigFileLoader:
@@ -64,7 +472,7 @@ class ConfigFileLoader:
         accept_states = set(config["accept_states"])
         transition_function = {tuple(key.split(',')): value for key, value in config["transition_function"].items()}
         start_state = config["start_state"]
-        test_cases = config["test_cases"]
+        test_cases = config.get("test_cases", [])
 
         if not self.validate_config(states, accept_states, transition_function, start_state, test_cases):
             return {}, False
@@ -102,21 +510,193 @@ class ConfigFileLoader:
 
         return True
 
-# コマンドライン引数を取得する
-args = sys.argv[1:]  # 最初の要素はスクリプトのファイル名なので除外
 
-loader = ConfigFileLoader(args[0])
+def compiled_from_result(result: Dict) -> CompiledDfa:
+    """Compile the string-keyed output of NfaToDfaConverter.execute."""
+    def name(states) -> str:
+        return ", ".join(sorted(states))
+
+    transitions = {
+        (state, symbol): name(next_states) for (state, symbol), next_states in result['dfa_transition_functions'].items()
+    }
+    states = {name(states) for states in result['dfa_states']}
+    states.update(transitions.values())
+    return CompiledDfa.from_config(
+        states,
+        {symbol for _, symbol in transitions},
+        transitions,
+        name(result['dfa_start_states']),
+        {name(states) for states in result['dfa_accept_states']})
+
+
+def compiled_from_config(config: Dict) -> CompiledDfa:
+    """Compile a config returned by ConfigFileLoader.load_config."""
+    return CompiledDfa.from_config(
+        config['states'],
+        config['alphabet_list'],
+        config['transition_function'],
+        config['start_state'],
+        config['accept_states'])
+
+
+def as_compiled(automaton: Union[CompiledDfa, Dict]) -> CompiledDfa:
+    """Accept a CompiledDfa, a converter result or a loader config."""
+    if isinstance(automaton, CompiledDfa):
+        return automaton
+    if 'dfa_transition_functions' in automaton:
+        return compiled_from_result(automaton)
+    return compiled_from_config(automaton)
+
+
+def load_automaton(path: str) -> CompiledDfa:
+    """Load a JSON config or a binary compiled DFA file."""
+    import dfa_binary_format
+
+    if dfa_binary_format.is_compiled_dfa(path):
+        return dfa_binary_format.load_compiled_dfa(path)
+
+    config, is_valid = ConfigFileLoader(path).load_config()
+    if not is_valid:
+        raise ValueError('DFA設定ファイルに誤りがあります。')
+    return compiled_from_config(config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DFAシミュレーター')
+    parser.add_argument('config', help='DFA設定ファイル(JSON)')
+    parser.add_argument('--stream', metavar='FILE',
+                        help='テストケースを設定ファイルではなくファイルから1行ずつ読み込む ("-" で標準入力)')
+    parser.add_argument('--whole', action='store_true',
+                        help='--stream の入力全体を1つのケースとして少しずつ読み込む')
+    parser.add_argument('--minimize', action='store_true',
+                        help='読み込み時に到達不能な状態を取り除き、DFAを最小化する')
+    parser.add_argument('--save-compiled', metavar='FILE',
+                        help='コンパイルしたDFAをバイナリ形式で保存する')
+    parser.add_argument('--stats', metavar='FILE',
+                        help='遷移数・状態ごとの訪問回数などの統計をJSONで保存する')
+    parser.add_argument('--output', choices=sorted(SINKS), default='console',
+                        help='結果の出力形式 (console: これまでの表示, summary: 件数のみ)')
+    parser.add_argument('--output-file', metavar='FILE',
+                        help='結果の出力先 (省略時は標準出力)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='テストケース(--whole では1つの入力のチャンク)を複数のプロセスで並列に実行する (プロセス数)')
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help='--workers で1つのタスクにまとめるケース数')
+    args = parser.parse_args()
+    if args.stats and args.workers:
+        # 統計はワーカープロセスごとに分かれてしまうため集計できない
+        parser.error('--stats は --workers と同時に指定できません')
+
+    import dfa_binary_format
+
+    if dfa_binary_format.is_compiled_dfa(args.config):
+        # バイナリ形式はmmapで読み込み、そのまま実行する
+        simulator = DfaSimulator.from_compiled(dfa_binary_format.load_compiled_dfa(args.config), [])
+    else:
+        loader = ConfigFileLoader(args.config)
+
+        result, is_valid = loader.load_config()
+
+        if not is_valid:
+            print('DFA設定ファイルに誤りがあります。')
+            return
+
+        simulator = DfaSimulator(
+                result['states'],
+                result['alphabet_list'],
+                result['transition_function'],
+                result['start_state'],
+                result['accept_states'],
+                result['test_cases'])
+
+    if args.minimize:
+        from dfa_minimizer import minimize
+        simulator.compiled = minimize(simulator.compiled)
+
+    if args.save_compiled:
+        dfa_binary_format.write_compiled_dfa(simulator.compiled, args.save_compiled)
+
+    output = open(args.output_file, 'w') if args.output_file else None
+    try:
+        with SINKS[args.output](output) as sink:
+            if args.whole:
+                run_whole(simulator, args, sink)
+            else:
+                run_cases(simulator, args, sink)
+    finally:
+        if output is not None:
+            output.close()
+
+
+def run_whole(simulator: DfaSimulator, args, sink: ResultSink) -> None:
+    """Run the whole --stream input as one case and write it to the sink under the file name."""
+    # --workers と同じ文字列になるよう、改行を変換せずUTF-8で読み込む
+    stream = sys.stdin if args.stream == '-' else open(args.stream, 'r', encoding='utf-8', newline='')
+    stats = None
+    if args.stats:
+        from instrumentation import SimulationStats
+
+        stats = SimulationStats(simulator.compiled)
+    try:
+        run = simulator.start_run(stats)
+        if args.workers and stream is not sys.stdin:
+            # 1つの大きな入力をチャンクに分けて並列に実行する
+            from parallel_dfa_simulator import ChunkParallelDfaSimulator
+
+            chunk_parallel = ChunkParallelDfaSimulator(simulator.compiled, args.workers, speculate=True)
+            run.state, run.completed = chunk_parallel.execute_file(args.stream)
+        else:
+            for chunk in read_chunks(stream):
+                run.feed(chunk)
+        sink.write(args.stream, run.finish(), run.completed)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if stats is not None:
+        stats.to_json(args.stats)
+
+
+def run_cases(simulator: DfaSimulator, args, sink: ResultSink) -> None:
+    """Run the test cases (or the --stream lines) and write every result to the sink."""
+    if args.workers:
+        from parallel_dfa_simulator import ParallelDfaSimulator
+
+        parallel = ParallelDfaSimulator(simulator.compiled, args.workers, args.chunk_size)
+        stream = None
+        if args.stream is None:
+            cases = simulator.test_cases
+        else:
+            stream = sys.stdin if args.stream == '-' else open(args.stream, 'r')
+            cases = read_cases(stream)
+        try:
+            for chunk, result in parallel.execute_chunks(cases):
+                sink.write_result(chunk, result)
+        finally:
+            if stream is not None and stream is not sys.stdin:
+                stream.close()
+        return
+
+    stats = None
+    if args.stats:
+        from instrumentation import SimulationStats
+
+        stats = SimulationStats(simulator.compiled)
+
+    if args.stream is None:
+        simulator.execute(stats, sink)
+    else:
+        stream = sys.stdin if args.stream == '-' else open(args.stream, 'r')
+        try:
+            for case, accepted, completed in simulator.execute_stream(read_cases(stream), stats):
+                sink.write(case, accepted, completed)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    if stats is not None:
+        stats.to_json(args.stats)
 
-result, is_valid = loader.load_config()
 
-if (is_valid):
-    simulator = DfaSimulator(
-            result['states'],
-            result['alphabet_list'],
-            result['transition_function'],
-            result['start_state'],
-            result['accept_states'],
-            result['test_cases'])
-    simulator.execute()
-else:
-    print('DFA設定ファイルに誤りがあります。')
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+'''
+This module tests the batch and chunked execution paths of dfa_simulator.
+'''
+
+import io
+import unittest
+from array import array
+from automaton_generator import noisy_inputs
+from dfa_simulator import CompiledDfa, ConfigFileLoader, DfaSimulator, read_cases
+
+class TestDfaSimulator(unittest.TestCase):
+    '''
+    Test cases for verifying that run_batch, DfaRun and execute_stream agree with CompiledDfa.run.
+    '''
+    def setUp(self):
+        config, is_valid = ConfigFileLoader('data/dfa01.json').load_config()
+        self.assertTrue(is_valid)
+        self.simulator = DfaSimulator(
+            config['states'],
+            config['alphabet_list'],
+            config['transition_function'],
+            config['start_state'],
+            config['accept_states'],
+            config['test_cases'])
+        self.compiled = self.simulator.compiled
+
+        # アルファベット外の文字 (x, あ) と空文字列を含むケース
+        self.cases = noisy_inputs(0, list('01'), list('x'), 300, 30, 0.02)
+        self.cases += ['', 'x', '1x0', '10あ', 'あ', '1' * 100 + '0']
+
+    def test_run_batch(self):
+        '''Tests run_batch against run, including unknown characters and an empty case list.'''
+        states, completed = self.compiled.run_batch(self.cases)
+        for index, case in enumerate(self.cases):
+            self.assertEqual((int(states[index]), bool(completed[index])), self.compiled.run(case), case)
+
+        accepted = DfaSimulator.from_compiled(self.compiled, self.cases).execute_batch()
+        expected = [self.compiled.is_accept(self.compiled.run(case)[0]) for case in self.cases]
+        self.assertEqual([bool(flag) for flag in accepted], expected)
+
+        states, completed = self.compiled.run_batch([])
+        self.assertEqual((len(states), len(completed)), (0, 0))
+
+    def test_chunked_run(self):
+        '''Tests that feeding an input in chunks gives the same result as one run.'''
+        for case in self.cases:
+            state, completed = self.compiled.run(case)
+            for size in (1, 3, 7):
+                run = self.simulator.start_run()
+                for start in range(0, len(case), size):
+                    run.feed(case[start:start + size])
+                self.assertEqual((run.state, run.completed), (state, completed), case)
+                self.assertEqual(run.finish(), self.compiled.is_accept(state), case)
+
+    def test_stream(self):
+        '''Tests that read_cases strips line terminators and execute_stream yields every case.'''
+        stream = io.StringIO('100\r\n11x0\n\n1110')
+        cases = list(read_cases(stream))
+        self.assertEqual(cases, ['100', '11x0', '', '1110'])
+
+        results = list(self.simulator.execute_stream(iter(cases)))
+        self.assertEqual([case for case, _, _ in results], cases)
+        for case, accepted, completed in results:
+            state, expected_completed = self.compiled.run(case)
+            self.assertEqual((accepted, completed), (self.compiled.is_accept(state), expected_completed), case)
+
+    def test_compress_alphabet(self):
+        '''Tests that identical columns are merged, also for a table held in a memoryview.'''
+        # 列 0 と 2 (a, c) が同じ遷移を持つ
+        table = array('i', [1, 0, 1, 1, -1, 1])
+        for source in (table, memoryview(table)):
+            compiled = CompiledDfa(['q0', 'q1'], {'a': 0, 'b': 1, 'c': 2}, 3, source, 0, bytearray([2]))
+            compressed = compiled.compress_alphabet()
+            self.assertEqual(compressed.width, 2)
+            self.assertEqual(compressed.symbol_ids['a'], compressed.symbol_ids['c'])
+            for case in ['', 'a', 'c', 'ab', 'cbc', 'bca', 'ccab', 'x']:
+                self.assertEqual(compressed.run(case), compiled.run(case), case)
+        self.assertIs(compressed.compress_alphabet(), compressed)
+
+if __name__ == '__main__':
+    unittest.main()
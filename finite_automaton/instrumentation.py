@@ -0,0 +1,140 @@
+"""Module for opt-in statistics of DFA simulation and NFA to DFA conversion.
+
+The simulator and the converter only touch these objects on their
+instrumented code paths, which are chosen once per call; without a stats
+object the plain loops run unchanged.
+"""
+
+from typing import List, Dict, Tuple
+import json
+import time
+
+def dead_states(compiled) -> List[bool]:
+    """Flag the states of a CompiledDfa from which no accept state is reachable."""
+    count = compiled.num_states
+    width = compiled.width
+    table = compiled.table
+    predecessors: List[List[int]] = [[] for _ in range(count)]
+    for state in range(count):
+        for next_state in table[state * width:(state + 1) * width]:
+            if next_state >= 0:
+                predecessors[next_state].append(state)
+
+    alive = [compiled.is_accept(state) for state in range(count)]
+    stack = [state for state in range(count) if alive[state]]
+    while stack:
+        state = stack.pop()
+        for previous in predecessors[state]:
+            if not alive[previous]:
+                alive[previous] = True
+                stack.append(previous)
+    return [not flag for flag in alive]
+
+
+class SimulationStats:
+    """Counters collected by DfaSimulator.execute(stats=...)."""
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+
+        # 実行したケース数と、たどった遷移の数
+        self.cases: int = 0
+        self.transitions: int = 0
+
+        # 状態ごとの訪問回数 (開始状態も含む)
+        self.state_visits: List[int] = [0] * compiled.num_states
+
+        # 受理状態に到達できない状態に入った回数
+        self.dead_state_hits: int = 0
+
+        # 遷移がなく停止した回数
+        self.error_hits: int = 0
+
+        self.seconds: float = 0.0
+
+        self.dead: List[bool] = dead_states(compiled)
+
+    def hot_states(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Return the most visited states as (name, visits)."""
+        ranked = sorted(range(len(self.state_visits)), key=lambda state: -self.state_visits[state])
+        return [(self.compiled.state_names[state], self.state_visits[state]) for state in ranked[:limit]]
+
+    def to_dict(self) -> Dict:
+        return {
+            'cases': self.cases,
+            'transitions': self.transitions,
+            'dead_state_hits': self.dead_state_hits,
+            'error_hits': self.error_hits,
+            'seconds': self.seconds,
+            'state_visits': {
+                self.compiled.state_names[state]: visits
+                for state, visits in enumerate(self.state_visits) if visits
+            },
+            'hot_states': self.hot_states(),
+        }
+
+    def to_json(self, path: str = None) -> str:
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        if path:
+            with open(path, 'w') as file:
+                file.write(text)
+        return text
+
+
+class ConversionStats:
+    """Phase timings and growth of the subset construction in NfaToDfaConverter.
+
+    ``subsets_over_time`` holds (seconds since the construction started,
+    discovered DFA states) every ``sample_every`` new subsets and at the end.
+    """
+
+    def __init__(self, sample_every: int = 1000):
+        self.sample_every: int = sample_every
+
+        # フェーズ名 -> 経過時間(秒)
+        self.phase_seconds: Dict[str, float] = {}
+
+        self.subsets_over_time: List[Tuple[float, int]] = []
+
+        # 計算した (NFA状態, 記号) の遷移先閉包の数
+        self.step_mask_computations: int = 0
+
+        self.nfa_states: int = 0
+        self.dfa_states: int = 0
+        self.dfa_transitions: int = 0
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+
+    def to_dict(self) -> Dict:
+        return {
+            'nfa_states': self.nfa_states,
+            'dfa_states': self.dfa_states,
+            'dfa_transitions': self.dfa_transitions,
+            'step_mask_computations': self.step_mask_computations,
+            'phase_seconds': self.phase_seconds,
+            'subsets_over_time': self.subsets_over_time,
+        }
+
+    def to_json(self, path: str = None) -> str:
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        if path:
+            with open(path, 'w') as file:
+                file.write(text)
+        return text
+
+
+class Timer:
+    """Context manager that adds its elapsed time to a phase of a ConversionStats."""
+
+    def __init__(self, stats: ConversionStats, phase: str):
+        self.stats = stats
+        self.phase = phase
+        self.started = 0.0
+
+    def __enter__(self) -> 'Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stats.add_phase(self.phase, time.perf_counter() - self.started)
@@ -0,0 +1,86 @@
+'''
+This module tests the statistics collected through the instrumentation module.
+'''
+
+import unittest
+from automaton_generator import random_nfa_config
+from dfa_simulator import CompiledDfa, DfaSimulator
+from instrumentation import SimulationStats, ConversionStats, dead_states
+from nfa_to_dfa_converter import NfaToDfaConverter
+
+class TestInstrumentation(unittest.TestCase):
+    '''
+    Test cases for verifying simulation counters and conversion timings.
+    '''
+    def setUp(self):
+        # dead からは受理状態 q1 に到達できず、dead には b の遷移がない
+        self.compiled = CompiledDfa.from_config(
+            { 'q0', 'q1', 'dead' },
+            { 'a', 'b' },
+            {
+                ('q0', 'a'): 'q1',
+                ('q0', 'b'): 'dead',
+                ('q1', 'a'): 'q1',
+                ('q1', 'b'): 'q0',
+                ('dead', 'a'): 'dead',
+            },
+            'q0',
+            { 'q1' })
+        self.cases = ['aa', 'ba', 'bb', 'ac']
+        self.ids = {name: state for state, name in enumerate(self.compiled.state_names)}
+
+    def assertCounts(self, stats):
+        self.assertEqual(stats.cases, 4)
+        self.assertEqual(stats.transitions, 6)
+        self.assertEqual(stats.dead_state_hits, 3)
+        self.assertEqual(stats.error_hits, 2)
+        self.assertEqual(stats.to_dict()['state_visits'], { 'q0': 4, 'q1': 3, 'dead': 3 })
+        self.assertEqual(stats.hot_states(1), [('q0', 4)])
+
+    def test_dead_states(self):
+        '''Tests that only the state that cannot reach an accept state is dead.'''
+        dead = dead_states(self.compiled)
+        self.assertEqual({name for name, state in self.ids.items() if dead[state]}, { 'dead' })
+
+    def test_simulation_stats(self):
+        '''Tests the counters of execute and that its results match the plain path.'''
+        simulator = DfaSimulator.from_compiled(self.compiled, self.cases)
+        stats = SimulationStats(self.compiled)
+        result = simulator.execute(stats)
+        expected = simulator.execute()
+        self.assertEqual(list(result.accepted), list(expected.accepted))
+        self.assertEqual(result.error_indices, expected.error_indices)
+        self.assertCounts(stats)
+
+    def test_stream_and_chunks(self):
+        '''Tests that streamed cases and chunked runs give the same counters.'''
+        simulator = DfaSimulator.from_compiled(self.compiled, [])
+        stats = SimulationStats(self.compiled)
+        streamed = list(simulator.execute_stream(iter(self.cases), stats))
+        self.assertEqual(streamed, list(simulator.execute_stream(iter(self.cases))))
+        self.assertCounts(stats)
+
+        stats = SimulationStats(self.compiled)
+        for case in self.cases:
+            run = simulator.start_run(stats)
+            for char in case:
+                run.feed(char)
+        self.assertCounts(stats)
+
+    def test_conversion_stats(self):
+        '''Tests that the instrumented conversion gives the same DFA and records its phases.'''
+        config = random_nfa_config(0, 10, 2, 0.5)
+        stats = ConversionStats(sample_every=2)
+        self.assertEqual(NfaToDfaConverter(config, stats).execute(), NfaToDfaConverter(config).execute())
+
+        self.assertEqual(set(stats.phase_seconds), { 'closure', 'step_closure', 'subset_exploration' })
+        self.assertTrue(all(seconds >= 0 for seconds in stats.phase_seconds.values()))
+        self.assertGreater(len(stats.subsets_over_time), 1)
+        self.assertEqual(stats.subsets_over_time[-1][1], stats.dfa_states)
+        self.assertEqual(stats.nfa_states, 10)
+        self.assertGreater(stats.step_mask_computations, 0)
+        counts = [count for _, count in stats.subsets_over_time]
+        self.assertEqual(counts, sorted(counts))
+
+if __name__ == '__main__':
+    unittest.main()
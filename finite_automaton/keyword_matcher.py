@@ -0,0 +1,135 @@
+"""Module for matching many keywords at once with an Aho–Corasick automaton."""
+
+from typing import List, Dict, Set, Iterable, Iterator, Tuple
+from array import array
+
+class KeywordMatcher:
+    """Aho–Corasick automaton for a keyword set, compiled into a full DFA.
+
+    The goto/failure/output automaton is built first, then every failure link
+    is folded into a dense transition table, so scanning does exactly one
+    table lookup per character. Characters outside the keywords' alphabet
+    lead back to the root.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        # 重複と空文字列を除いたキーワード
+        self.keywords: List[str] = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+
+        # 入力記号 -> 列番号
+        self.symbol_ids: Dict[str, int] = {
+            symbol: column for column, symbol in enumerate(sorted({char for keyword in self.keywords for char in keyword}))
+        }
+        self.width: int = len(self.symbol_ids)
+
+        # goto関数 (トライ木)
+        goto: List[Dict[int, int]] = [{}]
+        # 状態で終わるキーワードの番号 (なければ -1)
+        self.keyword_of: List[int] = [-1]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                column = self.symbol_ids[char]
+                next_state = goto[state].get(column)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][column] = next_state
+                    goto.append({})
+                    self.keyword_of.append(-1)
+                state = next_state
+            self.keyword_of[state] = index
+
+        count = len(goto)
+        width = self.width
+
+        # failure関数と、出力を持つ最も近い接尾辞状態へのリンク
+        self.failure: List[int] = [0] * count
+        self.output_link: List[int] = [-1] * count
+
+        # 幅優先の順に failure を求めながら完全なDFAの遷移表を作る
+        self.table: array = array('i', [0]) * (count * width)
+        for column, next_state in goto[0].items():
+            self.table[column] = next_state
+        queue = list(goto[0].values())
+        for state in queue:
+            failure = self.failure[state]
+            self.output_link[state] = failure if self.keyword_of[failure] >= 0 else self.output_link[failure]
+            row = state * width
+            failure_row = failure * width
+            for column in range(width):
+                next_state = goto[state].get(column)
+                if next_state is None:
+                    self.table[row + column] = self.table[failure_row + column]
+                else:
+                    self.failure[next_state] = self.table[failure_row + column]
+                    self.table[row + column] = next_state
+                    queue.append(next_state)
+
+        # 状態に到達したときに出力があるか
+        self.has_output: bytearray = bytearray(
+            1 if self.keyword_of[state] >= 0 or self.output_link[state] >= 0 else 0 for state in range(count)
+        )
+
+    @property
+    def num_states(self) -> int:
+        return len(self.keyword_of)
+
+    def outputs(self, state: int) -> Iterator[int]:
+        """Yield the keyword indices recognized on reaching ``state``."""
+        if self.keyword_of[state] < 0:
+            state = self.output_link[state]
+        while state >= 0:
+            yield self.keyword_of[state]
+            state = self.output_link[state]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (end offset, keyword) for every occurrence, overlapping ones included."""
+        table = self.table
+        symbol_ids = self.symbol_ids
+        width = self.width
+        has_output = self.has_output
+        state = 0
+        for offset, char in enumerate(text):
+            column = symbol_ids.get(char)
+            if column is None:
+                state = 0
+                continue
+            state = table[state * width + column]
+            if has_output[state]:
+                for index in self.outputs(state):
+                    yield offset + 1, self.keywords[index]
+
+    def scan(self, text: str) -> Set[str]:
+        """Return the set of keywords that occur in the text, in one linear pass."""
+        table = self.table
+        symbol_ids = self.symbol_ids
+        width = self.width
+        has_output = self.has_output
+        found: Set[int] = set()
+        state = 0
+        for char in text:
+            column = symbol_ids.get(char)
+            if column is None:
+                state = 0
+                continue
+            state = table[state * width + column]
+            if has_output[state]:
+                found.update(self.outputs(state))
+        return {self.keywords[index] for index in found}
+
+    def contains_any(self, text: str) -> bool:
+        """Return whether at least one keyword occurs, stopping at the first match."""
+        table = self.table
+        symbol_ids = self.symbol_ids
+        width = self.width
+        has_output = self.has_output
+        state = 0
+        for char in text:
+            column = symbol_ids.get(char)
+            if column is None:
+                state = 0
+                continue
+            state = table[state * width + column]
+            if has_output[state]:
+                return True
+        return False
@@ -0,0 +1,62 @@
+'''
+This module tests the KeywordMatcher class from the keyword_matcher module.
+'''
+
+import random
+import unittest
+from keyword_matcher import KeywordMatcher
+
+def brute_force(keywords, text):
+    '''Return every (end offset, keyword) occurrence by checking each position.'''
+    return sorted(
+        (end, keyword)
+        for keyword in dict.fromkeys(keywords) if keyword
+        for end in range(len(keyword), len(text) + 1)
+        if text[end - len(keyword):end] == keyword
+    )
+
+class TestKeywordMatcher(unittest.TestCase):
+    '''
+    Test cases for verifying the Aho-Corasick matcher against hoge_judgment and a brute-force search.
+    '''
+    def test_hoge(self):
+        '''Tests the hoge_judgment cases, including 'hhoge' which hoge_judgment rejects.'''
+        matcher = KeywordMatcher(['hoge'])
+        cases = {
+            'hoge': True,
+            'hage': False,
+            'hoga': False,
+            'abchdefoghigjkle': False,
+            'abchoagexyz': False,
+            'abchaogexyz': False,
+            'abchogexyz': True,
+            'hhoge': True,
+            'hohoge': True,
+            'hogHOGE': False,
+        }
+        for text, expected in cases.items():
+            self.assertEqual(matcher.contains_any(text), expected, text)
+            self.assertEqual(matcher.scan(text) == {'hoge'}, expected, text)
+        self.assertEqual(list(matcher.finditer('hhoge')), [(5, 'hoge')])
+
+    def test_overlapping_outputs(self):
+        '''Tests that keywords ending at the same offset are all reported.'''
+        matcher = KeywordMatcher(['he', 'she', 'his', 'hers'])
+        self.assertEqual(sorted(matcher.finditer('ushers')), [(4, 'he'), (4, 'she'), (6, 'hers')])
+        self.assertEqual(matcher.scan('ushers'), {'he', 'she', 'hers'})
+        self.assertFalse(matcher.contains_any('usual'))
+
+    def test_random_against_brute_force(self):
+        '''Tests finditer against a brute-force search on random keyword sets and texts.'''
+        rng = random.Random(0)
+        for _ in range(200):
+            keywords = [''.join(rng.choice('abc') for _ in range(rng.randrange(0, 5))) for _ in range(rng.randrange(1, 6))]
+            text = ''.join(rng.choice('abcd') for _ in range(rng.randrange(0, 40)))
+            matcher = KeywordMatcher(keywords)
+            expected = brute_force(keywords, text)
+            self.assertEqual(sorted(matcher.finditer(text)), expected, (keywords, text))
+            self.assertEqual(matcher.scan(text), {keyword for _, keyword in expected}, (keywords, text))
+            self.assertEqual(matcher.contains_any(text), bool(expected), (keywords, text))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""Module for simulating an NFA lazily through a bounded DFA state cache."""
+
+from typing import Dict, List, Iterable
+from collections import OrderedDict
+
+from nfa_to_dfa_converter import NfaToDfaConverter
+
+class LazyDfaStats:
+    """Cache statistics of a LazyNfaSimulator."""
+
+    def __init__(self):
+        # 遷移がキャッシュから得られた回数
+        self.hits: int = 0
+
+        # 遷移を計算した回数
+        self.misses: int = 0
+
+        # キャッシュから追い出したDFA状態の数
+        self.evictions: int = 0
+
+        # キャッシュを使わずに集合で遷移した回数
+        self.fallback_steps: int = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'fallback_steps': self.fallback_steps,
+            'hit_rate': self.hit_rate(),
+        }
+
+
+class LazyNfaSimulator:
+    """Simulates an NFA directly, building DFA states only when an input reaches them.
+
+    DFA states are NFA subsets as bitmasks (see NfaToDfaConverter). Their
+    transitions are computed on first use and kept in an LRU cache of at most
+    ``cache_size`` states. When more than ``thrash_miss_rate`` of the last
+    ``thrash_window`` steps missed, the simulator steps on the subsets
+    directly without caching for the next ``thrash_window`` steps.
+    """
+
+    def __init__(
+            self,
+            converter: NfaToDfaConverter,
+            cache_size: int = 4096,
+            thrash_window: int = 1024,
+            thrash_miss_rate: float = 0.5
+        ):
+        self.converter: NfaToDfaConverter = converter
+        self.cache_size: int = cache_size
+        self.thrash_window: int = thrash_window
+        self.thrash_misses: int = int(thrash_window * thrash_miss_rate)
+
+        self.symbol_ids: Dict[str, int] = converter.symbol_columns
+        self.width: int = len(converter.symbol_classes)
+        self.start_mask: int = converter.closure_masks[converter.nfa_state_bits[converter.start_state]]
+
+        # subset bitmask -> next subset per symbol column (None until computed)
+        self.cache: OrderedDict[int, List[int]] = OrderedDict()
+
+        self.stats: LazyDfaStats = LazyDfaStats()
+
+        # 直近のウィンドウ内のステップ数とミス数、キャッシュを使わない残りステップ数
+        self._window_steps: int = 0
+        self._window_misses: int = 0
+        self._fallback_left: int = 0
+
+    def step_subset(self, mask: int, column: int) -> int:
+        """Set-based step: union of the successor closures of every member."""
+        step_mask = self.converter.step_mask
+        next_mask = 0
+        while mask:
+            low = mask & -mask
+            next_mask |= step_mask(low.bit_length() - 1, column)
+            mask ^= low
+        return next_mask
+
+    def step(self, mask: int, column: int) -> int:
+        """Next subset on one symbol column, served from the cache when possible."""
+        stats = self.stats
+
+        if self._fallback_left:
+            self._fallback_left -= 1
+            stats.fallback_steps += 1
+            return self.step_subset(mask, column)
+
+        cache = self.cache
+        row = cache.get(mask)
+        if row is not None:
+            cache.move_to_end(mask)
+            next_mask = row[column]
+            if next_mask is not None:
+                stats.hits += 1
+                self._count_step(False)
+                return next_mask
+        else:
+            row = [None] * self.width
+            cache[mask] = row
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+                stats.evictions += 1
+
+        stats.misses += 1
+        next_mask = self.step_subset(mask, column)
+        row[column] = next_mask
+        self._count_step(True)
+        return next_mask
+
+    def _count_step(self, missed: bool) -> None:
+        self._window_steps += 1
+        if missed:
+            self._window_misses += 1
+        if self._window_steps < self.thrash_window:
+            return
+        if self._window_misses > self.thrash_misses:
+            self._fallback_left = self.thrash_window
+        self._window_steps = 0
+        self._window_misses = 0
+
+    def accepts(self, case: str) -> bool:
+        """Return whether the NFA accepts the input."""
+        symbol_ids = self.symbol_ids
+        mask = self.start_mask
+        for char in case:
+            column = symbol_ids.get(char)
+            if column is None:
+                # アルファベット外の文字では遷移先がない
+                return False
+            mask = self.step(mask, column)
+            if not mask:
+                return False
+        return bool(mask & self.converter.accept_mask)
+
+    def execute(self, cases: Iterable[str]) -> List[bool]:
+        return [self.accepts(case) for case in cases]
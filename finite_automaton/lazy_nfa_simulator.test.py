@@ -0,0 +1,75 @@
+'''
+This module tests the LazyNfaSimulator class from the lazy_nfa_simulator module.
+'''
+
+import random
+import unittest
+from automaton_generator import random_nfa_config, make_alphabet
+from lazy_nfa_simulator import LazyNfaSimulator
+from nfa_to_dfa_converter import NfaToDfaConverter
+from regex_to_nfa import regex_to_nfa
+
+class TestLazyNfaSimulator(unittest.TestCase):
+    '''
+    Test cases for verifying lazy simulation, its cache statistics and the thrash fallback.
+    '''
+    def test_random_nfas(self):
+        '''Tests accepts against the converted DFA with a cache small enough to evict.'''
+        rng = random.Random(0)
+        evictions = 0
+        for seed in range(30):
+            config = random_nfa_config(seed, 8, 3, 0.3, 0.8)
+            compiled = NfaToDfaConverter(config).to_compiled_dfa()
+            simulator = LazyNfaSimulator(NfaToDfaConverter(config), cache_size=2)
+            alphabet = make_alphabet(3) + ['x']
+            for _ in range(50):
+                case = ''.join(rng.choice(alphabet) for _ in range(rng.randrange(0, 15)))
+                state, completed = compiled.run(case)
+                self.assertEqual(simulator.accepts(case), completed and compiled.is_accept(state), (seed, case))
+            self.assertLessEqual(len(simulator.cache), 2)
+            evictions += simulator.stats.evictions
+        self.assertGreater(evictions, 0)
+
+    def test_stats(self):
+        '''Tests hit, miss and eviction counts on a hand-checked input.'''
+        converter = NfaToDfaConverter({
+            'states': { 'q0', 'q1' },
+            'alphabet_list': { 'a', 'b' },
+            'transition_functions': {
+                ('q0', 'a'): { 'q0' },
+                ('q0', 'b'): { 'q1' },
+                ('q1', 'a'): { 'q0' },
+            },
+            'start_state': 'q0',
+            'accept_states': { 'q1' }
+        })
+        simulator = LazyNfaSimulator(converter, cache_size=1)
+
+        # {q0}·a ミス, {q0}·a ヒット, {q0}·b ミス
+        self.assertTrue(simulator.accepts('aab'))
+        self.assertEqual((simulator.stats.hits, simulator.stats.misses, simulator.stats.evictions), (1, 2, 0))
+
+        # {q0}·b ヒット, {q1}·a ミスで {q0} を追い出す
+        self.assertFalse(simulator.accepts('ba'))
+        self.assertEqual(simulator.stats.to_dict(), {
+            'hits': 2, 'misses': 3, 'evictions': 1, 'fallback_steps': 0, 'hit_rate': 2 / 5,
+        })
+
+        # {q1}·b は遷移先がない
+        self.assertFalse(simulator.accepts('bb'))
+
+    def test_thrash_fallback(self):
+        '''Tests that mostly missing steps switch to uncached stepping with the same answers.'''
+        # (a|b)*a(a|b){15} の最小DFAは 2^16 状態あり、小さなキャッシュではほぼ毎回ミスする
+        simulator = LazyNfaSimulator(
+            NfaToDfaConverter(regex_to_nfa('(a|b)*a' + '(a|b)' * 15)), cache_size=16, thrash_window=64)
+        rng = random.Random(1)
+        for _ in range(40):
+            case = ''.join(rng.choice('ab') for _ in range(rng.randrange(0, 300)))
+            expected = len(case) >= 16 and case[-16] == 'a'
+            self.assertEqual(simulator.accepts(case), expected, case)
+        self.assertGreater(simulator.stats.fallback_steps, 0)
+        self.assertGreater(simulator.stats.misses, simulator.stats.hits)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,81 @@
 """Module for converting NFA to DFA."""
 
-from typing import Set, Dict, Tuple
+from typing import Set, Dict, Tuple, List, Iterable
+from array import array
+
+from dfa_simulator import CompiledDfa
+from instrumentation import ConversionStats, Timer
+import dfa_minimizer
+import time
 
 class NfaToDfaConverter:
     """Converts NFA to DFA"""
 
-    def __init__(self, config: Dict[str, Set[str] | Dict[Tuple[str, str], Set[str]] | str]):
+    def __init__(
+            self,
+            config: Dict[str, Set[str] | Dict[Tuple[str, str], Set[str]] | str],
+            stats: ConversionStats = None
+        ):
         self.states = config['states']
         self.alphabet_list = config['alphabet_list']
         self.transition_functions = config['transition_functions']
         self.start_state = config['start_state']
         self.accept_states = config['accept_states']
 
-    def execute(self):
-        """Executes the conversion from NFA to DFA and returns the DFA components."""
+        # NFA state name -> bit position in a subset bitmask
+        names = set(self.states)
+        names.add(self.start_state)
+        for (state, _), next_states in self.transition_functions.items():
+            names.add(state)
+            names.update(next_states)
+        self.nfa_state_names: List[str] = sorted(names)
+        self.nfa_state_bits: Dict[str, int] = {name: bit for bit, name in enumerate(self.nfa_state_names)}
+
+        # DFA input symbols (column order of the integer transition table)
+        # Sorted so that the discovery order of DFA states does not depend on set iteration order
+        self.symbols: List[str] = sorted(set(self.alphabet_list) - {'ε'})
+
+        self.accept_mask: int = self.to_mask(state for state in self.accept_states if state in self.nfa_state_bits)
+
+        # Opt-in statistics; None keeps the plain code paths
+        self.stats: ConversionStats = stats
+
+        # NFA state bit -> ε-closure of that single state as a bitmask
+        if stats is None:
+            self.closure_masks: List[int] = self.compute_closure_masks()
+        else:
+            stats.nfa_states = len(self.nfa_state_names)
+            with Timer(stats, 'closure'):
+                self.closure_masks = self.compute_closure_masks()
+
+        # Alphabet equivalence classes: symbols whose successor closures agree in
+        # every NFA state share one column of the DFA transition table
+        self.symbol_classes: List[List[str]] = self.compute_symbol_classes()
+        self.symbol_columns: Dict[str, int] = {
+            symbol: column for column, members in enumerate(self.symbol_classes) for symbol in members
+        }
+
+        # subset bitmask -> ε-closure of the whole subset
+        self._subset_closures: Dict[int, int] = {}
+
+        # (NFA state bit, symbol column) -> ε-closure of its successors as a bitmask
+        self._step_masks: Dict[Tuple[int, int], int] = {}
+
+        # Incremental edits: NFA states whose successors changed since the last
+        # update, and reverse edge indexes built on the first edit
+        self._dirty_mask: int = 0
+        self._classes_stale: bool = False
+        self._epsilon_predecessors: Dict[int, Set[int]] = None
+        self._symbol_predecessors: Dict[int, Set[int]] = None
+
+    def execute(self, result=None):
+        """Executes the conversion from NFA to DFA and returns the DFA components.
+
+        ``result`` is an existing subset_construction (or update) result to
+        convert instead of running the construction again.
+        """
         dfa_start_state = self.epsilon_closure({self.start_state}, self.transition_functions)
-        result = self.search_dfa_state_and_transitions(dfa_start_state)
+        result = self.search_dfa_state_and_transitions(dfa_start_state, result)
 
         return {
             'dfa_states': result['dfa_states'],
@@ -26,6 +86,9 @@ class NfaToDfaConverter:
 
     def epsilon_closure(self, states: Set[str], transitions: Dict[Tuple[str, str], Set[str]]):
         """Calculate the epsilon-closure of the given states."""
+        if transitions is self.transition_functions and all(state in self.nfa_state_bits for state in states):
+            return self.to_states(self.closure_mask(self.to_mask(states))) if states else set()
+
         closure = set(states)
         stack = list(states)
         while stack:
@@ -36,38 +99,530 @@ class NfaToDfaConverter:
                     stack.append(next_state)
         return closure
 
-    def search_dfa_state_and_transitions(self, dfa_start_states: Set[str]):
-        """Search and build the DFA states and transitions based on NFA transitions."""
-        dfa_states = []
-        dfa_transitions = {}
-        unmarked_states_list = [dfa_start_states]
+    def compute_closure_masks(self, nodes: List[int] = None) -> List[int]:
+        """Compute the ε-closure of every NFA state at once.
 
-        while unmarked_states_list:
-            states = unmarked_states_list.pop()
-            dfa_states.append(states)
-            for alphabet in self.alphabet_list:
+        The ε-graph is condensed into strongly connected components with an
+        iterative Tarjan search. Components come out in reverse topological
+        order, so each component's closure is its own members OR-ed with the
+        already finished closures of its successors.
+
+        With ``nodes`` only the closures of those states are recomputed, and
+        ε-edges leaving them use the current ``closure_masks``; after an edit
+        these are the states that can reach the edited one.
+        """
+        count = len(self.nfa_state_names)
+        epsilon_edges = [[] for _ in range(count)]
+        full = nodes is None
+        if full:
+            nodes = range(count)
+            inside = [True] * count
+            for (state, alphabet), next_states in self.transition_functions.items():
                 if alphabet == 'ε':
+                    epsilon_edges[self.nfa_state_bits[state]] = [self.nfa_state_bits[name] for name in next_states]
+        else:
+            inside = [False] * count
+            for bit in nodes:
+                inside[bit] = True
+                next_states = self.transition_functions.get((self.nfa_state_names[bit], 'ε'), ())
+                epsilon_edges[bit] = [self.nfa_state_bits[name] for name in next_states]
+
+        index = [-1] * count
+        lowlink = [0] * count
+        on_stack = [False] * count
+        component = [-1] * count
+        component_closures = []
+        stack = []
+        counter = 0
+
+        for root in nodes:
+            if index[root] >= 0:
+                continue
+            work = [(root, 0)]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node, edge = work[-1]
+                edges = epsilon_edges[node]
+                if edge < len(edges):
+                    work[-1] = (node, edge + 1)
+                    child = edges[edge]
+                    if not inside[child]:
+                        continue
+                    if index[child] < 0:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = True
+                        work.append((child, 0))
+                    elif on_stack[child]:
+                        lowlink[node] = min(lowlink[node], index[child])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] != index[node]:
                     continue
-                next_states = set()
-                for state in states:
-                    if (state, alphabet) in self.transition_functions:
-                        next_states.update(
-                            self.epsilon_closure(
-                                self.transition_functions[(state, alphabet)],
-                                self.transition_functions
-                            )
-                        )
-                if not next_states:
-                    next_states.add('φ')
-                dfa_transitions[(", ".join(sorted(states)), alphabet)] = next_states
-                if next_states not in dfa_states and next_states not in unmarked_states_list:
-                    unmarked_states_list.append(next_states)
+
+                # node is the root of a finished component
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = len(component_closures)
+                    members.append(member)
+                    if member == node:
+                        break
+                closure = 0
+                for member in members:
+                    closure |= 1 << member
+                for member in members:
+                    for child in epsilon_edges[member]:
+                        if not inside[child]:
+                            closure |= self.closure_masks[child]
+                        elif component[child] != component[member]:
+                            closure |= component_closures[component[child]]
+                component_closures.append(closure)
+
+        if full:
+            return [component_closures[component[bit]] for bit in range(count)]
+        closures = list(self.closure_masks)
+        for bit in nodes:
+            closures[bit] = component_closures[component[bit]]
+        return closures
+
+    def compute_symbol_classes(self) -> List[List[str]]:
+        """Partition the symbols into classes with identical successor closures.
+
+        Two symbols are equivalent when, for every NFA state, the ε-closure of
+        its successors is the same, so the subset construction only has to
+        explore one representative per class.
+        """
+        symbol_set = set(self.symbols)
+        edges: Dict[str, List[Tuple[int, int]]] = {symbol: [] for symbol in self.symbols}
+        for (state, symbol), next_states in self.transition_functions.items():
+            if symbol not in symbol_set or not next_states:
+                continue
+            mask = 0
+            for next_state in next_states:
+                mask |= self.closure_masks[self.nfa_state_bits[next_state]]
+            edges[symbol].append((self.nfa_state_bits[state], mask))
+
+        classes: Dict[Tuple[Tuple[int, int], ...], List[str]] = {}
+        for symbol in self.symbols:
+            classes.setdefault(tuple(sorted(edges[symbol])), []).append(symbol)
+        return list(classes.values())
+
+    def closure_mask(self, mask: int) -> int:
+        """ε-closure of a subset, built from the per-state closures and cached."""
+        closure = self._subset_closures.get(mask)
+        if closure is None:
+            closure = 0
+            members = mask
+            while members:
+                low = members & -members
+                closure |= self.closure_masks[low.bit_length() - 1]
+                members ^= low
+            self._subset_closures[mask] = closure
+        return closure
+
+    def to_mask(self, states: Iterable[str]) -> int:
+        """Encode a set of NFA states as an integer bitmask."""
+        mask = 0
+        for state in states:
+            mask |= 1 << self.nfa_state_bits[state]
+        return mask
+
+    def to_states(self, mask: int) -> Set[str]:
+        """Decode a bitmask into a set of NFA states; the empty subset is 'φ'."""
+        if not mask:
+            return {'φ'}
+        states = set()
+        while mask:
+            low = mask & -mask
+            states.add(self.nfa_state_names[low.bit_length() - 1])
+            mask ^= low
+        return states
+
+    def subset_name(self, mask: int) -> str:
+        """Name of a DFA state as used in the string-keyed transition table."""
+        return ", ".join(sorted(self.to_states(mask)))
+
+    def step_mask(self, bit: int, column: int) -> int:
+        """ε-closure of the successors of one NFA state on one symbol class."""
+        key = (bit, column)
+        mask = self._step_masks.get(key)
+        if mask is None:
+            symbol = self.symbol_classes[column][0]
+            next_states = self.transition_functions.get((self.nfa_state_names[bit], symbol), ())
+            mask = 0
+            for state in next_states:
+                mask |= self.closure_masks[self.nfa_state_bits[state]]
+            self._step_masks[key] = mask
+        return mask
+
+    def subset_construction(self, start_mask: int):
+        """Build the DFA over NFA subsets encoded as bitmasks.
+
+        DFA state IDs are assigned in discovery order and indexed by subset in a
+        dict, so every lookup is O(1). Transitions are stored in a flat integer
+        table indexed by ``state * len(symbol_classes) + column``, one column
+        per alphabet equivalence class.
+        """
+        self._refresh_symbol_classes()
+        if self.stats is not None:
+            return self._subset_construction_instrumented(start_mask, self.stats)
+
+        width = len(self.symbol_classes)
+        subsets = [start_mask]
+        subset_ids = {start_mask: 0}
+        transitions = array('i', [-1]) * width
+        order = []
+        unmarked = [0]
+
+        while unmarked:
+            dfa_state = unmarked.pop()
+            order.append(dfa_state)
+            mask = subsets[dfa_state]
+            row = dfa_state * width
+            for column in range(width):
+                next_mask = 0
+                members = mask
+                while members:
+                    low = members & -members
+                    next_mask |= self.step_mask(low.bit_length() - 1, column)
+                    members ^= low
+                next_state = subset_ids.get(next_mask)
+                if next_state is None:
+                    next_state = len(subsets)
+                    subset_ids[next_mask] = next_state
+                    subsets.append(next_mask)
+                    transitions.extend(array('i', [-1]) * width)
+                    unmarked.append(next_state)
+                transitions[row + column] = next_state
+
+        accept_mask = self.accept_mask
+        return {
+            'subsets': subsets,
+            'symbol_ids': self.symbol_columns,
+            'width': width,
+            'transitions': transitions,
+            'start_state': 0,
+            'accept_states': [state for state, mask in enumerate(subsets) if mask & accept_mask],
+            'order': order,
+        }
+
+    def _subset_construction_instrumented(self, start_mask: int, stats: ConversionStats):
+        """subset_construction that also records phase timings and subset growth."""
+        width = len(self.symbol_classes)
+        subsets = [start_mask]
+        subset_ids = {start_mask: 0}
+        transitions = array('i', [-1]) * width
+        order = []
+        unmarked = [0]
+        step_masks = self._step_masks
+        step_seconds = 0.0
+        clock = time.perf_counter
+        started = clock()
+
+        while unmarked:
+            dfa_state = unmarked.pop()
+            order.append(dfa_state)
+            mask = subsets[dfa_state]
+            row = dfa_state * width
+            for column in range(width):
+                next_mask = 0
+                members = mask
+                while members:
+                    low = members & -members
+                    bit = low.bit_length() - 1
+                    if (bit, column) not in step_masks:
+                        step_started = clock()
+                        self.step_mask(bit, column)
+                        step_seconds += clock() - step_started
+                        stats.step_mask_computations += 1
+                    next_mask |= step_masks[(bit, column)]
+                    members ^= low
+                next_state = subset_ids.get(next_mask)
+                if next_state is None:
+                    next_state = len(subsets)
+                    subset_ids[next_mask] = next_state
+                    subsets.append(next_mask)
+                    transitions.extend(array('i', [-1]) * width)
+                    unmarked.append(next_state)
+                    if len(subsets) % stats.sample_every == 0:
+                        stats.subsets_over_time.append((clock() - started, len(subsets)))
+                transitions[row + column] = next_state
+
+        elapsed = clock() - started
+        stats.subsets_over_time.append((elapsed, len(subsets)))
+        stats.add_phase('step_closure', step_seconds)
+        stats.add_phase('subset_exploration', elapsed - step_seconds)
+        stats.dfa_states = len(subsets)
+        stats.dfa_transitions = len(subsets) * width
+
+        accept_mask = self.accept_mask
+        return {
+            'subsets': subsets,
+            'symbol_ids': self.symbol_columns,
+            'width': width,
+            'transitions': transitions,
+            'start_state': 0,
+            'accept_states': [state for state, mask in enumerate(subsets) if mask & accept_mask],
+            'order': order,
+        }
+
+    def search_dfa_state_and_transitions(self, dfa_start_states: Set[str], result=None):
+        """Search and build the DFA states and transitions based on NFA transitions."""
+        if result is None:
+            result = self.subset_construction(self.to_mask(dfa_start_states))
+        subsets = result['subsets']
+        transitions = result['transitions']
+        width = result['width']
+        columns = result['symbol_ids']
+
+        names = [self.subset_name(mask) for mask in subsets]
+        dfa_states = [self.to_states(subsets[state]) for state in result['order']]
+        dfa_transitions = {}
+        for state in result['order']:
+            for alphabet in self.symbols:
+                dfa_transitions[(names[state], alphabet)] = self.to_states(subsets[transitions[state * width + columns[alphabet]]])
 
         dfa_accept_states = [
-            state for state in dfa_states if any(s in self.accept_states for s in state)
+            self.to_states(subsets[state]) for state in result['order'] if subsets[state] & self.accept_mask
         ]
         return {
             "dfa_states": dfa_states,
             "dfa_accept_states": dfa_accept_states,
             "dfa_transitions": dfa_transitions
         }
+
+    def to_compiled_dfa(self, result=None, minimize: bool = False) -> CompiledDfa:
+        """Return the converted DFA as a CompiledDfa that DfaSimulator can run.
+
+        With ``minimize`` the DFA is passed through dfa_minimizer.minimize first.
+        """
+        if result is None:
+            start_mask = self.closure_masks[self.nfa_state_bits[self.start_state]]
+            result = self.subset_construction(start_mask)
+        subsets = result['subsets']
+
+        accept_bitmap = bytearray((len(subsets) + 7) >> 3)
+        for state in result['accept_states']:
+            accept_bitmap[state >> 3] |= 1 << (state & 7)
+
+        compiled = CompiledDfa(
+            [self.subset_name(mask) for mask in subsets],
+            dict(result['symbol_ids']),
+            result['width'],
+            result['transitions'],
+            result['start_state'],
+            accept_bitmap)
+        if minimize:
+            compiled = dfa_minimizer.minimize(compiled)
+        return compiled
+
+    def add_transition(self, state: str, symbol: str, next_state: str) -> None:
+        """Add the NFA transition ``state --symbol--> next_state``.
+
+        Only the affected ε-closures are recomputed here; call ``update`` to
+        rebuild the DFA from a previous result.
+        """
+        self._edit_transition(state, symbol, next_state, True)
+
+    def remove_transition(self, state: str, symbol: str, next_state: str) -> None:
+        """Remove the NFA transition ``state --symbol--> next_state`` if it exists."""
+        self._edit_transition(state, symbol, next_state, False)
+
+    def add_accept_state(self, state: str) -> None:
+        self._add_state(state)
+        self.accept_states = set(self.accept_states) | {state}
+        self.accept_mask |= 1 << self.nfa_state_bits[state]
+
+    def remove_accept_state(self, state: str) -> None:
+        self.accept_states = set(self.accept_states) - {state}
+        if state in self.nfa_state_bits:
+            self.accept_mask &= ~(1 << self.nfa_state_bits[state])
+
+    def update(self, result):
+        """Rebuild the subset construction after edits, reusing a previous result.
+
+        The DFA is explored again from the (possibly new) start subset in the
+        same order as ``subset_construction``, so the result is the same as a
+        fresh conversion. Subsets that contain no NFA state touched by the
+        edits take their transitions from ``result`` instead of recomputing
+        them; accept states are re-derived from the current accept mask.
+        """
+        self._refresh_symbol_classes()
+        dirty = self._dirty_mask
+        self._dirty_mask = 0
+
+        old_subsets = result['subsets']
+        old_ids = {mask: state for state, mask in enumerate(old_subsets)}
+        old_width = result['width']
+        old_transitions = result['transitions']
+        old_columns = result['symbol_ids']
+        # new column -> old column of its representative symbol (-1 for a new symbol)
+        column_map = [old_columns.get(members[0], -1) for members in self.symbol_classes]
+
+        width = len(self.symbol_classes)
+        start_mask = self.closure_masks[self.nfa_state_bits[self.start_state]]
+        subsets = [start_mask]
+        subset_ids = {start_mask: 0}
+        transitions = array('i', [-1]) * width
+        order = []
+        unmarked = [0]
+
+        while unmarked:
+            dfa_state = unmarked.pop()
+            order.append(dfa_state)
+            mask = subsets[dfa_state]
+            row = dfa_state * width
+            old_state = old_ids.get(mask) if not mask & dirty else None
+            for column in range(width):
+                if old_state is not None:
+                    old_column = column_map[column]
+                    next_mask = old_subsets[old_transitions[old_state * old_width + old_column]] if old_column >= 0 else 0
+                else:
+                    next_mask = 0
+                    members = mask
+                    while members:
+                        low = members & -members
+                        next_mask |= self.step_mask(low.bit_length() - 1, column)
+                        members ^= low
+                next_state = subset_ids.get(next_mask)
+                if next_state is None:
+                    next_state = len(subsets)
+                    subset_ids[next_mask] = next_state
+                    subsets.append(next_mask)
+                    transitions.extend(array('i', [-1]) * width)
+                    unmarked.append(next_state)
+                transitions[row + column] = next_state
+
+        accept_mask = self.accept_mask
+        return {
+            'subsets': subsets,
+            'symbol_ids': self.symbol_columns,
+            'width': width,
+            'transitions': transitions,
+            'start_state': 0,
+            'accept_states': [state for state, mask in enumerate(subsets) if mask & accept_mask],
+            'order': order,
+        }
+
+    def _add_state(self, state: str) -> None:
+        """Give a new NFA state the next free bit; existing subset masks stay valid."""
+        if state in self.nfa_state_bits:
+            return
+        bit = len(self.nfa_state_names)
+        self.nfa_state_names.append(state)
+        self.nfa_state_bits[state] = bit
+        self.closure_masks.append(1 << bit)
+        if self._epsilon_predecessors is not None:
+            self._epsilon_predecessors[bit] = set()
+            self._symbol_predecessors[bit] = set()
+
+    def _build_predecessors(self) -> None:
+        """Build the reverse ε and symbol edge indexes used to find affected states."""
+        count = len(self.nfa_state_names)
+        self._epsilon_predecessors = {bit: set() for bit in range(count)}
+        self._symbol_predecessors = {bit: set() for bit in range(count)}
+        for (state, symbol), next_states in self.transition_functions.items():
+            if state not in self.nfa_state_bits:
+                continue
+            predecessors = self._epsilon_predecessors if symbol == 'ε' else self._symbol_predecessors
+            for next_state in next_states:
+                predecessors[self.nfa_state_bits[next_state]].add(self.nfa_state_bits[state])
+
+    def _edit_transition(self, state: str, symbol: str, next_state: str, add: bool) -> None:
+        key = (state, symbol)
+        next_states = set(self.transition_functions.get(key, ()))
+        if (next_state in next_states) == add:
+            return
+
+        self._add_state(state)
+        self._add_state(next_state)
+        if self._epsilon_predecessors is None:
+            self._build_predecessors()
+        if symbol != 'ε' and symbol not in self.symbols:
+            self.symbols.append(symbol)
+
+        if add:
+            next_states.add(next_state)
+        else:
+            next_states.discard(next_state)
+        if next_states:
+            self.transition_functions[key] = next_states
+        else:
+            del self.transition_functions[key]
+
+        bit = self.nfa_state_bits[state]
+        next_bit = self.nfa_state_bits[next_state]
+        if symbol == 'ε':
+            predecessors = self._epsilon_predecessors[next_bit]
+            still_linked = False
+        else:
+            predecessors = self._symbol_predecessors[next_bit]
+            still_linked = any(next_state in self.transition_functions.get((state, other), ()) for other in self.symbols)
+        if add:
+            predecessors.add(bit)
+        elif not still_linked:
+            predecessors.discard(bit)
+
+        dirty = 1 << bit
+        if symbol == 'ε':
+            dirty |= self._update_closures(bit)
+        self._dirty_mask |= dirty
+        self._classes_stale = True
+
+        members = dirty
+        while members:
+            low = members & -members
+            for column in range(len(self.symbol_classes)):
+                self._step_masks.pop((low.bit_length() - 1, column), None)
+            members ^= low
+
+    def _update_closures(self, bit: int) -> int:
+        """Recompute the closures of the states that ε-reach ``bit``.
+
+        Returns the states whose successor closures changed: those with a new
+        closure plus every state with a symbol edge into one of them.
+        """
+        affected = {bit}
+        stack = [bit]
+        while stack:
+            for previous in self._epsilon_predecessors[stack.pop()]:
+                if previous not in affected:
+                    affected.add(previous)
+                    stack.append(previous)
+
+        closures = self.compute_closure_masks(sorted(affected))
+        changed = [state for state in affected if closures[state] != self.closure_masks[state]]
+        self.closure_masks = closures
+        if not changed:
+            return 0
+        self._subset_closures.clear()
+
+        dirty = 0
+        for state in changed:
+            dirty |= 1 << state
+            for previous in self._symbol_predecessors[state]:
+                dirty |= 1 << previous
+        return dirty
+
+    def _refresh_symbol_classes(self) -> None:
+        """Recompute the alphabet classes after edits; cached steps are per column, so they go too."""
+        if not self._classes_stale:
+            return
+        self._classes_stale = False
+        classes = self.compute_symbol_classes()
+        if classes != self.symbol_classes:
+            self.symbol_classes = classes
+            self.symbol_columns = {
+                symbol: column for column, members in enumerate(classes) for symbol in members
+            }
+            self._step_masks.clear()
@@ -4,6 +4,7 @@ This module tests the NFA to DFA conversion using the NfaToDfaConverter class.
 
 import unittest
 from nfa_to_dfa_converter import NfaToDfaConverter
+from regex_to_nfa import regex_to_nfa
 
 class TestNfaToDfaConverter(unittest.TestCase):
     '''
@@ -176,6 +177,128 @@ class TestNfaToDfaConverter(unittest.TestCase):
         self.assertEqual(result['dfa_start_states'], expected_dfa_start_states)
         self.assertEqual(result['dfa_accept_states'], expected_dfa_accept_states)
 
+    def test_compiled_dfa(self):
+        '''Tests that the integer transition table runs on the simulator engine.'''
+        converter = NfaToDfaConverter({
+            'states': { 'q1', 'q2', 'q3' },
+            'alphabet_list': { 'a', 'b' },
+            'transition_functions': {
+                ('q1', 'ε'): { 'q2' },
+                ('q1', 'a'): { 'q3' },
+                ('q2', 'a'): { 'q1' },
+                ('q3', 'a'): { 'q2' },
+                ('q3', 'b'): { 'q2', 'q3' },
+            },
+            'start_state': 'q1',
+            'accept_states': { 'q2' }
+        })
+        compiled = converter.to_compiled_dfa()
+
+        self.assertEqual(compiled.state_names[compiled.start_state], 'q1, q2')
+        for case, expected in [('', True), ('a', True), ('b', False), ('ab', True), ('abba', True), ('abb', True)]:
+            state, completed = compiled.run(case)
+            self.assertTrue(completed)
+            self.assertEqual(compiled.is_accept(state), expected, case)
+
+    def test_symbol_classes(self):
+        '''Tests that symbols with identical transitions share one column.'''
+        letters = {chr(code) for code in range(ord('a'), ord('z') + 1)}
+        transitions = {('q0', letter): { 'q1' } for letter in letters}
+        transitions[('q1', 'x')] = { 'q2' }
+        transitions[('q1', 'y')] = { 'q2' }
+        converter = NfaToDfaConverter({
+            'states': { 'q0', 'q1', 'q2' },
+            'alphabet_list': letters,
+            'transition_functions': transitions,
+            'start_state': 'q0',
+            'accept_states': { 'q2' }
+        })
+
+        # x, y とそれ以外の24文字の2つの同値類
+        self.assertEqual(len(converter.symbol_classes), 2)
+        compiled = converter.to_compiled_dfa()
+        self.assertEqual(compiled.width, 2)
+        for case, expected in [('ax', True), ('zy', True), ('ab', False), ('x', False), ('axa', False)]:
+            state, _ = compiled.run(case)
+            self.assertEqual(compiled.is_accept(state), expected, case)
+
+        # 文字列キーの遷移表は記号ごとに展開される
+        result = converter.execute()
+        self.assertEqual(len(result['dfa_transition_functions']), len(result['dfa_states']) * len(letters))
+        self.assertEqual(result['dfa_transition_functions'][('q1', 'y')], { 'q2' })
+        self.assertEqual(result['dfa_transition_functions'][('q1', 'b')], { 'φ' })
+
+    def test_incremental_update(self):
+        '''Tests that edits followed by update give the same DFA as a fresh conversion.'''
+        def config(transitions, accept_states):
+            return {
+                'states': { 'q1', 'q2', 'q3' },
+                'alphabet_list': ['a', 'b'],
+                'transition_functions': transitions,
+                'start_state': 'q1',
+                'accept_states': accept_states
+            }
+
+        converter = NfaToDfaConverter(config({
+            ('q1', 'a'): { 'q2' },
+            ('q2', 'b'): { 'q3' },
+            ('q3', 'a'): { 'q1' },
+        }, { 'q3' }))
+        result = converter.subset_construction(converter.to_mask(converter.epsilon_closure({ 'q1' }, converter.transition_functions)))
+
+        converter.add_transition('q2', 'ε', 'q3')
+        converter.remove_transition('q3', 'a', 'q1')
+        converter.add_transition('q3', 'b', 'q1')
+        converter.add_accept_state('q1')
+        result = converter.update(result)
+
+        expected = NfaToDfaConverter(config({
+            ('q1', 'a'): { 'q2' },
+            ('q2', 'b'): { 'q3' },
+            ('q2', 'ε'): { 'q3' },
+            ('q3', 'b'): { 'q1' },
+        }, { 'q1', 'q3' })).execute()
+        self.assertEqual(converter.execute(result), expected)
+
+    def test_closure_cycles(self):
+        '''Tests the SCC-based ε-closures against a depth-first search on ε-cycles.'''
+        def assertClosures(converter):
+            # 遷移表のコピーを渡すと深さ優先探索で求める
+            transitions = dict(converter.transition_functions)
+            for bit, name in enumerate(converter.nfa_state_names):
+                expected = converter.epsilon_closure({ name }, transitions)
+                self.assertEqual(converter.to_states(converter.closure_masks[bit]), expected, name)
+
+        # q1 -> q2 -> q3 -> q1 のε閉路から出口 q4 へ抜け、q4 -> q5 -> q4 の閉路が続く
+        converter = NfaToDfaConverter({
+            'states': { 'q0', 'q1', 'q2', 'q3', 'q4', 'q5', 'q6' },
+            'alphabet_list': { 'a' },
+            'transition_functions': {
+                ('q0', 'ε'): { 'q1' },
+                ('q1', 'ε'): { 'q2' },
+                ('q2', 'ε'): { 'q3' },
+                ('q3', 'ε'): { 'q1', 'q4' },
+                ('q4', 'ε'): { 'q5' },
+                ('q5', 'ε'): { 'q4' },
+                ('q5', 'a'): { 'q6' },
+            },
+            'start_state': 'q0',
+            'accept_states': { 'q6' }
+        })
+        assertClosures(converter)
+        self.assertEqual(converter.to_states(converter.closure_masks[converter.nfa_state_bits['q2']]),
+                         { 'q1', 'q2', 'q3', 'q4', 'q5' })
+
+        # 差分更新で2つの閉路がつながる場合
+        converter.add_transition('q5', 'ε', 'q2')
+        assertClosures(converter)
+        converter.add_transition('q6', 'ε', 'q0')
+        assertClosures(converter)
+
+        # 入れ子になった繰り返しのThompson NFA
+        assertClosures(NfaToDfaConverter(regex_to_nfa('((a*)*|b)*')))
+        assertClosures(NfaToDfaConverter(regex_to_nfa('(a|(b*c?)*)*d*')))
+
 if __name__ == '__main__':
     unittest.main()
     def test_case3(self):
@@ -0,0 +1,296 @@
+"""Module for running DFA test cases in parallel on a process pool."""
+
+from typing import List, Dict, Tuple, Iterable, Iterator
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import codecs
+import itertools
+import mmap
+import os
+
+from dfa_simulator import CompiledDfa
+from result_sink import SimulationResult
+
+class SharedCompiledDfa:
+    """Copies a CompiledDfa's transition table and accept bitmap into shared memory.
+
+    Worker processes attach to the block by name instead of receiving the
+    table with every task. ``spec`` holds everything else a worker needs.
+    """
+
+    def __init__(self, compiled: CompiledDfa):
+        table = compiled.table if isinstance(compiled.table, array) else array('i', compiled.table)
+        table_bytes = table.tobytes()
+        accept_bytes = bytes(compiled.accept_bitmap)
+
+        self.memory = shared_memory.SharedMemory(create=True, size=max(1, len(table_bytes) + len(accept_bytes)))
+        self.memory.buf[:len(table_bytes)] = table_bytes
+        self.memory.buf[len(table_bytes):len(table_bytes) + len(accept_bytes)] = accept_bytes
+
+        self.spec: Tuple = (
+            self.memory.name,
+            len(table_bytes),
+            len(accept_bytes),
+            compiled.num_states,
+            compiled.width,
+            compiled.symbol_ids,
+            compiled.start_state,
+        )
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self) -> 'SharedCompiledDfa':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ワーカープロセス内で共有メモリから組み立てたDFA
+_worker_memory = None
+_worker_compiled = None
+
+
+def attach_shared_dfa(spec: Tuple) -> CompiledDfa:
+    """Build a CompiledDfa on top of a shared memory block created by SharedCompiledDfa."""
+    global _worker_memory
+    name, table_size, accept_size, num_states, width, symbol_ids, start_state = spec
+
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    buffer = _worker_memory.buf
+    table = buffer[:table_size].cast('i')
+    accept_bitmap = buffer[table_size:table_size + accept_size]
+    return CompiledDfa(range(num_states), symbol_ids, width, table, start_state, accept_bitmap)
+
+
+def _init_worker(spec: Tuple) -> None:
+    global _worker_compiled
+    _worker_compiled = attach_shared_dfa(spec)
+
+
+def run_cases(compiled: CompiledDfa, cases: List[str]) -> SimulationResult:
+    """Run a list of cases and return their SimulationResult."""
+    result = SimulationResult(array('b', bytes(len(cases))))
+    accepted = result.accepted
+    errors = result.error_indices
+    run = compiled.run
+    is_accept = compiled.is_accept
+    for index, case in enumerate(cases):
+        state, completed = run(case)
+        if is_accept(state):
+            accepted[index] = 1
+        if not completed:
+            errors.append(index)
+    return result
+
+
+def _run_chunk(cases: List[str]) -> SimulationResult:
+    return run_cases(_worker_compiled, cases)
+
+
+def chunked(cases: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    iterator = iter(cases)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelDfaSimulator:
+    """Shards test cases across a ProcessPoolExecutor that shares one transition table.
+
+    Chunks of ``chunk_size`` cases are sent to the workers and the results are
+    merged in input order. At most ``max_pending`` chunks are in flight, so a
+    streamed input is processed in bounded memory.
+    """
+
+    def __init__(self, compiled: CompiledDfa, workers: int = None, chunk_size: int = 10000, max_pending: int = None):
+        self.compiled: CompiledDfa = compiled
+        self.workers: int = workers or os.cpu_count() or 1
+        self.chunk_size: int = chunk_size
+        self.max_pending: int = max_pending or self.workers * 2
+
+    def execute_chunks(self, cases: Iterable[str]) -> Iterator[Tuple[List[str], SimulationResult]]:
+        """Yield (cases, SimulationResult) for each chunk, in input order."""
+        with SharedCompiledDfa(self.compiled) as shared, ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(shared.spec,)) as executor:
+            pending = deque()
+            for chunk in chunked(cases, self.chunk_size):
+                pending.append((chunk, executor.submit(_run_chunk, chunk)))
+                if len(pending) >= self.max_pending:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            for chunk, future in pending:
+                yield chunk, future.result()
+
+    def execute(self, cases: Iterable[str]) -> SimulationResult:
+        """Run every case and return the merged SimulationResult."""
+        result = SimulationResult()
+        for _, chunk_result in self.execute_chunks(cases):
+            result.extend(chunk_result)
+        return result
+
+
+def chunk_mapping(compiled: CompiledDfa, chunk: str, start_states: Iterable[int], block: int = 4096) -> Dict[int, int]:
+    """Map each start state to the state reached after ``chunk``.
+
+    A run that stops on a missing transition in state ``s`` maps to ``~s``.
+    The chunk is translated to column numbers once, and the runs advance
+    together ``block`` characters at a time with ``CompiledDfa.run_encoded``;
+    runs that meet in the same state are merged after each block, and once a
+    single state is left the rest of the chunk is run in one go.
+    """
+    result: Dict[int, int] = {}
+
+    # 列番号に変換するのはチャンク全体で1回だけにする
+    encoded = compiled.encode(chunk)
+    if encoded is None:
+        run = compiled.run
+    else:
+        chunk, run = encoded, compiled.run_encoded
+
+    # 現在の状態 -> その状態にいる開始状態のリスト
+    lanes: Dict[int, List[int]] = {state: [state] for state in start_states}
+    offset = 0
+    while lanes and offset < len(chunk):
+        if len(lanes) == 1:
+            part = chunk[offset:] if offset else chunk
+            offset = len(chunk)
+        else:
+            part = chunk[offset:offset + block]
+            offset += block
+
+        next_lanes: Dict[int, List[int]] = {}
+        for state, origins in lanes.items():
+            last_state, completed = run(part, state)
+            if not completed:
+                for origin in origins:
+                    result[origin] = ~last_state
+                continue
+            merged = next_lanes.get(last_state)
+            if merged is None:
+                next_lanes[last_state] = origins
+            else:
+                merged.extend(origins)
+        lanes = next_lanes
+
+    for state, origins in lanes.items():
+        for origin in origins:
+            result[origin] = state
+    return result
+
+
+def likely_states(compiled: CompiledDfa, context: str) -> List[int]:
+    """Guess the states a run can be in after ``context`` by running it from every state."""
+    states = {state for state in chunk_mapping(compiled, context, range(compiled.num_states)).values() if state >= 0}
+    return sorted(states) if states else list(range(compiled.num_states))
+
+
+def read_file_chunk(path: str, start: int, end: int, encoding: str) -> str:
+    with open(path, 'rb') as file:
+        file.seek(start)
+        return file.read(end - start).decode(encoding)
+
+
+def _map_chunk(source: Tuple, context: str, speculate: bool) -> Dict[int, int]:
+    compiled = _worker_compiled
+    chunk = read_file_chunk(*source) if isinstance(source, tuple) else source
+    start_states = likely_states(compiled, context) if speculate else range(compiled.num_states)
+    return chunk_mapping(compiled, chunk, start_states)
+
+
+class ChunkParallelDfaSimulator:
+    """Runs one huge input by splitting it into chunks that are simulated in parallel.
+
+    Each worker computes its chunk's state-to-state mapping, either from every
+    state or, with ``speculate``, only from the states that the preceding
+    ``context`` characters lead to. The mappings are then applied in order
+    from the start state; they compose associatively, and with one mapping
+    per chunk the fold costs next to nothing. If a speculative mapping misses
+    the actual incoming state, that chunk is re-run sequentially, so the result
+    is always exactly that of ``CompiledDfa.run``.
+    """
+
+    def __init__(self, compiled: CompiledDfa, workers: int = None, chunks: int = None,
+                 speculate: bool = False, context: int = 64):
+        self.compiled: CompiledDfa = compiled
+        self.workers: int = workers or os.cpu_count() or 1
+        self.chunks: int = chunks or self.workers
+        self.speculate: bool = speculate
+        self.context: int = context
+
+        # 推測が外れて逐次に実行し直したチャンクの数
+        self.respeculations: int = 0
+
+    def execute(self, text: str) -> Tuple[int, bool]:
+        """Run a string and return (last state, completed) like ``CompiledDfa.run``."""
+        size = -(-len(text) // self.chunks) or 1
+        bounds = [(start, min(start + size, len(text))) for start in range(0, len(text), size)]
+        sources = [text[start:end] for start, end in bounds]
+        contexts = [text[max(0, start - self.context):start] for start, _ in bounds]
+        return self._fold(sources, contexts, lambda source: source)
+
+    def execute_file(self, path: str, encoding: str = 'utf-8') -> Tuple[int, bool]:
+        """Run a whole file as one input; workers read their own byte ranges.
+
+        The file is decoded without newline translation, as ``run_whole`` reads
+        it. Chunks are cut between UTF-8 sequences, so only UTF-8 is accepted.
+        """
+        if codecs.lookup(encoding).name != 'utf-8':
+            raise ValueError(f'UTF-8 以外のエンコーディングには対応していません: {encoding}')
+
+        with open(path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(file.fileno()).st_size else b''
+
+        length = len(data)
+        size = -(-length // self.chunks) or 1
+        cuts = [0]
+        for cut in range(size, length, size):
+            # UTF-8 の継続バイトの途中では切らない
+            while cut < length and data[cut] & 0xC0 == 0x80:
+                cut += 1
+            if cut > cuts[-1] and cut < length:
+                cuts.append(cut)
+        cuts.append(length)
+
+        sources = [(path, start, end, encoding) for start, end in zip(cuts, cuts[1:])]
+        contexts = []
+        for start, _ in zip(cuts, cuts[1:]):
+            context_start = max(0, start - self.context * 4)
+            while context_start < start and data[context_start] & 0xC0 == 0x80:
+                context_start += 1
+            contexts.append(bytes(data[context_start:start]).decode(encoding)[-self.context:])
+        if isinstance(data, mmap.mmap):
+            data.close()
+        return self._fold(sources, contexts, lambda source: read_file_chunk(*source))
+
+    def _fold(self, sources: List, contexts: List[str], load) -> Tuple[int, bool]:
+        compiled = self.compiled
+        state = compiled.start_state
+        if not sources:
+            return state, True
+
+        with SharedCompiledDfa(compiled) as shared, ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(shared.spec,)) as executor:
+            futures = [
+                executor.submit(_map_chunk, source, context, self.speculate)
+                for source, context in zip(sources, contexts)
+            ]
+            for source, future in zip(sources, futures):
+                mapping = future.result()
+                next_state = mapping.get(state)
+                if next_state is None:
+                    self.respeculations += 1
+                    last_state, completed = compiled.run(load(source), state)
+                    next_state = last_state if completed else ~last_state
+                if next_state < 0:
+                    for remaining in futures:
+                        remaining.cancel()
+                    return ~next_state, False
+                state = next_state
+        return state, True
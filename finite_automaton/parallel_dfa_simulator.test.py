@@ -0,0 +1,100 @@
+'''
+This module tests the process-pool simulators in parallel_dfa_simulator.
+'''
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import unittest
+from automaton_generator import random_compiled_dfa, noisy_inputs
+from dfa_simulator import CompiledDfa, DfaSimulator, run_whole
+from result_sink import JsonlSink
+from parallel_dfa_simulator import ParallelDfaSimulator, ChunkParallelDfaSimulator, SharedCompiledDfa, attach_shared_dfa
+
+class TestParallelDfaSimulator(unittest.TestCase):
+    '''
+    Test cases for verifying that the process pool gives the same results as DfaSimulator.execute.
+    '''
+    def setUp(self):
+        self.compiled = random_compiled_dfa(0, 8, list('ab'), missing=0.1)
+        self.cases = noisy_inputs(1, list('ab'), list('c'), 500, 25, 0.02)
+
+    def test_shared_dfa(self):
+        '''Tests that a DFA attached to the shared memory block runs like the original.'''
+        with SharedCompiledDfa(self.compiled) as shared:
+            attached = attach_shared_dfa(shared.spec)
+            for case in self.cases:
+                self.assertEqual(attached.run(case), self.compiled.run(case), case)
+            del attached
+
+    def test_execute(self):
+        '''Tests the ordered merge and error_indices offsets across many small chunks.'''
+        expected = DfaSimulator.from_compiled(self.compiled, self.cases).execute()
+        self.assertTrue(expected.error_indices)
+
+        parallel = ParallelDfaSimulator(self.compiled, workers=2, chunk_size=37, max_pending=2)
+        chunks = list(parallel.execute_chunks(iter(self.cases)))
+        self.assertGreater(len(chunks), parallel.max_pending)
+        self.assertEqual([case for chunk, _ in chunks for case in chunk], self.cases)
+
+        result = parallel.execute(iter(self.cases))
+        self.assertEqual(list(result.accepted), list(expected.accepted))
+        self.assertEqual(result.error_indices, expected.error_indices)
+
+        self.assertEqual(len(parallel.execute([])), 0)
+
+class TestChunkParallelDfaSimulator(unittest.TestCase):
+    '''
+    Test cases for verifying that chunk-parallel runs of one input match CompiledDfa.run.
+    '''
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def test_execute(self):
+        '''Tests execute and execute_file on random inputs with and without speculation.'''
+        for seed in range(10):
+            compiled = random_compiled_dfa(seed, 8, list('ab\r\nあ'), missing=0.02)
+            (text,) = noisy_inputs(seed, list('ab\r\nあ'), list('x'), 1, 400, 0.002)
+            path = self.write(f'input{seed}.txt', text.encode('utf-8'))
+            expected = compiled.run(text)
+            for speculate in (False, True):
+                simulator = ChunkParallelDfaSimulator(compiled, workers=2, chunks=7, speculate=speculate, context=4)
+                self.assertEqual(simulator.execute(text), expected, (seed, speculate))
+                self.assertEqual(simulator.execute_file(path), expected, (seed, speculate))
+
+    def test_crlf(self):
+        '''Tests that --whole gives the same answer with and without --workers on a CRLF file.'''
+        compiled = CompiledDfa.from_config(
+            {'q0', 'q1', 'q2', 'q3'}, {'x', '\r', '\n'},
+            {('q0', 'x'): 'q0', ('q0', '\r'): 'q1', ('q1', '\n'): 'q2'}, 'q0', {'q2'})
+        path = self.write('crlf.txt', b'xx\r\n')
+        self.assertEqual(ChunkParallelDfaSimulator(compiled, workers=2).execute_file(path), compiled.run('xx\r\n'))
+
+        outputs = []
+        for workers in (0, 2):
+            output = io.StringIO()
+            with JsonlSink(output) as sink:
+                run_whole(DfaSimulator.from_compiled(compiled, []),
+                          argparse.Namespace(stream=path, workers=workers, stats=None), sink)
+            outputs.append(json.loads(output.getvalue()))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], {'case': path, 'accepted': True, 'error': False})
+
+    def test_encoding(self):
+        '''Tests that encodings whose chunks cannot be cut like UTF-8 are rejected.'''
+        path = self.write('input.txt', b'ab')
+        with self.assertRaises(ValueError):
+            ChunkParallelDfaSimulator(random_compiled_dfa(0, 8, list('ab')), workers=2).execute_file(path, encoding='utf-16')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+"""Module for building NFAs from regular expressions (Thompson construction).
+
+Supported syntax: concatenation, ``|``, ``*``, ``+``, ``?``, grouping with
+``( )``, character classes such as ``[abc]``, ``[a-z]`` and ``[^0-9]``, ``.``
+and ``\\`` escapes. A pattern matches whole inputs only.
+"""
+
+from typing import List, Dict, Set, Tuple, FrozenSet
+from functools import lru_cache
+
+from dfa_simulator import CompiledDfa, DfaSimulator
+from nfa_to_dfa_converter import NfaToDfaConverter
+
+class RegexParser:
+    """Recursive-descent parser that emits a Thompson NFA while parsing.
+
+    ``.`` and negated classes need to know the alphabet; when none is given the
+    characters that appear in the pattern are used. Their edges are therefore
+    recorded as placeholders and added once the whole pattern has been parsed.
+    """
+
+    def __init__(self, pattern: str, alphabet: Set[str] = None):
+        self.pattern: str = pattern
+        self.position: int = 0
+        self.alphabet: Set[str] = set(alphabet) if alphabet is not None else set()
+
+        # アルファベットが指定されていない場合は、否定の文字クラスに現れる文字も含める
+        self.infer_alphabet: bool = alphabet is None
+
+        self.transitions: Dict[Tuple[str, str], Set[str]] = {}
+        self.state_count: int = 0
+
+        # アルファベットが確定してから展開する (遷移元, 遷移先, 除く文字) の組 (. と否定の文字クラス)
+        self.complements: List[Tuple[str, str, Set[str]]] = []
+
+    def new_state(self) -> str:
+        state = f"s{self.state_count}"
+        self.state_count += 1
+        return state
+
+    def add_edge(self, from_state: str, symbol: str, to_state: str) -> None:
+        self.transitions.setdefault((from_state, symbol), set()).add(to_state)
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"正規表現の構文エラー ({self.position} 文字目): {message}: {self.pattern!r}")
+
+    def peek(self) -> str:
+        return self.pattern[self.position] if self.position < len(self.pattern) else ''
+
+    def parse(self) -> Dict:
+        """Parse the whole pattern and return the NFA in NfaToDfaConverter's config format."""
+        start, accept = self.parse_alternation()
+        if self.position < len(self.pattern):
+            raise self.error('対応しない ")" があります')
+
+        for from_state, to_state, excluded in self.complements:
+            for symbol in self.alphabet - excluded:
+                self.add_edge(from_state, symbol, to_state)
+
+        states = {f"s{index}" for index in range(self.state_count)}
+        return {
+            'states': states,
+            'alphabet_list': set(self.alphabet),
+            'transition_functions': self.transitions,
+            'start_state': start,
+            'accept_states': {accept},
+        }
+
+    def parse_alternation(self) -> Tuple[str, str]:
+        branches = [self.parse_concatenation()]
+        while self.peek() == '|':
+            self.position += 1
+            branches.append(self.parse_concatenation())
+        if len(branches) == 1:
+            return branches[0]
+
+        start, accept = self.new_state(), self.new_state()
+        for branch_start, branch_accept in branches:
+            self.add_edge(start, 'ε', branch_start)
+            self.add_edge(branch_accept, 'ε', accept)
+        return start, accept
+
+    def parse_concatenation(self) -> Tuple[str, str]:
+        fragments = []
+        while self.peek() not in ('', '|', ')'):
+            fragments.append(self.parse_repetition())
+        if not fragments:
+            # 空の選択肢は空文字列にマッチする
+            state = self.new_state()
+            return state, state
+
+        start, accept = fragments[0]
+        for next_start, next_accept in fragments[1:]:
+            self.add_edge(accept, 'ε', next_start)
+            accept = next_accept
+        return start, accept
+
+    def parse_repetition(self) -> Tuple[str, str]:
+        start, accept = self.parse_atom()
+        while self.peek() in ('*', '+', '?'):
+            operator = self.peek()
+            self.position += 1
+            new_start, new_accept = self.new_state(), self.new_state()
+            self.add_edge(new_start, 'ε', start)
+            self.add_edge(accept, 'ε', new_accept)
+            if operator in ('*', '?'):
+                self.add_edge(new_start, 'ε', new_accept)
+            if operator in ('*', '+'):
+                self.add_edge(accept, 'ε', start)
+            start, accept = new_start, new_accept
+        return start, accept
+
+    def parse_atom(self) -> Tuple[str, str]:
+        char = self.peek()
+        if char in ('*', '+', '?'):
+            raise self.error(f'"{char}" の前に繰り返す対象がありません')
+        self.position += 1
+
+        if char == '(':
+            fragment = self.parse_alternation()
+            if self.peek() != ')':
+                raise self.error('")" が閉じられていません')
+            self.position += 1
+            return fragment
+        negated = False
+        if char == '[':
+            negated, symbols = self.parse_class()
+        elif char == '.':
+            negated, symbols = True, set()
+        elif char == '\\':
+            symbols = {self.parse_escape()}
+        else:
+            symbols = {char}
+
+        start, accept = self.new_state(), self.new_state()
+        if negated:
+            self.complements.append((start, accept, symbols))
+            if self.infer_alphabet:
+                self.alphabet.update(symbols)
+            return start, accept
+        for symbol in symbols:
+            self.alphabet.add(symbol)
+            self.add_edge(start, symbol, accept)
+        return start, accept
+
+    def parse_escape(self) -> str:
+        if self.position >= len(self.pattern):
+            raise self.error('"\\" の後に文字がありません')
+        char = self.pattern[self.position]
+        self.position += 1
+        return char
+
+    def parse_class(self) -> Tuple[bool, Set[str]]:
+        """Parse a class after "[" and return (negated, listed characters)."""
+        negated = self.peek() == '^'
+        if negated:
+            self.position += 1
+
+        symbols: Set[str] = set()
+        first = True
+        while True:
+            if self.position >= len(self.pattern):
+                raise self.error('"]" が閉じられていません')
+            char = self.pattern[self.position]
+            self.position += 1
+            if char == ']' and not first:
+                break
+            first = False
+            if char == '\\':
+                char = self.parse_escape()
+
+            if self.peek() == '-' and self.position + 1 < len(self.pattern) and self.pattern[self.position + 1] != ']':
+                self.position += 1
+                end = self.pattern[self.position]
+                self.position += 1
+                if end == '\\':
+                    end = self.parse_escape()
+                if ord(end) < ord(char):
+                    raise self.error(f'範囲 {char}-{end} が逆順です')
+                symbols.update(chr(code) for code in range(ord(char), ord(end) + 1))
+            else:
+                symbols.add(char)
+
+        return negated, symbols
+
+
+def regex_to_nfa(pattern: str, alphabet: Set[str] = None) -> Dict:
+    """Return the Thompson NFA of a pattern as a config for NfaToDfaConverter."""
+    return RegexParser(pattern, alphabet).parse()
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str, alphabet: FrozenSet[str], minimize: bool) -> CompiledDfa:
+    converter = NfaToDfaConverter(regex_to_nfa(pattern, alphabet))
+    return converter.to_compiled_dfa(minimize=minimize)
+
+
+def compile_regex(pattern: str, alphabet: Set[str] = None, minimize: bool = True) -> CompiledDfa:
+    """Compile a pattern into a DFA for DfaSimulator, reusing earlier compilations.
+
+    Results are kept in an LRU cache keyed by (pattern, alphabet, minimize).
+    """
+    return _compile(pattern, frozenset(alphabet) if alphabet is not None else None, minimize)
+
+
+def regex_simulator(pattern: str, test_cases: List[str], alphabet: Set[str] = None) -> DfaSimulator:
+    """Return a DfaSimulator that runs the test cases against the compiled pattern."""
+    return DfaSimulator.from_compiled(compile_regex(pattern, alphabet), test_cases)
@@ -0,0 +1,80 @@
+'''
+This module tests the regular expression front end in regex_to_nfa.
+'''
+
+import itertools
+import re
+import unittest
+from nfa_to_dfa_converter import NfaToDfaConverter
+from regex_to_nfa import regex_to_nfa, compile_regex, regex_simulator
+
+class TestRegexToNfa(unittest.TestCase):
+    '''
+    Test cases for verifying that compiled patterns accept exactly the matching strings.
+    '''
+    def assertMatchesLikeRe(self, pattern, expected_pattern, alphabet, length=5):
+        compiled = compile_regex(pattern, alphabet)
+        expected = re.compile(expected_pattern)
+        for size in range(length + 1):
+            for characters in itertools.product(sorted(alphabet), repeat=size):
+                case = ''.join(characters)
+                state, completed = compiled.run(case)
+                accepted = completed and compiled.is_accept(state)
+                self.assertEqual(accepted, expected.fullmatch(case) is not None, (pattern, case))
+
+    def test_operators(self):
+        '''Tests concatenation, alternation, repetition and grouping.'''
+        for pattern in ['ab', 'a|b', 'a*', '(ab)*', 'a+b?', '(a|b)*abb', '(a|)b', '((a))', 'a|']:
+            self.assertMatchesLikeRe(pattern, pattern, set('abc'))
+
+    def test_classes(self):
+        '''Tests character classes, ranges, negation, "." and escapes.'''
+        alphabet = set('abcd*-')
+        self.assertMatchesLikeRe('[a-c]+', '[a-c]+', alphabet)
+        self.assertMatchesLikeRe('[^ab]d', '[cd*\\-]d', alphabet)
+        self.assertMatchesLikeRe('.a.', '[abcd*\\-]a[abcd*\\-]', alphabet)
+        self.assertMatchesLikeRe('\\*[-a]', '\\*[-a]', alphabet)
+
+    def test_inferred_alphabet(self):
+        '''Tests "." and negated classes without an alphabet, where later atoms add characters.'''
+        for pattern, expected_pattern, alphabet in [
+                ('.-', '[\\-]-', set('-')),
+                ('.[x-z]', '[x-z][x-z]', set('xyz')),
+                ('[^a]b.', '[b]b[ab]', set('ab')),
+                ('a.|[^-b]c', 'a[-abc]|[ac]c', set('abc-')),
+        ]:
+            self.assertEqual(set(compile_regex(pattern).symbol_ids), alphabet, pattern)
+            compiled = compile_regex(pattern)
+            expected = re.compile(expected_pattern)
+            for size in range(4):
+                for characters in itertools.product(sorted(alphabet), repeat=size):
+                    case = ''.join(characters)
+                    state, completed = compiled.run(case)
+                    accepted = completed and compiled.is_accept(state)
+                    self.assertEqual(accepted, expected.fullmatch(case) is not None, (pattern, case))
+
+    def test_thompson_config(self):
+        '''Tests that the NFA uses the converter's config format with ε edges.'''
+        config = regex_to_nfa('a*')
+        self.assertIn('ε', {symbol for _, symbol in config['transition_functions']})
+        self.assertEqual(config['alphabet_list'], { 'a' })
+        self.assertEqual(len(config['accept_states']), 1)
+        NfaToDfaConverter(config).execute()
+
+    def test_cache_and_simulator(self):
+        '''Tests that compiled patterns are reused and can be run by DfaSimulator.'''
+        self.assertIs(compile_regex('(a|b)*abb'), compile_regex('(a|b)*abb'))
+        self.assertEqual(compile_regex('(a|b)*abb').num_states, 4)
+
+        result = regex_simulator('(a|b)*abb', ['abb', 'babb', 'ab', 'abc']).execute()
+        self.assertEqual(list(result.accepted), [1, 1, 0, 0])
+        self.assertEqual(result.error_indices, [3])
+
+    def test_syntax_errors(self):
+        '''Tests that malformed patterns raise ValueError.'''
+        for pattern in ['(a', 'a)', '*a', 'a|+', '[ab', '[b-a]', 'a\\']:
+            with self.assertRaises(ValueError):
+                regex_to_nfa(pattern)
+
+if __name__ == '__main__':
+    unittest.main()
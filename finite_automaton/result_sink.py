@@ -0,0 +1,162 @@
+"""Module for simulation results and the sinks that write them out."""
+
+from typing import List, Sequence, TextIO
+from array import array
+import csv
+import io
+import json
+import sys
+
+class SimulationResult:
+    """Accept flags of a run of cases plus the indices of cases that stopped on an error."""
+
+    def __init__(self, accepted: array = None, error_indices: List[int] = None):
+        # ケースごとの受理(1)/不受理(0)
+        self.accepted: array = accepted if accepted is not None else array('b')
+
+        # 遷移がなく途中で停止したケースの番号
+        self.error_indices: List[int] = error_indices if error_indices is not None else []
+
+    def __len__(self) -> int:
+        return len(self.accepted)
+
+    def append(self, accepted: bool, completed: bool) -> None:
+        if not completed:
+            self.error_indices.append(len(self.accepted))
+        self.accepted.append(1 if accepted else 0)
+
+    def extend(self, other: 'SimulationResult') -> None:
+        offset = len(self.accepted)
+        self.error_indices.extend(offset + index for index in other.error_indices)
+        self.accepted.extend(other.accepted)
+
+    def accepted_count(self) -> int:
+        return self.accepted.count(1)
+
+    def to_dict(self) -> dict:
+        return {
+            'cases': len(self.accepted),
+            'accepted': self.accepted_count(),
+            'errors': len(self.error_indices),
+        }
+
+
+class ResultSink:
+    """Collects per-case results and writes them in large blocks.
+
+    Subclasses format one case with ``format``; lines are buffered and written
+    once ``buffer_size`` characters have accumulated, and on ``close``.
+    """
+
+    def __init__(self, output: TextIO = None, buffer_size: int = 1 << 16):
+        self.output: TextIO = output if output is not None else sys.stdout
+        self.buffer_size: int = buffer_size
+        self._lines: List[str] = []
+        self._buffered: int = 0
+
+    def format(self, case: str, accepted: bool, completed: bool) -> str:
+        raise NotImplementedError
+
+    def write(self, case: str, accepted: bool, completed: bool) -> None:
+        line = self.format(case, accepted, completed)
+        self._lines.append(line)
+        self._buffered += len(line)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def write_result(self, cases: Sequence[str], result: SimulationResult) -> None:
+        """Write a whole SimulationResult for the given cases."""
+        errors = set(result.error_indices)
+        for index, case in enumerate(cases):
+            self.write(case, bool(result.accepted[index]), index not in errors)
+
+    def flush(self) -> None:
+        if self._lines:
+            self.output.write(''.join(self._lines))
+            self._lines = []
+            self._buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.output.flush()
+
+    def __enter__(self) -> 'ResultSink':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ConsoleSink(ResultSink):
+    """Human-readable lines in the simulator's original output format."""
+
+    def format(self, case: str, accepted: bool, completed: bool) -> str:
+        lines = ''
+        if not completed:
+            lines = f"error\n満たされないケースが見つかりました!!\ncase, {case}\n"
+        if accepted:
+            return lines + f"case: {case} は受理されました\n"
+        return lines + f"case: {case} は受理されませんでした\n"
+
+
+class JsonlSink(ResultSink):
+    """One JSON object per case: {"case": ..., "accepted": ..., "error": ...}."""
+
+    def format(self, case: str, accepted: bool, completed: bool) -> str:
+        return json.dumps({'case': case, 'accepted': accepted, 'error': not completed}, ensure_ascii=False) + '\n'
+
+
+class CsvSink(ResultSink):
+    """CSV rows ``case,accepted,error`` with a header line."""
+
+    def __init__(self, output: TextIO = None, buffer_size: int = 1 << 16):
+        super().__init__(output, buffer_size)
+        self._row = io.StringIO()
+        self._writer = csv.writer(self._row, lineterminator='\n')
+        self._lines.append('case,accepted,error\n')
+
+    def format(self, case: str, accepted: bool, completed: bool) -> str:
+        self._row.seek(0)
+        self._row.truncate()
+        self._writer.writerow((case, int(accepted), int(not completed)))
+        return self._row.getvalue()
+
+
+class SummarySink(ResultSink):
+    """Counts only; writes a single JSON summary on close."""
+
+    def __init__(self, output: TextIO = None, buffer_size: int = 1 << 16):
+        super().__init__(output, buffer_size)
+        self.cases: int = 0
+        self.accepted: int = 0
+        self.errors: int = 0
+
+    def write(self, case: str, accepted: bool, completed: bool) -> None:
+        self.cases += 1
+        if accepted:
+            self.accepted += 1
+        if not completed:
+            self.errors += 1
+
+    def write_result(self, cases: Sequence[str], result: SimulationResult) -> None:
+        self.cases += len(result)
+        self.accepted += result.accepted_count()
+        self.errors += len(result.error_indices)
+
+    def close(self) -> None:
+        summary = {
+            'cases': self.cases,
+            'accepted': self.accepted,
+            'rejected': self.cases - self.accepted,
+            'errors': self.errors,
+        }
+        self._lines.append(json.dumps(summary) + '\n')
+        super().close()
+
+
+SINKS = {
+    'console': ConsoleSink,
+    'jsonl': JsonlSink,
+    'csv': CsvSink,
+    'summary': SummarySink,
+}
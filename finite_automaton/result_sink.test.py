@@ -0,0 +1,90 @@
+'''
+This module tests SimulationResult and the sinks in result_sink.
+'''
+
+import csv
+import io
+import json
+import unittest
+from array import array
+from result_sink import SimulationResult, ConsoleSink, JsonlSink, CsvSink, SummarySink
+
+class CountingOutput(io.StringIO):
+    '''StringIO that counts the write calls.'''
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+class TestResultSink(unittest.TestCase):
+    '''
+    Test cases for verifying result merging, sink formats and buffering.
+    '''
+    def test_extend(self):
+        '''Tests that extend shifts the error indices of the appended result.'''
+        result = SimulationResult()
+        result.append(True, True)
+        result.append(False, False)
+        other = SimulationResult(array('b', [0, 1, 1]), [0, 2])
+        result.extend(other)
+        result.extend(SimulationResult())
+        self.assertEqual(list(result.accepted), [1, 0, 0, 1, 1])
+        self.assertEqual(result.error_indices, [1, 2, 4])
+        self.assertEqual(result.to_dict(), {'cases': 5, 'accepted': 3, 'errors': 3})
+
+    def test_csv_quoting(self):
+        '''Tests that cases with commas, quotes and line breaks are quoted and read back intact.'''
+        cases = ['plain', 'a,b', 'say "hi"', 'line\nbreak', '']
+        output = io.StringIO()
+        with CsvSink(output) as sink:
+            for index, case in enumerate(cases):
+                sink.write(case, index % 2 == 0, index != 1)
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual(rows[0], ['case', 'accepted', 'error'])
+        self.assertEqual(rows[1:], [[case, str(int(index % 2 == 0)), str(int(index == 1))]
+                                    for index, case in enumerate(cases)])
+
+    def test_buffering(self):
+        '''Tests that lines are held back until buffer_size characters have accumulated.'''
+        output = CountingOutput()
+        sink = JsonlSink(output, buffer_size=100)
+        line = JsonlSink(None).format('0101', True, True)
+        count = -(-100 // len(line))
+        for _ in range(count - 1):
+            sink.write('0101', True, True)
+        self.assertEqual(output.getvalue(), '')
+        sink.write('0101', True, True)
+        self.assertEqual(output.writes, 1)
+        self.assertEqual(output.getvalue(), line * count)
+
+        sink.write('0101', True, True)
+        self.assertEqual(output.writes, 1)
+        sink.close()
+        self.assertEqual(output.getvalue(), line * (count + 1))
+        self.assertEqual(json.loads(line), {'case': '0101', 'accepted': True, 'error': False})
+
+    def test_write_result(self):
+        '''Tests that write_result reports every case with its error flag.'''
+        cases = ['a', 'b', 'c']
+        result = SimulationResult(array('b', [1, 0, 1]), [1])
+
+        output = io.StringIO()
+        with ConsoleSink(output) as sink:
+            sink.write_result(cases, result)
+        self.assertEqual(output.getvalue(),
+                         'case: a は受理されました\n'
+                         'error\n満たされないケースが見つかりました!!\ncase, b\n'
+                         'case: b は受理されませんでした\n'
+                         'case: c は受理されました\n')
+
+        output = io.StringIO()
+        with SummarySink(output) as sink:
+            sink.write_result(cases, result)
+            sink.write('d', False, False)
+        self.assertEqual(json.loads(output.getvalue()), {'cases': 4, 'accepted': 2, 'rejected': 2, 'errors': 2})
+
+if __name__ == '__main__':
+    unittest.main()